@@ -7,12 +7,12 @@ modules (comm_whatsapp_billing, comm_sms_billing, etc.) create rows via
 via inherits.
 """
 import logging
-import phonenumbers
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 
 from .comm_billing_rate_card import CHANNEL_SELECTION
 from .comm_billing_rate import (CATEGORY_SELECTION, UNIT_SELECTION,
                                  DIRECTION_SELECTION)
+from .msisdn_country import region_for_number
 
 _logger = logging.getLogger(__name__)
 
@@ -70,16 +70,15 @@ class CommBillingEvent(models.Model):
     # ---- MSISDN → country ----
     @api.model
     def _country_from_wa_id(self, wa_id):
-        if not wa_id:
-            return self.env['res.country']
-        try:
-            num = phonenumbers.parse('+' + str(wa_id).lstrip('+'))
-            code = phonenumbers.region_code_for_number(num)
-            if code:
-                return self.env['res.country'].search([('code', '=', code)], limit=1)
-        except Exception as e:
-            _logger.debug('phonenumbers parse failed for %s: %s', wa_id, e)
-        return self.env['res.country']
+        """res.country for an MSISDN, via the shared prefix trie + LRU."""
+        code = region_for_number(wa_id) if wa_id else None
+        country_id = self._country_id_for_code(code) if code else False
+        return self.env['res.country'].browse(country_id or [])
+
+    @api.model
+    @tools.ormcache('code')
+    def _country_id_for_code(self, code):
+        return self.env['res.country'].search([('code', '=', code)], limit=1).id
 
     # ---- Volume tier lookup ----
     @api.model
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""MSISDN → ISO region resolver.
+
+Billing and the campaign simulator both need the destination country for
+every number they price. Parsing each number with `phonenumbers` and then
+searching `res.country` was the dominant cost of a large simulation, so the
+lookup is split in two:
+
+- A longest-prefix trie of E.164 dialling prefixes, built once per worker
+  from the metadata bundled with `phonenumbers` (no network, no DB). Shared
+  calling codes (+7, +39, +47, +358, NANP territories, ...) are split on the
+  `leading_digits` each territory declares.
+- A bounded LRU in front of it, keyed on the raw number string.
+
+Calling codes where a secondary territory has no `leading_digits` (+1 US/CA,
++44 GB/GG/JE, +61 AU/CX/CC, ...) cannot be settled by prefix alone; those
+numbers fall back to `phonenumbers.region_code_for_number`, which matches
+on the full national number pattern, and then to the calling code's main
+country. The LRU absorbs that cost for repeat numbers.
+
+ISO code → res.country id mapping is database-specific and lives on the
+model (`comm.billing.event._country_id_for_code`), behind `ormcache`.
+"""
+import functools
+import logging
+import re
+import threading
+
+import phonenumbers
+from phonenumbers import COUNTRY_CODE_TO_REGION_CODE, PhoneMetadata
+
+_logger = logging.getLogger(__name__)
+
+LRU_SIZE = 65536
+
+_NON_DIGITS = re.compile(r'\D')
+
+_trie = None
+_trie_lock = threading.Lock()
+
+
+def _expand_leading_digits(pattern):
+    """Expand a `leading_digits` regex into its literal digit prefixes.
+
+    Only the subset used by the metadata is supported: digits, `[...]`
+    classes with ranges, `(?:...)` groups and `|` alternation. Returns None
+    for anything else so the caller can fall back to full parsing.
+    """
+    pos = 0
+
+    def alternation():
+        nonlocal pos
+        options = sequence()
+        if options is None:
+            return None
+        while pos < len(pattern) and pattern[pos] == '|':
+            pos += 1
+            more = sequence()
+            if more is None:
+                return None
+            options = options + more
+        return options
+
+    def sequence():
+        nonlocal pos
+        prefixes = ['']
+        while pos < len(pattern) and pattern[pos] not in '|)':
+            ch = pattern[pos]
+            if ch.isdigit():
+                atoms = [ch]
+                pos += 1
+            elif ch == '[':
+                end = pattern.find(']', pos)
+                if end < 0:
+                    return None
+                atoms = _expand_class(pattern[pos + 1:end])
+                if atoms is None:
+                    return None
+                pos = end + 1
+            elif pattern.startswith('(?:', pos):
+                pos += 3
+                atoms = alternation()
+                if atoms is None or pos >= len(pattern) or pattern[pos] != ')':
+                    return None
+                pos += 1
+            else:
+                return None
+            prefixes = [p + a for p in prefixes for a in atoms]
+        return prefixes
+
+    result = alternation()
+    if result is None or pos != len(pattern):
+        return None
+    return result
+
+
+def _expand_class(body):
+    digits = []
+    i = 0
+    while i < len(body):
+        if i + 2 < len(body) and body[i + 1] == '-':
+            lo, hi = body[i], body[i + 2]
+            if not (lo.isdigit() and hi.isdigit()):
+                return None
+            digits.extend(str(d) for d in range(int(lo), int(hi) + 1))
+            i += 3
+        elif body[i].isdigit():
+            digits.append(body[i])
+            i += 1
+        else:
+            return None
+    return digits
+
+
+def _insert(trie, prefix, region, ambiguous=False):
+    node = trie
+    for digit in prefix:
+        node = node[1].setdefault(digit, [None, {}, False])
+    node[0] = region
+    node[2] = ambiguous
+
+
+def _build_trie():
+    """Node layout: [region_or_None, {digit: child}, ambiguous]."""
+    trie = [None, {}, False]
+    for calling_code, regions in COUNTRY_CODE_TO_REGION_CODE.items():
+        cc = str(calling_code)
+        main, secondary = regions[0], regions[1:]
+        if main == '001':
+            # Non-geographic entities (satellite, UIFN) carry no country.
+            continue
+        ambiguous = False
+        for region in secondary:
+            metadata = PhoneMetadata.metadata_for_region(region)
+            leading = metadata.leading_digits if metadata else None
+            prefixes = _expand_leading_digits(leading) if leading else None
+            if not prefixes:
+                ambiguous = True
+                continue
+            for prefix in prefixes:
+                _insert(trie, cc + prefix, region)
+        _insert(trie, cc, main, ambiguous)
+    return trie
+
+
+def _get_trie():
+    global _trie
+    if _trie is None:
+        with _trie_lock:
+            if _trie is None:
+                _trie = _build_trie()
+    return _trie
+
+
+def _region_from_digits(digits):
+    node = _get_trie()
+    found = None
+    for digit in digits:
+        node = node[1].get(digit)
+        if node is None:
+            break
+        if node[0] is not None:
+            found = node
+    if found is None:
+        return None
+    if not found[2]:
+        return found[0]
+    try:
+        region = phonenumbers.region_code_for_number(
+            phonenumbers.parse('+' + digits))
+    except phonenumbers.NumberParseException as e:
+        _logger.debug('phonenumbers parse failed for %s: %s', digits, e)
+        region = None
+    # Invalid / unallocated ranges: bill against the calling code's main
+    # country rather than dropping the country altogether.
+    return region or found[0]
+
+
+@functools.lru_cache(maxsize=LRU_SIZE)
+def region_for_number(number):
+    """ISO 3166 alpha-2 code for an E.164 number / WhatsApp id, or None.
+
+    Accepts `+27821234567`, `27821234567` or formatted variants; anything
+    that is not digits is ignored.
+    """
+    if not number:
+        return None
+    digits = _NON_DIGITS.sub('', str(number))
+    if not digits:
+        return None
+    return _region_from_digits(digits)
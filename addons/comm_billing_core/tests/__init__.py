@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 from . import test_rate_resolution
 from . import test_fx
+from . import test_msisdn_country
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""MSISDN → country: prefix trie, shared calling codes, LRU throughput."""
+import time
+
+from odoo.tests import tagged, common
+
+from odoo.addons.comm_billing_core.models import msisdn_country
+from odoo.addons.comm_billing_core.models.msisdn_country import region_for_number
+
+
+@tagged('comm_billing', 'msisdn', 'post_install', '-at_install')
+class TestMsisdnCountry(common.TransactionCase):
+
+    def test_single_region_calling_code(self):
+        self.assertEqual(region_for_number('27821234567'), 'ZA')
+        self.assertEqual(region_for_number('+27 82 123 4567'), 'ZA')
+
+    def test_shared_calling_code_split_on_leading_digits(self):
+        self.assertEqual(region_for_number('12685551234'), 'AG')
+        self.assertEqual(region_for_number('77012345678'), 'KZ')
+        self.assertEqual(region_for_number('79161234567'), 'RU')
+        self.assertEqual(region_for_number('390669812345'), 'VA')
+        self.assertEqual(region_for_number('393331234567'), 'IT')
+
+    def test_ambiguous_calling_code_falls_back_to_parse(self):
+        self.assertEqual(region_for_number('14165551234'), 'CA')
+        self.assertEqual(region_for_number('12125551234'), 'US')
+
+    def test_unknown_and_empty(self):
+        self.assertIsNone(region_for_number(''))
+        self.assertIsNone(region_for_number('abc'))
+        self.assertIsNone(region_for_number('0821234567'))
+
+    def test_country_from_wa_id(self):
+        Event = self.env['comm.billing.event']
+        self.assertEqual(Event._country_from_wa_id('27821234567'),
+                         self.env.ref('base.za'))
+        self.assertFalse(Event._country_from_wa_id(False))
+        self.assertFalse(Event._country_from_wa_id('0821234567'))
+
+
+@tagged('comm_billing', 'msisdn', 'benchmark', '-standard')
+class TestMsisdnCountryBenchmark(common.BaseCase):
+    """Cached lookups must sustain > 1M/s. Excluded from the default run;
+    select with --test-tags=benchmark."""
+
+    def test_cached_lookup_throughput(self):
+        numbers = ['2782%07d' % i for i in range(10000)]
+        msisdn_country.region_for_number.cache_clear()
+        for number in numbers:
+            region_for_number(number)
+        rounds = 50
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for number in numbers:
+                region_for_number(number)
+        rate = rounds * len(numbers) / (time.perf_counter() - start)
+        self.assertGreater(rate, 1_000_000, 'only %.0f lookups/s' % rate)
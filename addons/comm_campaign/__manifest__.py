@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'Communication Campaigns',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.0.1',
     'category': 'Communications',
     'summary': 'Omni-channel campaign engine on top of comm_chatbot + billing',
     'description': """
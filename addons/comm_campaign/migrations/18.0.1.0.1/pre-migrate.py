@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+
+def migrate(cr, version):
+    """
+    Carry quiet-hours deferrals over from scheduled_at to next_attempt_at.
+    The column is created here so the ORM does not back-fill every pending
+    send with "now" and release deferred sends early.
+    """
+    cr.execute("""
+        ALTER TABLE comm_campaign_send
+            ADD COLUMN IF NOT EXISTS next_attempt_at timestamp without time zone
+    """)
+    cr.execute("""
+        UPDATE comm_campaign_send
+           SET next_attempt_at = COALESCE(scheduled_at, create_date)
+         WHERE next_attempt_at IS NULL
+    """)
@@ -4,5 +4,7 @@ from . import res_partner
 from . import comm_campaign
 from . import comm_campaign_variant
 from . import comm_campaign_send
+from . import comm_campaign_throttle
+from . import comm_campaign_budget
 from . import comm_campaign_audience_snapshot
 from . import comm_conversation
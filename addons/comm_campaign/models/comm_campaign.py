@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 import logging
+import time
 from datetime import datetime, timedelta
 from odoo import models, fields, api
 from odoo.exceptions import UserError, ValidationError
 
 _logger = logging.getLogger(__name__)
 
+# pg advisory lock namespace ("CC" = comm campaign) for enqueueing sends.
+_ENQUEUE_LOCK_NS = 0x4343
+
 
 CAMPAIGN_STATE_SELECTION = [
     ('draft',      'Draft'),
@@ -176,8 +180,14 @@ class CommCampaign(models.Model):
 
     # ---------- Cron ----------
     @api.model
-    def cron_run(self):
-        """Process due campaigns."""
+    def cron_run(self, partition=None, partitions=None):
+        """Process due campaigns.
+
+        Safe to run from several crons or runners at once: sends are claimed
+        with SKIP LOCKED and the per-minute throttle is a shared bucket. Give
+        each extra cron `partition=k, partitions=n` to split the send table
+        between them.
+        """
         now = fields.Datetime.now()
         due = self.search([
             ('state', 'in', ('scheduled', 'running')),
@@ -185,9 +195,19 @@ class CommCampaign(models.Model):
             '|', ('expires_at', '=', False), ('expires_at', '>=', now),
         ])
         for campaign in due:
-            campaign._process_batch()
+            campaign._process_batch(partition, partitions)
 
-    def _process_batch(self):
+    @api.model
+    def run_worker(self, partition=None, partitions=None, max_seconds=55):
+        """Dedicated runner loop: keep working due campaigns, committing
+        after every round, until `max_seconds` elapse."""
+        deadline = time.monotonic() + max_seconds
+        while time.monotonic() < deadline:
+            self.cron_run(partition, partitions)
+            self.env.cr.commit()
+            time.sleep(1)
+
+    def _process_batch(self, partition=None, partitions=None):
         """Process one batch of sends respecting throttle_per_minute."""
         self.ensure_one()
         if self.state == 'scheduled':
@@ -197,17 +217,29 @@ class CommCampaign(models.Model):
         # Determine batch size — throttle_per_minute / 4 = 15s worth
         batch = max(1, int(self.throttle_per_minute / 4))
 
-        # Materialise sends from audience/snapshot if not already
-        self._enqueue_sends(batch)
-
-        # Process queued sends
-        queued = Send.search([
-            ('campaign_id', '=', self.id),
-            ('status', '=', 'queued'),
-            '|', ('scheduled_at', '=', False), ('scheduled_at', '<=', fields.Datetime.now()),
-        ], limit=batch)
+        # Materialise sends from audience/snapshot if not already. One worker
+        # at a time per campaign, or concurrent enqueues would duplicate rows.
+        self.env.cr.execute(
+            "SELECT pg_try_advisory_xact_lock(%s, %s)",
+            (_ENQUEUE_LOCK_NS, self.id))
+        if self.env.cr.fetchone()[0]:
+            self._enqueue_sends(batch)
+
+        # Claim due sends only — deferred sends sit out until their bucket's
+        # next_attempt_at — then spend the campaign's shared throttle on them.
+        # Claimed sends we get no tokens for are released at commit.
+        claimed = Send._claim(self, batch, partition, partitions)
+        granted = self.env['comm.campaign.throttle']._take(self, len(claimed))
+        queued = claimed[:granted]
+        queued = self._reserve_budget(queued)
+        # One consent query for the whole batch; _resolve_channel reads the
+        # per-transaction cache this warms.
+        self.env['comm.partner.communication.preference'].opted_in_map(
+            queued.partner_id, self.channel_priority_ids, self.purpose)
         for send in queued:
             send._process()
+        queued.filtered(
+            lambda s: s.status not in ('sent', 'delivered'))._release_reservation()
 
         # Check completion
         remaining = Send.search_count([
@@ -217,6 +249,7 @@ class CommCampaign(models.Model):
         if remaining == 0 and self.audience_count == Send.search_count([
                 ('campaign_id', '=', self.id)]):
             self.state = 'completed'
+            self.env['comm.campaign.budget']._reconcile(self)
 
     def _enqueue_sends(self, batch):
         """For audience partners without a comm.campaign.send row, create one."""
@@ -235,13 +268,27 @@ class CommCampaign(models.Model):
             ('campaign_id', '=', self.id),
         ]).mapped('partner_id.id'))
         new_partners = partners.filtered(lambda p: p.id not in existing_partner_ids)
+
+        # Bucket by recipient timezone so quiet hours are evaluated once per
+        # bucket rather than once per send per tick.
+        now = fields.Datetime.now()
+        next_at_by_tz = {}
+        vals_list = []
         for p in new_partners[:batch * 5]:
+            tz = Send._tz_for_partner(self, p)
+            if tz not in next_at_by_tz:
+                next_at_by_tz[tz] = (
+                    Send._next_allowed_at(tz, self.channel_priority_ids, self, now)
+                    if self.respect_quiet_hours else now)
             variant = self._pick_variant(p) if self.variant_ids else False
-            Send.create({
+            vals_list.append({
                 'campaign_id': self.id,
                 'partner_id': p.id,
                 'variant_id': variant.id if variant else False,
+                'tz': tz,
+                'next_attempt_at': next_at_by_tz[tz],
             })
+        Send.create(vals_list)
 
     def _pick_variant(self, partner):
         """Deterministic weighted variant assignment."""
@@ -260,12 +307,53 @@ class CommCampaign(models.Model):
         return variants[-1]
 
     # ---------- Budget check ----------
+    def _reserve_budget(self, sends):
+        """Reserve estimated cost for `sends` on the spend ledger and return
+        the ones that fit. With a hard cap the rest are skipped; otherwise
+        everything is reserved and the owner is warned."""
+        self.ensure_one()
+        if not sends or not self.budget_cap_local:
+            return sends
+        unit = self._estimate_send_cost_local()
+        fit = self.env['comm.campaign.budget']._reserve(
+            self, unit, len(sends), enforce=self.hard_stop_at_cap)
+        sends[fit:].write({'status': 'skipped_budget'})
+        sends = sends[:fit]
+        sends.write({'reserved_local': unit})
+        budget_state = self._check_budget()
+        if budget_state in ('warn', 'exceeded'):
+            self._notify_budget(budget_state)
+        return sends
+
+    def _estimate_send_cost_local(self):
+        """Per-send cost to reserve: the campaign's own average once sends
+        have settled, else the simulator's worst case on the first channel."""
+        self.ensure_one()
+        average = self.env['comm.campaign.budget']._average_settled(self)
+        if average is not None:
+            return average
+        channel = self.channel_priority_ids.sorted('sequence')[:1]
+        if not channel:
+            return 0.0
+        Sim = self.env['comm.campaign.simulation']
+        _min, _real, max_usd = Sim._per_recipient(
+            channel, self.env.company.country_id, Sim._analyse_bot(self.bot_id),
+            1.0)
+        currency = self.budget_currency_id or self.env.company.currency_id
+        fx, _ = self.env['comm.billing.event']._resolve_fx(
+            None, fields.Date.today(), currency_hint=currency)
+        return max_usd * (fx or 1.0)
+
+    def _spent_local(self):
+        self.ensure_one()
+        return self.env['comm.campaign.budget']._spent(self)
+
     def _check_budget(self, projected_cost_local=0.0):
         """Return one of: 'ok', 'warn', 'exceeded'."""
         self.ensure_one()
         if not self.budget_cap_local:
             return 'ok'
-        current_plus_projected = self.total_cost_local + projected_cost_local
+        current_plus_projected = self._spent_local() + projected_cost_local
         pct = (current_plus_projected / self.budget_cap_local) * 100
         if pct >= 100:
             return 'exceeded'
@@ -279,14 +367,14 @@ class CommCampaign(models.Model):
         if status == 'warn' and not self.budget_warning_sent:
             self.message_post(
                 body=f'Campaign at {self.budget_soft_threshold_pct}% of budget '
-                     f'({self.total_cost_local:.2f} / {self.budget_cap_local:.2f})',
+                     f'({self._spent_local():.2f} / {self.budget_cap_local:.2f})',
                 partner_ids=[self.owner_id.partner_id.id] if self.owner_id else [],
             )
             self.budget_warning_sent = True
         elif status == 'exceeded' and not self.budget_exceeded_notified:
             self.message_post(
                 body=f'Campaign exceeded budget cap '
-                     f'({self.total_cost_local:.2f} / {self.budget_cap_local:.2f})',
+                     f'({self._spent_local():.2f} / {self.budget_cap_local:.2f})',
                 partner_ids=[self.owner_id.partner_id.id] if self.owner_id else [],
             )
             self.budget_exceeded_notified = True
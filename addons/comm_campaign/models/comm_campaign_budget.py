@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""Campaign spend ledger: reserved + settled, in budget currency.
+
+Each batch reserves its estimated cost before any send launches; the
+reservation only succeeds for as many sends as still fit under the cap, so
+concurrent workers cannot collectively overshoot it by more than the error
+in one batch's estimate. When the billing roll-up lands on a send its
+reservation is released and the actual cost is settled.
+
+Like the throttle bucket, every ledger movement commits on its own short
+cursor so the row is never held for the length of a batch. Movements are
+undone if the transaction they were made for rolls back. The send rows
+(`reserved_local`, `billed_local`) stay the source of truth;
+`_reconcile()` rebuilds the ledger from them when a campaign completes, and
+repairs it if a worker died between reserving and committing its batch.
+"""
+import logging
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# cr.postrollback.data key: {campaign id: [reserved, settled, settled count]}
+# moved on the ledger by this transaction.
+_UNDO_KEY = 'comm_campaign.budget_undo'
+
+_ENSURE_LEDGER_SQL = """
+    INSERT INTO comm_campaign_budget
+           (campaign_id, reserved_local, settled_local, settled_count,
+            create_uid, create_date, write_uid, write_date)
+    VALUES (%(campaign_id)s, 0, 0, 0,
+            %(uid)s, now() AT TIME ZONE 'UTC',
+            %(uid)s, now() AT TIME ZONE 'UTC')
+    ON CONFLICT (campaign_id) DO NOTHING
+"""
+
+# Reserve as many of %(count)s sends at %(unit)s as still fit under %(cap)s.
+RESERVE_SQL = """
+    WITH ledger AS (
+        SELECT id,
+               LEAST(%(count)s, GREATEST(0, FLOOR(
+                   (%(cap)s - reserved_local - settled_local) / %(unit)s
+               )))::int AS fit
+          FROM comm_campaign_budget
+         WHERE campaign_id = %(campaign_id)s
+           FOR UPDATE
+    )
+    UPDATE comm_campaign_budget b
+       SET reserved_local = b.reserved_local + ledger.fit * %(unit)s
+      FROM ledger
+     WHERE b.id = ledger.id
+ RETURNING ledger.fit
+"""
+
+SETTLE_SQL = """
+    UPDATE comm_campaign_budget
+       SET reserved_local = GREATEST(0, reserved_local - %(released)s),
+           settled_local = settled_local + %(billed)s,
+           settled_count = settled_count + %(newly)s
+     WHERE campaign_id = %(campaign_id)s
+ RETURNING id
+"""
+
+
+def ledger_statement(cr, campaign_id, uid, query, params):
+    """Run one ledger statement on ``cr``, creating the campaign's ledger
+    row on first use. Returns the first result row."""
+    params = dict(params, campaign_id=campaign_id, uid=uid)
+    cr.execute(_ENSURE_LEDGER_SQL, params)
+    cr.execute(query, params)
+    return cr.fetchone()
+
+
+class CommCampaignBudget(models.Model):
+    _name = 'comm.campaign.budget'
+    _description = 'Campaign spend ledger'
+    _rec_name = 'campaign_id'
+
+    campaign_id = fields.Many2one('comm.campaign', required=True,
+                                  ondelete='cascade', index=True)
+    reserved_local = fields.Float(digits=(12, 4), default=0.0)
+    settled_local = fields.Float(digits=(12, 4), default=0.0)
+    settled_count = fields.Integer(default=0)
+
+    _sql_constraints = [
+        ('campaign_uniq', 'unique(campaign_id)',
+         'One spend ledger per campaign.'),
+    ]
+
+    @api.model
+    def _ledger_execute(self, campaign, query, params):
+        """Run one ledger statement on its own committed cursor, creating
+        the row on first use. Returns the first result row."""
+        with self.env.registry.cursor() as cr:
+            # Counters are hot rows: wait on the lock and re-read the latest
+            # version instead of failing with a serialization error.
+            if not self.env.registry.in_test_mode():
+                cr.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+            return ledger_statement(cr, campaign.id, self.env.uid, query, params)
+
+    @api.model
+    def _undo_on_rollback(self, campaign, reserved=0.0, settled=0.0, count=0):
+        """Remember a committed ledger movement so it is reverted if this
+        transaction rolls back (and its send rows with it)."""
+        cr = self.env.cr
+        undo = cr.postrollback.data.get(_UNDO_KEY)
+        if undo is None:
+            undo = cr.postrollback.data[_UNDO_KEY] = {}
+            registry = self.env.registry
+
+            def undo_movements():
+                with registry.cursor() as undo_cr:
+                    for campaign_id, (r, s, c) in undo.items():
+                        undo_cr.execute("""
+                            UPDATE comm_campaign_budget
+                               SET reserved_local = GREATEST(0, reserved_local - %s),
+                                   settled_local = settled_local - %s,
+                                   settled_count = settled_count - %s
+                             WHERE campaign_id = %s
+                        """, [r, s, c, campaign_id])
+            cr.postrollback.add(undo_movements)
+        totals = undo.setdefault(campaign.id, [0.0, 0.0, 0])
+        totals[0] += reserved
+        totals[1] += settled
+        totals[2] += count
+
+    @api.model
+    def _reserve(self, campaign, unit_cost, count, enforce=True):
+        """Reserve `unit_cost` for up to `count` sends; return how many fit.
+
+        With `enforce` off (soft caps) everything is reserved so spend is
+        still tracked, and the caller only warns.
+        """
+        if count <= 0:
+            return 0
+        if unit_cost <= 0 or not campaign.budget_cap_local or not enforce:
+            self._ledger_execute(campaign, """
+                UPDATE comm_campaign_budget
+                   SET reserved_local = reserved_local + %(amount)s
+                 WHERE campaign_id = %(campaign_id)s
+             RETURNING id
+            """, {'amount': max(unit_cost, 0.0) * count})
+            self._undo_on_rollback(campaign, reserved=max(unit_cost, 0.0) * count)
+            return count
+        row = self._ledger_execute(campaign, RESERVE_SQL, {
+            'count': count, 'cap': campaign.budget_cap_local, 'unit': unit_cost,
+        })
+        fit = row[0] if row else 0
+        self._undo_on_rollback(campaign, reserved=fit * unit_cost)
+        return fit
+
+    @api.model
+    def _release(self, campaign, amount):
+        """Give back reservations of sends that never launched."""
+        if amount:
+            self._ledger_execute(campaign, """
+                UPDATE comm_campaign_budget
+                   SET reserved_local = GREATEST(0, reserved_local - %(amount)s)
+                 WHERE campaign_id = %(campaign_id)s
+             RETURNING id
+            """, {'amount': amount})
+            self._undo_on_rollback(campaign, reserved=-amount)
+
+    @api.model
+    def _settle(self, campaign, released, billed_delta, newly_settled):
+        """Swap a send's reservation for its actual billed cost."""
+        self._ledger_execute(campaign, SETTLE_SQL, {
+            'released': released, 'billed': billed_delta, 'newly': newly_settled,
+        })
+        self._undo_on_rollback(campaign, reserved=-released,
+                               settled=billed_delta, count=newly_settled)
+
+    @api.model
+    def _spent(self, campaign):
+        """Reserved + settled spend as of now. Read on the ledger cursor:
+        this transaction's snapshot predates other workers' reservations."""
+        row = self._ledger_execute(campaign, """
+            SELECT reserved_local + settled_local
+              FROM comm_campaign_budget WHERE campaign_id = %(campaign_id)s
+        """, {})
+        return row[0] if row else 0.0
+
+    @api.model
+    def _average_settled(self, campaign):
+        """Mean billed cost of this campaign's settled sends, or None."""
+        row = self._ledger_execute(campaign, """
+            SELECT settled_local / NULLIF(settled_count, 0)
+              FROM comm_campaign_budget WHERE campaign_id = %(campaign_id)s
+        """, {})
+        return row[0] if row else None
+
+    @api.model
+    def _reconcile(self, campaign):
+        """Rebuild the ledger from the send rows as this transaction sees
+        them, including its own uncommitted writes. Should the transaction
+        roll back, the undo of its movements brings the ledger back to the
+        committed rows as well."""
+        self.env['comm.campaign.send'].flush_model(
+            ['campaign_id', 'reserved_local', 'billed_local', 'settled'])
+        self.env.cr.execute("""
+            SELECT COALESCE(SUM(reserved_local), 0),
+                   COALESCE(SUM(billed_local), 0),
+                   COUNT(*) FILTER (WHERE settled)
+              FROM comm_campaign_send
+             WHERE campaign_id = %s
+        """, [campaign.id])
+        reserved, settled, settled_count = self.env.cr.fetchone()
+        self._ledger_execute(campaign, """
+            UPDATE comm_campaign_budget
+               SET reserved_local = %(reserved)s,
+                   settled_local = %(settled)s,
+                   settled_count = %(settled_count)s
+             WHERE campaign_id = %(campaign_id)s
+         RETURNING id
+        """, {'reserved': reserved, 'settled': settled,
+              'settled_count': settled_count})
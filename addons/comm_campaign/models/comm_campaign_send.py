@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 import logging
-from datetime import time, timedelta
-from odoo import models, fields, api
+from datetime import timedelta
+
+import pytz
+
+from odoo import models, fields, api, tools
 
 _logger = logging.getLogger(__name__)
 
@@ -17,6 +20,21 @@ SEND_STATUS_SELECTION = [
 ]
 
 
+def _next_allowed_local(local, start_h, end_h, weekends):
+    """First naive local datetime >= `local` inside the daily
+    [start_h, end_h) send window, skipping weekends unless allowed."""
+    midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    for offset in range(8):
+        day = midnight + timedelta(days=offset)
+        if not weekends and day.weekday() >= 5:
+            continue
+        start = day + timedelta(hours=start_h)
+        end = day + timedelta(hours=end_h)
+        if local < end:
+            return max(local, start)
+    return local
+
+
 class CommCampaignSend(models.Model):
     _name = 'comm.campaign.send'
     _description = 'One recipient send within a campaign'
@@ -30,8 +48,12 @@ class CommCampaignSend(models.Model):
     chosen_channel_id = fields.Many2one('comm.channel')
     status = fields.Selection(SEND_STATUS_SELECTION, default='queued',
                               required=True, index=True)
-    scheduled_at = fields.Datetime(index=True,
-        help='When to attempt this send. Set by quiet-hours deferrals.')
+    tz = fields.Char(readonly=True,
+        help='Recipient timezone bucket the send was enqueued under.')
+    next_attempt_at = fields.Datetime(default=fields.Datetime.now,
+        help='Earliest time the cron may pick this send up. Precomputed per '
+             'timezone bucket at enqueue time and moved by quiet-hours '
+             'deferrals.')
     sent_at = fields.Datetime()
     retry_count = fields.Integer(default=0)
     max_retries = fields.Integer(default=3)
@@ -45,6 +67,11 @@ class CommCampaignSend(models.Model):
 
     billed_usd = fields.Float(digits=(12, 4), default=0.0)
     billed_local = fields.Float(digits=(12, 2), default=0.0)
+    reserved_local = fields.Float(digits=(12, 4), default=0.0,
+        help='Estimated cost held against the campaign budget until billing '
+             'settles this send.')
+    settled = fields.Boolean(
+        help='True once billed cost has been rolled up from billing events.')
 
     display_name = fields.Char(compute='_compute_display_name', store=True)
 
@@ -53,6 +80,72 @@ class CommCampaignSend(models.Model):
         for s in self:
             s.display_name = f'{s.campaign_id.name} → {s.partner_id.name} [{s.status}]'
 
+    def init(self):
+        # The cron only ever asks "which pending sends of this campaign are
+        # due", so index exactly that instead of scanning blocked sends.
+        tools.create_index(
+            self.env.cr, 'comm_campaign_send_due_index', self._table,
+            ['campaign_id', 'next_attempt_at'],
+            where="status IN ('queued', 'deferred')")
+
+    # ---------- Claiming ----------
+    @api.model
+    def _claim(self, campaign, limit, partition=None, partitions=None):
+        """Lock up to `limit` due sends of `campaign` for this transaction.
+
+        Rows already locked by another worker are skipped, so any number of
+        crons / runners can work the same campaign. With `partitions` set,
+        only sends where `id % partitions == partition` are considered,
+        which keeps concurrent workers off each other's index ranges.
+        """
+        if limit <= 0:
+            return self.browse()
+        self.flush_model(['campaign_id', 'status', 'next_attempt_at'])
+        query = """
+            SELECT id FROM comm_campaign_send
+             WHERE campaign_id = %(campaign_id)s
+               AND status IN ('queued', 'deferred')
+               AND next_attempt_at <= %(now)s
+        """
+        if partitions and partitions > 1:
+            query += " AND id %% %(partitions)s = %(partition)s"
+        query += """
+          ORDER BY next_attempt_at, id
+             LIMIT %(limit)s
+               FOR UPDATE SKIP LOCKED
+        """
+        self.env.cr.execute(query, {
+            'campaign_id': campaign.id,
+            'now': fields.Datetime.now(),
+            'partitions': partitions,
+            'partition': partition or 0,
+            'limit': limit,
+        })
+        return self.browse([r[0] for r in self.env.cr.fetchall()])
+
+    # ---------- Budget ledger ----------
+    def _release_reservation(self):
+        """Hand unused reservations (skipped / failed / deferred) back."""
+        Budget = self.env['comm.campaign.budget']
+        for campaign in self.campaign_id:
+            sends = self.filtered(
+                lambda s: s.campaign_id == campaign and s.reserved_local)
+            Budget._release(campaign, sum(sends.mapped('reserved_local')))
+            sends.write({'reserved_local': 0.0})
+
+    def _settle_billing(self, billed_usd, billed_local):
+        """Record the billed cost and swap the reservation for it."""
+        self.ensure_one()
+        self.env['comm.campaign.budget']._settle(
+            self.campaign_id, self.reserved_local,
+            billed_local - self.billed_local, 0 if self.settled else 1)
+        self.write({
+            'billed_usd': billed_usd,
+            'billed_local': billed_local,
+            'reserved_local': 0.0,
+            'settled': True,
+        })
+
     # ---------- Send processing ----------
     def _process(self):
         for send in self:
@@ -63,17 +156,10 @@ class CommCampaignSend(models.Model):
                 send.write({'status': 'failed', 'error': str(e)})
 
     def _process_one(self):
-        """Resolve channel, check consent + quiet hours + budget, launch bot."""
+        """Resolve channel, check consent + quiet hours, launch bot."""
         campaign = self.campaign_id
 
-        # 1. Budget check
-        budget_state = campaign._check_budget()
-        if budget_state == 'exceeded' and campaign.hard_stop_at_cap:
-            campaign._notify_budget('exceeded')
-            self.write({'status': 'skipped_budget'})
-            return
-        if budget_state in ('warn', 'exceeded'):
-            campaign._notify_budget(budget_state)
+        # 1. Budget was reserved for the whole batch in _process_batch
 
         # 2. Channel resolution
         channel, skip_reason = self._resolve_channel()
@@ -112,58 +198,52 @@ class CommCampaignSend(models.Model):
             except Exception as e:
                 _logger.debug('can_reach failed for %s: %s', channel.code, e)
                 continue
-            if not Pref.is_opted_in(self.partner_id, channel, campaign.purpose):
+            if not Pref.opted_in_map(self.partner_id, channel,
+                                     campaign.purpose)[(self.partner_id.id, channel.id)]:
                 continue
-            if campaign.respect_quiet_hours and self._is_quiet_hours(channel):
-                # Defer to next permitted window
-                next_at = self._next_permitted_window(channel)
-                self.write({'status': 'deferred', 'scheduled_at': next_at})
-                return None, None
+            if campaign.respect_quiet_hours:
+                next_at = self._next_allowed_at(
+                    self.tz or self._get_partner_tz(), channel, campaign)
+                if next_at > fields.Datetime.now():
+                    # Park until the window opens; the cron won't see it again
+                    # before then.
+                    self.write({'status': 'deferred', 'next_attempt_at': next_at})
+                    return None, None
             return channel, None
         return None, 'no reachable channel'
 
-    def _is_quiet_hours(self, channel):
-        # Get partner tz
-        tz_name = self._get_partner_tz()
-        try:
-            import pytz
-            now = fields.Datetime.now().replace(tzinfo=pytz.UTC).astimezone(pytz.timezone(tz_name))
-        except Exception:
-            now = fields.Datetime.now()
-        start_h = channel.quiet_hours_start or 8
-        end_h = channel.quiet_hours_end or 20
-        # Weekend check
-        if now.weekday() >= 5 and not self.campaign_id.send_on_weekends:
-            return True
-        current_h = now.hour + now.minute / 60.0
-        return not (start_h <= current_h < end_h)
-
-    def _next_permitted_window(self, channel):
-        tz_name = self._get_partner_tz()
+    # ---------- Quiet hours ----------
+    @api.model
+    def _next_allowed_at(self, tz_name, channels, campaign, now=None):
+        """Earliest UTC time (naive) >= now at which any of `channels` may
+        send to a recipient in `tz_name`. Pure computation, so callers can
+        evaluate it once per timezone bucket."""
+        now = now or fields.Datetime.now()
+        if not channels:
+            return now
         try:
-            import pytz
-            local = fields.Datetime.now().replace(tzinfo=pytz.UTC).astimezone(pytz.timezone(tz_name))
-        except Exception:
-            local = fields.Datetime.now()
-        start_h = int(channel.quiet_hours_start or 8)
-        # Next day's start
-        next_local = local.replace(hour=start_h, minute=0, second=0, microsecond=0)
-        if next_local <= local:
-            next_local = next_local + timedelta(days=1)
-        # Skip weekends if configured
-        while (next_local.weekday() >= 5 and
-               not self.campaign_id.send_on_weekends):
-            next_local = next_local + timedelta(days=1)
-        try:
-            import pytz
-            return next_local.astimezone(pytz.UTC).replace(tzinfo=None)
-        except Exception:
-            return next_local
+            tz = pytz.timezone(tz_name or 'UTC')
+        except pytz.UnknownTimeZoneError:
+            tz = pytz.UTC
+        local = pytz.UTC.localize(now).astimezone(tz).replace(tzinfo=None)
+        best = None
+        for channel in channels:
+            candidate = _next_allowed_local(
+                local, channel.quiet_hours_start or 8,
+                channel.quiet_hours_end or 20, campaign.send_on_weekends)
+            if best is None or candidate < best:
+                best = candidate
+        if best <= local:
+            return now
+        return tz.localize(best).astimezone(pytz.UTC).replace(tzinfo=None)
 
     def _get_partner_tz(self):
-        campaign = self.campaign_id
+        return self._tz_for_partner(self.campaign_id, self.partner_id)
+
+    @api.model
+    def _tz_for_partner(self, campaign, partner):
         if campaign.partner_timezone_source == 'partner':
-            return self.partner_id.tz or self.env.company.tz or 'UTC'
+            return partner.tz or self.env.company.tz or 'UTC'
         if campaign.partner_timezone_source == 'company':
             return self.env.company.tz or 'UTC'
         return 'UTC'
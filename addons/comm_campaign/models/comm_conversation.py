@@ -47,10 +47,8 @@ class CommConversation(models.Model):
         events = self.env['comm.billing.event'].search([
             ('conversation_id', '=', self.id),
         ])
-        send.write({
-            'billed_usd': sum(events.mapped('price_usd')),
-            'billed_local': sum(events.mapped('price_local')),
-        })
+        send._settle_billing(sum(events.mapped('price_usd')),
+                             sum(events.mapped('price_local')))
 
     @api.model
     def cron_purge_walker_previews(self):
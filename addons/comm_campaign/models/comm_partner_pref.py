@@ -53,6 +53,65 @@ class CommPartnerCommunicationPreference(models.Model):
         # at partner creation; enforcement is on the acquisition side, not here)
         return True
 
+    # ---------- Bulk consent ----------
+    # Per-transaction memo of opted_in_map() answers, kept on the cursor so it
+    # dies with the transaction. Keyed (partner_id, channel_id, purpose).
+    _OPTED_IN_CACHE = 'comm_partner_pref.opted_in'
+
+    @api.model
+    def opted_in_map(self, partner_ids, channels, purpose='marketing'):
+        """Bulk `is_opted_in`: {(partner_id, channel_id): bool} for every
+        combination, answered with at most one query per transaction."""
+        if isinstance(partner_ids, models.BaseModel):
+            partner_ids = partner_ids.ids
+        channel_ids = (channels.ids if isinstance(channels, models.BaseModel)
+                       else list(channels))
+        if purpose in ('authentication', 'transactional'):
+            return {(pid, cid): True for pid in partner_ids for cid in channel_ids}
+
+        cache = self.env.cr.cache.setdefault(self._OPTED_IN_CACHE, {})
+        missing = list({pid for pid in partner_ids for cid in channel_ids
+                        if (pid, cid, purpose) not in cache})
+        if missing:
+            self.env['res.partner'].flush_model(['marketing_opt_out'])
+            self.flush_model(['partner_id', 'channel_id', 'purpose', 'opted_in'])
+            self.env.cr.execute("""
+                SELECT p.id, ch.id, p.marketing_opt_out, pref.opted_in
+                  FROM res_partner p
+            CROSS JOIN unnest(%(channel_ids)s::int[]) AS ch(id)
+             LEFT JOIN comm_partner_communication_preference pref
+                    ON pref.partner_id = p.id
+                   AND pref.channel_id = ch.id
+                   AND pref.purpose = %(purpose)s
+                 WHERE p.id = ANY(%(partner_ids)s)
+            """, {'channel_ids': channel_ids, 'partner_ids': missing,
+                  'purpose': purpose})
+            for pid, cid, opt_out, opted_in in self.env.cr.fetchall():
+                if opt_out:
+                    cache[(pid, cid, purpose)] = False
+                else:
+                    # No preference row → default opt-in, as in is_opted_in
+                    cache[(pid, cid, purpose)] = opted_in is not False
+        return {(pid, cid): cache.get((pid, cid, purpose), True)
+                for pid in partner_ids for cid in channel_ids}
+
+    @api.model
+    def _invalidate_opted_in_cache(self):
+        self.env.cr.cache.pop(self._OPTED_IN_CACHE, None)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self._invalidate_opted_in_cache()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self._invalidate_opted_in_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        self._invalidate_opted_in_cache()
+        return super().unlink()
+
     @api.model
     def opt_out(self, partner, channel, purpose='marketing',
                 reason=None, source='manual'):
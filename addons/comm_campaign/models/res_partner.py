@@ -8,3 +8,9 @@ class ResPartner(models.Model):
     communication_preference_ids = fields.One2many(
         'comm.partner.communication.preference', 'partner_id',
         string='Communication Preferences')
+
+    def write(self, vals):
+        if 'marketing_opt_out' in vals:
+            self.env['comm.partner.communication.preference'] \
+                ._invalidate_opted_in_cache()
+        return super().write(vals)
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+from . import test_partner_pref
+from . import test_quiet_hours
+from . import test_campaign_throttle
+from . import test_campaign_budget
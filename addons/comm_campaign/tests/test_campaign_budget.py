@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""Spend ledger: reservations, settlement, rollback and reconciliation,
+plus workers racing on one committed ledger."""
+import multiprocessing
+
+import psycopg2
+
+from odoo import SUPERUSER_ID, api
+from odoo.modules.registry import Registry
+from odoo.sql_db import connection_info_for
+from odoo.tests import tagged, common
+
+from ..models.comm_campaign_budget import RESERVE_SQL, SETTLE_SQL, ledger_statement
+
+
+@tagged('comm_campaign', 'budget', 'post_install', '-at_install')
+class TestCampaignBudget(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        bot = cls.env['comm.bot'].create({'name': 'Budget bot'})
+        cls.campaign = cls.env['comm.campaign'].create({
+            'name': 'Budget', 'bot_id': bot.id,
+            'budget_cap_local': 100.0, 'hard_stop_at_cap': True,
+        })
+        cls.Budget = cls.env['comm.campaign.budget']
+
+    def setUp(self):
+        super().setUp()
+        # Ledger movements commit on their own cursor; keep them in the test.
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+        # Undo bookkeeping lives on the class cursor; start each test clean.
+        self.cr.postrollback.clear()
+        self.addCleanup(self.cr.postrollback.clear)
+
+    def test_reserve_stops_at_cap(self):
+        self.assertEqual(self.Budget._reserve(self.campaign, 3.0, 30), 30)
+        self.assertEqual(self.Budget._reserve(self.campaign, 3.0, 30), 3)
+        self.assertEqual(self.Budget._reserve(self.campaign, 3.0, 30), 0)
+        self.assertAlmostEqual(self.Budget._spent(self.campaign), 99.0)
+        self.assertEqual(self.campaign._check_budget(), 'warn')
+
+    def test_settle_swaps_reservation_for_actual(self):
+        partner = self.env['res.partner'].create({'name': 'Settled'})
+        send = self.env['comm.campaign.send'].create({
+            'campaign_id': self.campaign.id, 'partner_id': partner.id,
+        })
+        self.Budget._reserve(self.campaign, 5.0, 1)
+        send.reserved_local = 5.0
+        send._settle_billing(0.1, 2.0)
+        self.assertAlmostEqual(self.Budget._spent(self.campaign), 2.0)
+        self.assertAlmostEqual(self.Budget._average_settled(self.campaign), 2.0)
+        # A second roll-up for the same send only books the difference.
+        send._settle_billing(0.15, 3.0)
+        self.assertAlmostEqual(self.Budget._spent(self.campaign), 3.0)
+        self.Budget._reconcile(self.campaign)
+        self.assertAlmostEqual(self.Budget._spent(self.campaign), 3.0)
+
+    def test_interleaved_batches_never_overshoot_one_batch(self):
+        # Four workers take turns reserving; each settles its previous batch
+        # (20% over the estimate) only after the others reserved theirs.
+        # This checks the ledger arithmetic, not Postgres row locking.
+        unit, batch, cap = 1.5, 7, self.campaign.budget_cap_local
+        campaign = self.campaign
+        launched, outstanding = [], [0] * 4
+        while True:
+            fits = []
+            for worker in range(4):
+                if outstanding[worker]:
+                    fit = outstanding[worker]
+                    self.Budget._settle(campaign, fit * unit, fit * unit * 1.2, fit)
+                outstanding[worker] = self.Budget._reserve(campaign, unit, batch)
+                fits.append(outstanding[worker])
+            launched.extend(fits)
+            if not any(fits):
+                break
+        actual = sum(launched) * unit * 1.2
+        self.assertLessEqual(actual, cap + batch * unit * 1.2)
+        self.assertGreaterEqual(self.Budget._spent(campaign), cap - unit)
+
+    def test_rollback_undoes_ledger_movements(self):
+        self.Budget._reserve(self.campaign, 3.0, 10)
+        self.Budget._settle(self.campaign, 6.0, 7.0, 2)
+        self.Budget._release(self.campaign, 3.0)
+        self.assertAlmostEqual(self.Budget._spent(self.campaign), 28.0)
+        # What the cursor runs after rolling back the batch transaction.
+        self.cr.postrollback.run()
+        self.assertAlmostEqual(self.Budget._spent(self.campaign), 0.0)
+        self.assertIsNone(self.Budget._average_settled(self.campaign))
+
+    def test_reconcile_sees_released_reservations(self):
+        partners = self.env['res.partner'].create(
+            [{'name': f'Reconcile {i}'} for i in range(3)])
+        sends = self.env['comm.campaign.send'].create([
+            {'campaign_id': self.campaign.id, 'partner_id': p.id} for p in partners])
+        self.Budget._reserve(self.campaign, 4.0, 3)
+        sends.write({'reserved_local': 4.0})
+        sends[1:]._release_reservation()
+        self.Budget._reconcile(self.campaign)
+        self.assertAlmostEqual(self.Budget._spent(self.campaign), 4.0)
+
+
+def _spend_budget(dbname, campaign_id, cap, unit, batch, results):
+    """Child process: reserve batches until nothing fits, settling each one
+    20% over its estimate, on a private connection like a prefork worker."""
+    _dsn, connection_info = connection_info_for(dbname)
+    conn = psycopg2.connect(**connection_info)
+    conn.set_session(isolation_level='READ COMMITTED')
+    try:
+        launched = 0
+        while True:
+            with conn.cursor() as cr:
+                fit = ledger_statement(cr, campaign_id, SUPERUSER_ID, RESERVE_SQL, {
+                    'count': batch, 'cap': cap, 'unit': unit,
+                })[0]
+            conn.commit()
+            if not fit:
+                break
+            launched += fit
+            with conn.cursor() as cr:
+                ledger_statement(cr, campaign_id, SUPERUSER_ID, SETTLE_SQL, {
+                    'released': fit * unit, 'billed': fit * unit * 1.2, 'newly': fit,
+                })
+            conn.commit()
+        results.put(launched)
+    finally:
+        conn.close()
+
+
+@tagged('comm_campaign', 'budget', 'post_install', '-at_install')
+class TestCampaignBudgetMultiProcess(common.BaseCase):
+    """The cap must hold across processes reserving at the same time."""
+
+    def test_racing_workers_overshoot_by_at_most_one_batch(self):
+        dbname = common.get_db_name()
+        registry = Registry(dbname)
+        cap, unit, batch, processes = 300.0, 1.5, 7, 4
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            campaign = env['comm.campaign'].create({
+                'name': 'Budget race',
+                'bot_id': env['comm.bot'].create({'name': 'Budget race bot'}).id,
+                'budget_cap_local': cap, 'hard_stop_at_cap': True,
+            })
+            campaign_id, bot_id = campaign.id, campaign.bot_id.id
+        ctx = multiprocessing.get_context('fork')
+        results = ctx.Queue()
+        workers = [
+            ctx.Process(target=_spend_budget,
+                        args=(dbname, campaign_id, cap, unit, batch, results))
+            for _i in range(processes)
+        ]
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join(60)
+            launched = sum(results.get(timeout=5) for _w in workers)
+        finally:
+            with registry.cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                env['comm.campaign'].browse(campaign_id).unlink()
+                env['comm.bot'].browse(bot_id).unlink()
+
+        # Reservations never pass the cap; only the overrun of the batches
+        # still in flight when the last one was reserved can land above it.
+        # Workers stop once not even one more send fits.
+        actual = launched * unit * 1.2
+        self.assertLessEqual(actual, cap + batch * unit * 1.2)
+        self.assertGreater(actual, cap - unit)
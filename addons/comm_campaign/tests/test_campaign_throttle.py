@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Parallel workers: SKIP LOCKED claiming and the shared token bucket."""
+from odoo.tests import tagged, common
+
+
+@tagged('comm_campaign', 'throttle', 'post_install', '-at_install')
+class TestCampaignThrottle(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        bot = cls.env['comm.bot'].create({'name': 'Throttle bot'})
+        cls.campaign = cls.env['comm.campaign'].create({
+            'name': 'Throttle', 'bot_id': bot.id, 'throttle_per_minute': 40,
+        })
+        partners = cls.env['res.partner'].create(
+            [{'name': f'Recipient {i}'} for i in range(20)])
+        cls.sends = cls.env['comm.campaign.send'].create([
+            {'campaign_id': cls.campaign.id, 'partner_id': p.id}
+            for p in partners])
+
+    def setUp(self):
+        super().setUp()
+        # _take() commits on its own cursor; keep it inside the test txn.
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+
+    def test_bucket_caps_burst(self):
+        Throttle = self.env['comm.campaign.throttle']
+        # Burst is a quarter minute of throughput: 40 / 4 = 10 tokens.
+        self.assertEqual(Throttle._take(self.campaign, 25), 10)
+        self.assertEqual(Throttle._take(self.campaign, 25), 0)
+
+    def test_partitions_are_disjoint(self):
+        Send = self.env['comm.campaign.send']
+        claimed = [Send._claim(self.campaign, 100, k, 3) for k in range(3)]
+        for k, part in enumerate(claimed):
+            self.assertTrue(all(s.id % 3 == k for s in part))
+        self.assertEqual(sum(len(p) for p in claimed), len(self.sends))
+
+    def test_claim_skips_future_sends(self):
+        later = self.sends[:5]
+        later.write({'next_attempt_at': '2099-01-01 00:00:00'})
+        claimed = self.env['comm.campaign.send']._claim(self.campaign, 100)
+        self.assertFalse(claimed & later)
+        self.assertEqual(len(claimed), len(self.sends) - 5)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Bulk consent: opted_in_map must agree with is_opted_in everywhere."""
+from odoo.tests import tagged, common
+
+from odoo.addons.comm_campaign.models.comm_partner_pref import PURPOSE_SELECTION
+
+
+@tagged('comm_campaign', 'consent', 'post_install', '-at_install')
+class TestPartnerPref(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Pref = cls.env['comm.partner.communication.preference']
+        cls.channels = (cls.env.ref('comm_chatbot.channel_whatsapp')
+                        | cls.env.ref('comm_chatbot.channel_sms'))
+        Partner = cls.env['res.partner']
+        cls.explicit_in = Partner.create({'name': 'Explicit in'})
+        cls.explicit_out = Partner.create({'name': 'Explicit out'})
+        cls.missing = Partner.create({'name': 'No rows'})
+        cls.global_out = Partner.create({'name': 'Global opt-out',
+                                         'marketing_opt_out': True})
+        cls.mixed = Partner.create({'name': 'Mixed'})
+        wa, sms = cls.channels
+        for purpose, _label in PURPOSE_SELECTION:
+            for channel in cls.channels:
+                cls.Pref.create({'partner_id': cls.explicit_in.id,
+                                 'channel_id': channel.id,
+                                 'purpose': purpose, 'opted_in': True})
+                cls.Pref.create({'partner_id': cls.explicit_out.id,
+                                 'channel_id': channel.id,
+                                 'purpose': purpose, 'opted_in': False})
+                cls.Pref.create({'partner_id': cls.global_out.id,
+                                 'channel_id': channel.id,
+                                 'purpose': purpose, 'opted_in': True})
+            cls.Pref.create({'partner_id': cls.mixed.id, 'channel_id': wa.id,
+                             'purpose': purpose, 'opted_in': False})
+        cls.partners = (cls.explicit_in | cls.explicit_out | cls.missing
+                        | cls.global_out | cls.mixed)
+
+    def _assert_agrees(self):
+        for purpose, _label in PURPOSE_SELECTION:
+            bulk = self.Pref.opted_in_map(self.partners, self.channels, purpose)
+            for partner in self.partners:
+                for channel in self.channels:
+                    self.assertEqual(
+                        bulk[(partner.id, channel.id)],
+                        self.Pref.is_opted_in(partner, channel, purpose),
+                        f'{partner.name} / {channel.code} / {purpose}')
+
+    def test_bulk_matches_single(self):
+        self._assert_agrees()
+
+    def test_single_query_per_batch(self):
+        self.Pref._invalidate_opted_in_cache()
+        self.env.flush_all()
+        with self.assertQueryCount(1):
+            self.Pref.opted_in_map(self.partners, self.channels, 'marketing')
+        with self.assertQueryCount(0):
+            self.Pref.opted_in_map(self.partners, self.channels, 'marketing')
+
+    def test_cache_invalidated_on_write(self):
+        self._assert_agrees()
+        self.Pref.opt_out(self.missing, self.channels[:1], 'marketing')
+        self.Pref.search([('partner_id', '=', self.explicit_out.id)]).write(
+            {'opted_in': True})
+        self.global_out.marketing_opt_out = False
+        self._assert_agrees()
+        self.Pref.search([('partner_id', '=', self.mixed.id)]).unlink()
+        self._assert_agrees()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Quiet hours: next-allowed-at per timezone bucket."""
+from datetime import datetime
+
+from odoo.tests import tagged, common
+
+
+@tagged('comm_campaign', 'quiet_hours', 'post_install', '-at_install')
+class TestQuietHours(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Send = cls.env['comm.campaign.send']
+        cls.sms = cls.env.ref('comm_chatbot.channel_sms')
+        cls.sms.write({'quiet_hours_start': 8.0, 'quiet_hours_end': 20.0})
+        cls.campaign = cls.env['comm.campaign'].new({'send_on_weekends': False})
+
+    def test_inside_window_is_now(self):
+        # Wed 2026-06-17 10:00 UTC = 12:00 SAST
+        now = datetime(2026, 6, 17, 10, 0)
+        self.assertEqual(self.Send._next_allowed_at(
+            'Africa/Johannesburg', self.sms, self.campaign, now), now)
+
+    def test_evening_defers_to_next_morning_local(self):
+        # Wed 19:30 UTC = 21:30 SAST → Thu 08:00 SAST = 06:00 UTC
+        self.assertEqual(self.Send._next_allowed_at(
+            'Africa/Johannesburg', self.sms, self.campaign,
+            datetime(2026, 6, 17, 19, 30)), datetime(2026, 6, 18, 6, 0))
+
+    def test_weekend_skipped(self):
+        # Fri 19:30 UTC = 21:30 SAST → Mon 08:00 SAST
+        self.assertEqual(self.Send._next_allowed_at(
+            'Africa/Johannesburg', self.sms, self.campaign,
+            datetime(2026, 6, 19, 19, 30)), datetime(2026, 6, 22, 6, 0))
+
+    def test_earliest_channel_wins(self):
+        wa = self.env.ref('comm_chatbot.channel_whatsapp')
+        wa.write({'quiet_hours_start': 6.0, 'quiet_hours_end': 22.0})
+        # Wed 05:00 UTC = 07:00 SAST: SMS closed, WhatsApp open
+        now = datetime(2026, 6, 17, 5, 0)
+        self.assertEqual(self.Send._next_allowed_at(
+            'Africa/Johannesburg', self.sms | wa, self.campaign, now), now)
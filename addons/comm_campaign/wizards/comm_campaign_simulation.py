@@ -14,7 +14,6 @@ Improvements over v1:
   channel in priority order — shows what recipient #1 will actually see.
 """
 import logging
-import phonenumbers
 from collections import defaultdict
 from odoo import models, fields, api
 from odoo.exceptions import UserError
@@ -165,10 +164,11 @@ class CommCampaignSimulation(models.TransientModel):
         Registry = self.env['comm.chatbot.registry']
         priority = campaign.channel_priority_ids.sorted('sequence')
 
+        consent = Pref.opted_in_map(partners, priority, campaign.purpose)
+
         first_reachable = None
         for partner in partners:
-            assigned = self._pick_channel(partner, priority, Registry, Pref,
-                                          campaign.purpose)
+            assigned = self._pick_channel(partner, priority, Registry, consent)
             if assigned == 'opted_out':
                 opted_out_ids.append(partner.id)
                 continue
@@ -289,7 +289,8 @@ class CommCampaignSimulation(models.TransientModel):
             raise UserError(f'Invalid audience_domain: {e}')
         return self.env['res.partner'].search(domain)
 
-    def _pick_channel(self, partner, priority, Registry, Pref, purpose):
+    def _pick_channel(self, partner, priority, Registry, consent):
+        """`consent` is a prefetched `opted_in_map` over the audience."""
         for channel in priority:
             adapter_cls = Registry.get_adapter_for_channel(channel)
             if not adapter_cls:
@@ -299,7 +300,7 @@ class CommCampaignSimulation(models.TransientModel):
                     continue
             except Exception:
                 continue
-            if not Pref.is_opted_in(partner, channel, purpose):
+            if not consent.get((partner.id, channel.id), True):
                 return 'opted_out'
             return channel
         return None
@@ -308,17 +309,13 @@ class CommCampaignSimulation(models.TransientModel):
     def _country_for_partner(self, partner):
         if partner.country_id:
             return partner.country_id
+        Event = self.env['comm.billing.event']
         for candidate in (partner.mobile, partner.phone):
             if not candidate:
                 continue
-            try:
-                num = phonenumbers.parse('+' + candidate.lstrip('+'))
-                code = phonenumbers.region_code_for_number(num)
-                if code:
-                    return self.env['res.country'].search(
-                        [('code', '=', code)], limit=1)
-            except Exception:
-                continue
+            country = Event._country_from_wa_id(candidate)
+            if country:
+                return country
         return self.env.ref('base.za', raise_if_not_found=False)
 
     # ---------- Bot graph analysis ----------
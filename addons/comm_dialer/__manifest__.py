@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'Comm Dialer — Progressive / Predictive',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.5.0',
     'category': 'Communications',
     'summary': 'Outbound dialer: campaigns, call lists, agent pacing (preview / progressive / predictive)',
     'description': """
@@ -16,11 +16,20 @@ this layer models everything above the telephony:
 - **comm.dialer.campaign** — mode (preview/progressive/predictive), caller-ID
   (a comm.voip.account), calling window, retry policy, pacing ratio + abandon
   governor, live stats.
+- **comm.dialer.campaign.stats** — decayed rolling counters (attempts,
+  answers, abandons, handle time) the predictive governor paces from.
 - **comm.dialer.contact** — the call-list rows with per-contact state machine,
   attempts, retry scheduling and last disposition.
 - **comm.dialer.agent.session** — agent presence (offline/ready/on_call/wrap/
   paused) that the pacer reads to decide how many lines to open.
-- **comm.dialer.dnc** — Do-Not-Call list (POPIA / CPA), checked before every dial.
+- **comm.dialer.dnc** — Do-Not-Call list (POPIA / CPA), checked before every dial
+  and when contacts are loaded. National registers are bulk-imported via COPY;
+  each worker keeps a compact in-memory copy of the list.
+
+``pacing_sim.py`` replays a campaign on a simulated clock (seeded ring,
+answer, AMD and handle-time draws) through the real pacer, for repeatable
+abandonment / occupancy / queries-per-tick numbers; see
+tests/test_pacing_simulation.py.
 
 Pacing runs from a cron (**disabled by default** — enable it once a real
 provider is wired into comm.voip.account.originate/bridge).
@@ -39,6 +48,7 @@ provider is wired into comm.voip.account.originate/bridge).
         'views/comm_dialer_contact_views.xml',
         'views/comm_dialer_agent_views.xml',
         'views/comm_dialer_dnc_views.xml',
+        'wizards/comm_dialer_dnc_import_views.xml',
         'views/comm_voip_recording_views.xml',
         'views/whatsapp_call_transcript_views.xml',
     ],
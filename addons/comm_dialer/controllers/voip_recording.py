@@ -4,12 +4,15 @@
 The agent softphone (JsSIP) mixes both audio tracks in the browser and posts the
 result here; playback is served back inline for anyone who can read the call, and
 download is gated to Call Recording Managers.
+
+Uploads are copied to the filestore in chunks and playback streams the file with
+Range / 206 support, so the player can seek and no request holds a whole
+recording in memory.
 """
-import base64
 import logging
 
 from odoo import http
-from odoo.http import request
+from odoo.http import Stream, request
 
 _logger = logging.getLogger(__name__)
 
@@ -31,26 +34,22 @@ class VoipRecordingController(http.Controller):
         audio_file = request.httprequest.files.get('recording')
         if not audio_file:
             return request.make_json_response({'success': False, 'error': 'Missing recording file'}, status=400)
-        data = audio_file.read()
-        if not data:
-            return request.make_json_response({'success': False, 'error': 'Empty recording'}, status=400)
-
         duration_raw = request.httprequest.form.get('duration')
         try:
             duration_seconds = max(0, int(float(duration_raw))) if duration_raw else 0
         except (TypeError, ValueError):
             duration_seconds = 0
 
-        attachment = request.env['ir.attachment'].sudo().create({
+        attachment = request.env['ir.attachment'].sudo()._create_from_stream(audio_file.stream, {
             'name': 'voip_recording_%s.webm' % (call.external_id or call.id),
             'res_model': 'comm.voip.call',
             'res_id': call.id,
             'res_field': 'recording_ids',
-            'type': 'binary',
-            'datas': base64.b64encode(data),
             'mimetype': audio_file.mimetype or 'audio/webm',
             'recording_duration': duration_seconds,
         })
+        if not attachment:
+            return request.make_json_response({'success': False, 'error': 'Empty recording'}, status=400)
         # Keep the legacy single-URL field pointing at the latest recording too,
         # and queue the recording for transcription (the cron picks it up).
         call.write({
@@ -58,7 +57,7 @@ class VoipRecordingController(http.Controller):
             'transcript_state': 'pending',
         })
         _logger.info('comm_dialer: stored recording (%d bytes) for call %s as attachment %s',
-                     len(data), call_id, attachment.id)
+                     attachment.file_size, call_id, attachment.id)
         return request.make_json_response({'success': True, 'attachment_id': attachment.id})
 
     @http.route(
@@ -85,12 +84,8 @@ class VoipRecordingController(http.Controller):
                 {'error': 'Downloading recordings requires Call Recording Manager rights.'},
                 status=403)
 
-        data = base64.b64decode(attachment.datas or b'')
-        disposition = 'attachment' if want_download else 'inline'
-        headers = [
-            ('Content-Type', attachment.mimetype or 'audio/webm'),
-            ('Content-Length', str(len(data))),
-            ('Content-Disposition', '%s; filename="%s"' % (disposition, attachment.name)),
-            ('Cache-Control', 'private, max-age=0'),
-        ]
-        return request.make_response(data, headers=headers)
+        # Conditional response: ETag (the checksum), Accept-Ranges and
+        # 206 Partial Content for Range requests, streamed from disk.
+        response = Stream.from_attachment(attachment).get_response(as_attachment=want_download)
+        response.headers['Cache-Control'] = 'private, max-age=0'
+        return response
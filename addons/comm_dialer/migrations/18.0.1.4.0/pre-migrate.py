@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Drop duplicate call interactions before comm.voip.call's init builds the
+unique index on comm_interaction (source_id) for VoIP calls.
+
+The earlier sync looked the interaction up and created it if missing, so
+two workers closing the same call could each create one. The most recently
+written row per call is kept; billing events on a dropped duplicate move to
+the kept row.
+"""
+
+import logging
+
+from odoo.tools.sql import column_exists
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    cr.execute(
+        """
+        CREATE TEMPORARY TABLE voip_interaction_dupes ON COMMIT DROP AS
+        SELECT id, keep_id
+          FROM (SELECT id,
+                       first_value(id) OVER (
+                           PARTITION BY source_id
+                           ORDER BY write_date DESC NULLS LAST, id DESC
+                       ) AS keep_id
+                  FROM comm_interaction
+                 WHERE source_model = 'comm.voip.call') interactions
+         WHERE id <> keep_id
+        """
+    )
+    if column_exists(cr, 'comm_billing_event', 'interaction_id'):
+        cr.execute(
+            """
+            UPDATE comm_billing_event e
+               SET interaction_id = d.keep_id
+              FROM voip_interaction_dupes d
+             WHERE e.interaction_id = d.id
+            """
+        )
+    cr.execute(
+        """
+        DELETE FROM comm_interaction i
+         USING voip_interaction_dupes d
+         WHERE i.id = d.id
+        """
+    )
+    _logger.info("Dropped %s duplicate VoIP call interactions", cr.rowcount)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Merge Do-Not-Call entries that only differ in format before the unique
+constraint moves from ``number`` to ``number_normalized``.
+
+'082 123 4567' and '+27821234567' were separate rows under the old
+constraint. Without this the new one cannot be added, Odoo only logs that,
+and the bulk import's ON CONFLICT DO NOTHING stops de-duplicating;
+databases that already upgraded without it get it on this update. The
+column is filled here with the same rules the model uses, so the ORM does
+not recompute it; per normalised number the oldest entry linked to a
+contact is kept.
+"""
+
+import logging
+
+from odoo.addons.comm_dialer.models.comm_dialer_dnc import (
+    DEFAULT_COUNTRY_CODE, _NORMALIZE_SQL,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    cr.execute("SELECT value FROM ir_config_parameter WHERE key = 'comm_dialer.country_code'")
+    row = cr.fetchone()
+    country_code = (row and row[0]) or DEFAULT_COUNTRY_CODE
+    cr.execute(
+        """
+        ALTER TABLE comm_dialer_dnc
+            ADD COLUMN IF NOT EXISTS number_normalized varchar
+        """
+    )
+    cr.execute(
+        """
+        UPDATE comm_dialer_dnc dnc
+           SET number_normalized = NULLIF({normalize}, '')
+          FROM (SELECT id, regexp_replace(coalesce(number, ''), '\\D', '', 'g') AS d
+                  FROM comm_dialer_dnc) digits
+         WHERE digits.id = dnc.id
+        """.format(normalize=_NORMALIZE_SQL),
+        {'country_code': country_code},
+    )
+    cr.execute(
+        """
+        DELETE FROM comm_dialer_dnc dnc
+         USING (SELECT id,
+                       row_number() OVER (
+                           PARTITION BY number_normalized
+                           ORDER BY partner_id IS NULL, id
+                       ) AS rank
+                  FROM comm_dialer_dnc
+                 WHERE number_normalized IS NOT NULL) ranked
+         WHERE ranked.id = dnc.id AND ranked.rank > 1
+        """
+    )
+    _logger.info("Merged %s Do-Not-Call entries with the same normalised number", cr.rowcount)
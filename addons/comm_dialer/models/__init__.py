@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from . import res_users
+from . import res_partner
 from . import ir_attachment
 from . import transcription_mixin
 from . import comm_voip_account
@@ -7,5 +8,6 @@ from . import comm_voip_call
 from . import whatsapp_call_log
 from . import comm_dialer_dnc
 from . import comm_dialer_campaign
+from . import comm_dialer_campaign_stats
 from . import comm_dialer_contact
 from . import comm_dialer_agent
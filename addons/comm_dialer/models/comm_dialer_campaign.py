@@ -59,6 +59,10 @@ class CommDialerCampaign(models.Model):
                                             "keep dropped (abandoned) calls at or below this.")
     max_lines = fields.Integer('Max Concurrent Lines', default=0,
                                help="Hard cap on simultaneous live calls (0 = unlimited).")
+    stats_half_life = fields.Float('Rate Half-life (min)', default=30.0,
+                                   help="How fast the governor forgets: a call's weight in the "
+                                        "rolling answer/abandon rates halves every this many "
+                                        "minutes.")
 
     # ── Dry-run (simulated telephony — no provider needed) ────────────────
     simulate = fields.Boolean(
@@ -83,6 +87,9 @@ class CommDialerCampaign(models.Model):
     live_calls = fields.Integer('Live Calls', compute='_compute_stats')
     connect_rate = fields.Float('Connect %', compute='_compute_stats')
     abandon_rate = fields.Float('Abandon %', compute='_compute_stats')
+    rolling_answer_rate = fields.Float('Rolling Answer %', compute='_compute_rolling_stats')
+    rolling_abandon_rate = fields.Float('Rolling Abandon %', compute='_compute_rolling_stats')
+    avg_handle_time = fields.Float('Avg Handle Time (s)', compute='_compute_rolling_stats')
 
     def _compute_stats(self):
         Call = self.env['comm.voip.call']
@@ -103,6 +110,17 @@ class CommDialerCampaign(models.Model):
             c.connect_rate = (100.0 * connected / attempted) if attempted else 0.0
             c.abandon_rate = (100.0 * abandoned / connected) if connected else 0.0
 
+    def _compute_rolling_stats(self):
+        Stats = self.env['comm.dialer.campaign.stats']
+        for c in self:
+            counters = Stats._current(c)
+            handled = counters['answers'] - counters['abandons']
+            c.rolling_answer_rate = (100.0 * counters['answers'] / counters['attempts']
+                                     if counters['attempts'] else 0.0)
+            c.rolling_abandon_rate = (100.0 * counters['abandons'] / counters['answers']
+                                      if counters['answers'] else 0.0)
+            c.avg_handle_time = counters['handle_time'] / handled if handled > 0 else 0.0
+
     # ── State transitions ────────────────────────────────────────────────
     def action_start(self):
         for c in self:
@@ -141,27 +159,90 @@ class CommDialerCampaign(models.Model):
             '|', ('next_attempt', '=', False), ('next_attempt', '<=', now),
         ], order='sequence, id', limit=1)
 
-    def _answer_rate(self, window=200):
-        """Rolling answer rate (answered / dialed) over the last `window`
-        attempts on this campaign. Falls back to a cold-start assumption until
-        enough calls have accumulated to be meaningful."""
+    def _claim_contacts(self, limit):
+        """Claim up to ``limit`` dialable rows in one statement.
+
+        Picks eligible rows (same rules as :meth:`_next_contact`) in call-list
+        order, locking them with SKIP LOCKED so concurrent pacers never dial
+        the same row, and marks them ``dialing``. Rows whose number is on the
+        DNC list are marked ``dnc`` by the same statement; if they ate into
+        the batch, the next round fills it up. Cost per tick is a statement
+        or two however many lines are opened.
+
+        :return: comm.dialer.contact recordset, in call-list order
+        """
         self.ensure_one()
-        Call = self.env['comm.voip.call']
-        dialed = Call.search([('dialer_contact_id.campaign_id', '=', self.id)],
-                             order='id desc', limit=window)
-        if len(dialed) < 20:
-            return 0.35  # cold-start guess until real data lands
-        answered = len(dialed.filtered(lambda c: c.state in ('in_progress', 'completed')))
-        return max(0.05, answered / len(dialed))
+        Contact = self.env['comm.dialer.contact']
+        if limit <= 0:
+            return Contact
+        Contact.flush_model(['campaign_id', 'state', 'attempts', 'next_attempt',
+                             'sequence', 'number_normalized'])
+        self.env['comm.dialer.dnc'].flush_model(['number_normalized'])
+        claimed = []
+        while len(claimed) < limit:
+            self.env.cr.execute("""
+                WITH picked AS (
+                    SELECT c.id, c.sequence, d.id IS NOT NULL AS is_dnc
+                      FROM comm_dialer_contact c
+                 LEFT JOIN comm_dialer_dnc d ON d.number_normalized = c.number_normalized
+                     WHERE c.campaign_id = %(campaign)s
+                       AND c.state IN ('pending', 'retry')
+                       AND c.attempts < %(max_attempts)s
+                       AND (c.next_attempt IS NULL OR c.next_attempt <= %(now)s)
+                  ORDER BY c.sequence, c.id
+                     LIMIT %(limit)s
+                       FOR UPDATE OF c SKIP LOCKED
+                )
+                UPDATE comm_dialer_contact c
+                   SET state = CASE WHEN picked.is_dnc THEN 'dnc' ELSE 'dialing' END,
+                       write_uid = %(uid)s,
+                       write_date = %(now)s
+                  FROM picked
+                 WHERE c.id = picked.id
+             RETURNING c.id, picked.is_dnc, picked.sequence
+            """, {
+                'campaign': self.id,
+                'max_attempts': self.max_attempts,
+                'now': fields.Datetime.now(),
+                'limit': limit - len(claimed),
+                'uid': self.env.uid,
+            })
+            rows = self.env.cr.fetchall()
+            dialable = [row for row in rows if not row[1]]
+            claimed += dialable
+            if len(dialable) == len(rows):
+                break
+        Contact.invalidate_model(['state', 'write_uid', 'write_date'])
+        claimed.sort(key=lambda row: (row[2], row[0]))
+        return Contact.browse([row[0] for row in claimed])
+
+    def _governor_rates(self):
+        """(answer rate, abandon rate) from the campaign's rolling counters.
+
+        Both are fractions. Until enough decayed attempts have accumulated the
+        answer rate is a cold-start guess and the abandon rate is taken as 0."""
+        self.ensure_one()
+        counters = self.env['comm.dialer.campaign.stats']._current(self)
+        if counters['attempts'] < 20:
+            return 0.35, 0.0  # cold-start guess until real data lands
+        answer_rate = max(0.05, counters['answers'] / counters['attempts'])
+        abandon_rate = counters['abandons'] / counters['answers'] if counters['answers'] else 0.0
+        return answer_rate, abandon_rate
+
+    def _answer_rate(self):
+        """Rolling answer rate (answered / dialed), see :meth:`_governor_rates`."""
+        return self._governor_rates()[0]
 
     def _lines_to_open(self, ready_count, room, live=0):
         """How many new call legs to open this tick.
 
         Progressive: one line per free agent.
-        Predictive: over-dial by pacing_ratio ÷ live answer-rate, then apply an
+        Predictive: over-dial by pacing_ratio ÷ rolling answer-rate, then apply an
         abandon governor so expected dropped calls stay within target_abandon_rate,
         and subtract calls already in flight so we target a concurrency level
-        rather than stacking every tick."""
+        rather than stacking every tick. While the rolling abandon rate is at or
+        over the ceiling, stop over-dialling (one line per agent) until it decays
+        back under."""
         self.ensure_one()
         if self.mode == 'preview' or ready_count <= 0:
             return 0
@@ -169,8 +250,10 @@ class CommDialerCampaign(models.Model):
             return max(0, min(ready_count, room))
 
         # Predictive.
-        ar = self._answer_rate()
+        ar, abandoned = self._governor_rates()
         t = min(0.99, max(0.0, self.target_abandon_rate / 100.0))
+        if abandoned >= t > 0:
+            return max(0, min(ready_count - live, room))
         # Governor: cap concurrent answers so abandon rate (1 - agents/answers) <= t
         #   answers <= ready / (1 - t)   =>   lines <= answers / ar
         lines_cap = math.floor((ready_count / max(1e-3, 1 - t)) / ar)
@@ -205,15 +288,12 @@ class CommDialerCampaign(models.Model):
         lines = self._lines_to_open(len(ready), room, live)
         free_agents = list(ready)
         opened = 0
-        for i in range(lines):
-            contact = self._next_contact()
-            if not contact:
-                break
+        for i, contact in enumerate(self._claim_contacts(lines)):
             # In progressive mode we hand the call to a specific ready agent; in
             # predictive mode we over-dial and bind an agent on answer (webhook).
             agent = free_agents[i] if (self.mode == 'progressive' and i < len(free_agents)) \
                 else self.env['comm.dialer.agent.session']
-            contact._originate(self, agent)
+            contact._originate(self, agent, check_dnc=False)
             opened += 1
 
         if opened == 0 and not self._next_contact():
@@ -244,6 +324,8 @@ class CommDialerCampaign(models.Model):
             c.contact_ids.write({'state': 'pending', 'attempts': 0,
                                  'next_attempt': False, 'last_disposition_id': False})
             c.mapped('contact_ids.call_ids').unlink()
+            self.env['comm.dialer.campaign.stats'].sudo().search(
+                [('campaign_id', '=', c.id)]).unlink()
             c.session_ids.filtered(lambda s: s.state != 'offline').write(
                 {'state': 'ready', 'current_call_id': False})
         return True
@@ -299,7 +381,7 @@ class CommDialerCampaign(models.Model):
                     # Human answered but no agent free → abandoned (predictive drop).
                     call.write({'state': 'cancelled', 'end_time': now})
                     if contact:
-                        contact.register_result('no_answer')
+                        contact.register_result('abandoned')
             else:
                 outcome = 'busy' if random.random() < 0.3 else 'no_answer'
                 call.write({'state': outcome, 'end_time': now})
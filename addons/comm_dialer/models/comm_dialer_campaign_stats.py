@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+
+# Decay factor of a stored counter at the time of the incoming update, in SQL:
+# 0.5 ** (seconds since the last update / half-life in seconds).
+_DECAY = ("power(0.5, greatest(extract(epoch FROM EXCLUDED.updated_at - s.updated_at), 0)"
+          " / %(half_life)s)")
+
+
+class CommDialerCampaignStats(models.Model):
+    """Per-campaign rolling counters for the predictive governor.
+
+    One row per campaign. Every counter is exponentially decayed with the
+    campaign's half-life, so recent calls weigh more and the rates drift
+    smoothly instead of jumping. Rows are only written through
+    :meth:`_record`, a single upsert that decays and increments in place, so
+    concurrent results (bridge workers, the simulator) never lose updates.
+    """
+    _name = 'comm.dialer.campaign.stats'
+    _description = 'Dialer Campaign Rolling Counters'
+    _rec_name = 'campaign_id'
+    _log_access = False
+
+    campaign_id = fields.Many2one('comm.dialer.campaign', 'Campaign',
+                                  required=True, ondelete='cascade')
+    attempts = fields.Float(readonly=True)
+    answers = fields.Float(readonly=True, help="Attempts picked up by a human.")
+    abandons = fields.Float(readonly=True,
+                            help="Answered calls dropped because no agent was free.")
+    handle_time = fields.Float('Handle Time (s)', readonly=True,
+                               help="Talk time of calls that reached an agent.")
+    updated_at = fields.Datetime(readonly=True)
+
+    _sql_constraints = [
+        ('campaign_uniq', 'unique(campaign_id)', 'One counter row per campaign.'),
+    ]
+
+    @api.model
+    def _record(self, campaign, attempts=0, answers=0, abandons=0, handle_time=0.0):
+        """Decay the campaign's counters to now and add the given amounts."""
+        half_life = max(campaign.stats_half_life, 1.0) * 60.0
+        self.flush_model()
+        self.env.cr.execute("""
+            INSERT INTO comm_dialer_campaign_stats AS s
+                   (campaign_id, attempts, answers, abandons, handle_time, updated_at)
+            VALUES (%(campaign)s, %(attempts)s, %(answers)s, %(abandons)s,
+                    %(handle_time)s, %(now)s)
+            ON CONFLICT (campaign_id) DO UPDATE SET
+                attempts = s.attempts * {decay} + EXCLUDED.attempts,
+                answers = s.answers * {decay} + EXCLUDED.answers,
+                abandons = s.abandons * {decay} + EXCLUDED.abandons,
+                handle_time = s.handle_time * {decay} + EXCLUDED.handle_time,
+                updated_at = greatest(s.updated_at, EXCLUDED.updated_at)
+        """.format(decay=_DECAY), {
+            'campaign': campaign.id,
+            'attempts': float(attempts),
+            'answers': float(answers),
+            'abandons': float(abandons),
+            'handle_time': float(handle_time),
+            'now': fields.Datetime.now(),
+            'half_life': half_life,
+        })
+        self.invalidate_model()
+
+    @api.model
+    def _current(self, campaign):
+        """The campaign's counters decayed to now, as a dict (zeros when none)."""
+        stats = self.search([('campaign_id', '=', campaign.id)], limit=1)
+        if not stats:
+            return dict.fromkeys(('attempts', 'answers', 'abandons', 'handle_time'), 0.0)
+        half_life = max(campaign.stats_half_life, 1.0) * 60.0
+        elapsed = max((fields.Datetime.now() - stats.updated_at).total_seconds(), 0.0)
+        factor = 0.5 ** (elapsed / half_life)
+        return {
+            'attempts': stats.attempts * factor,
+            'answers': stats.answers * factor,
+            'abandons': stats.abandons * factor,
+            'handle_time': stats.handle_time * factor,
+        }
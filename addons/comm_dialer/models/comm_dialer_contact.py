@@ -3,6 +3,8 @@ from datetime import timedelta
 
 from odoo import api, fields, models
 
+from .comm_dialer_dnc import normalize_number
+
 
 class CommDialerContact(models.Model):
     _name = 'comm.dialer.contact'
@@ -15,6 +17,7 @@ class CommDialerContact(models.Model):
     sequence = fields.Integer(default=10)
     partner_id = fields.Many2one('res.partner', 'Contact', ondelete='set null')
     number = fields.Char('Number', required=True)
+    number_normalized = fields.Char(compute='_compute_number_normalized', store=True)
     contact_label = fields.Char('Name', compute='_compute_contact_label', store=True)
 
     state = fields.Selection([
@@ -42,6 +45,52 @@ class CommDialerContact(models.Model):
         for r in self:
             r.contact_label = (r.partner_id.name or r.number or 'Contact')
 
+    @api.depends('number')
+    def _compute_number_normalized(self):
+        country_code = self.env['comm.dialer.dnc']._country_code()
+        for r in self:
+            r.number_normalized = normalize_number(r.number, country_code)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        contacts = super().create(vals_list)
+        contacts._flag_dnc()
+        return contacts
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'number' in vals:
+            self._flag_dnc()
+        return res
+
+    def _flag_dnc(self):
+        """Mark rows still waiting to be dialled whose number is on the DNC
+        list, when they are loaded rather than when they come up."""
+        waiting = self.filtered(lambda r: r.state in ('pending', 'retry'))
+        listed = self.env['comm.dialer.dnc']._listed(waiting.mapped('number_normalized'))
+        flagged = waiting.filtered(lambda r: r.number_normalized in listed)
+        if flagged:
+            flagged.state = 'dnc'
+        return flagged
+
+    @api.model
+    def _flag_dnc_pending(self):
+        """Flag every waiting row, all campaigns, whose number is on the DNC
+        list (after a bulk import), in one statement. Returns the count."""
+        self.flush_model(['state', 'number_normalized'])
+        self.env['comm.dialer.dnc'].flush_model(['number_normalized'])
+        self.env.cr.execute("""
+            UPDATE comm_dialer_contact c
+               SET state = 'dnc', write_uid = %s, write_date = %s
+              FROM comm_dialer_dnc d
+             WHERE d.number_normalized = c.number_normalized
+               AND c.state IN ('pending', 'retry')
+        """, [self.env.uid, fields.Datetime.now()])
+        flagged = self.env.cr.rowcount
+        if flagged:
+            self.invalidate_model(['state', 'write_uid', 'write_date'])
+        return flagged
+
     def _compute_call_count(self):
         for r in self:
             r.call_count = len(r.call_ids)
@@ -53,16 +102,18 @@ class CommDialerContact(models.Model):
 
     def _is_dnc(self):
         self.ensure_one()
-        if not self.number:
+        if not self.number_normalized:
             return False
-        return bool(self.env['comm.dialer.dnc'].sudo().search_count(
-            [('number', '=', self.number)]))
+        return bool(self.env['comm.dialer.dnc']._listed([self.number_normalized]))
 
-    def _originate(self, campaign, agent):
+    def _originate(self, campaign, agent, check_dnc=True):
         """Create the outgoing call leg through the provider (stub) and mark the
-        row as dialing. Returns the comm.voip.call record."""
+        row as dialing. Returns the comm.voip.call record.
+
+        ``check_dnc=False`` is for rows claimed by the pacer, whose DNC check
+        already happened in the claim statement."""
         self.ensure_one()
-        if self._is_dnc():
+        if check_dnc and self._is_dnc():
             self.state = 'dnc'
             return self.env['comm.voip.call']
         account = campaign.account_id
@@ -95,7 +146,11 @@ class CommDialerContact(models.Model):
         """Progress the row from a provider webhook or an agent wrap-up.
 
         ``outcome`` is one of: contacted / completed / no_answer / busy /
-        failed / dnc. ``disposition`` is an optional comm.disposition record.
+        failed / abandoned / dnc. ``abandoned`` is a human answer dropped for
+        lack of a free agent; the row is retried like a no-answer.
+        ``disposition`` is an optional comm.disposition record.
+
+        Also feeds the campaign's rolling governor counters.
         """
         self.ensure_one()
         campaign = self.campaign_id
@@ -103,17 +158,24 @@ class CommDialerContact(models.Model):
         if disposition:
             vals['last_disposition_id'] = getattr(disposition, 'id', disposition)
 
+        counters = {'attempts': 1}
         if outcome in ('contacted', 'completed'):
             vals['state'] = 'contacted'
-        elif outcome in ('no_answer', 'busy', 'failed'):
+            counters['answers'] = 1
+            # Latest leg first (comm.voip.call order); duration auto-fills on end.
+            counters['handle_time'] = self.call_ids[:1].duration or 0.0
+        elif outcome in ('no_answer', 'busy', 'failed', 'abandoned'):
             if self.attempts >= campaign.max_attempts:
                 vals['state'] = 'failed'
             else:
                 vals['state'] = 'retry'
                 vals['next_attempt'] = fields.Datetime.now() + timedelta(
                     hours=campaign.retry_gap_hours)
+            if outcome == 'abandoned':
+                counters.update(answers=1, abandons=1)
         elif outcome == 'dnc':
             vals['state'] = 'dnc'
+            counters['answers'] = 1
             if self.number and not self._is_dnc():
                 self.env['comm.dialer.dnc'].sudo().create({
                     'number': self.number,
@@ -121,4 +183,5 @@ class CommDialerContact(models.Model):
                     'reason': 'Requested during dialer call',
                 })
         self.write(vals)
+        self.env['comm.dialer.campaign.stats'].sudo()._record(campaign, **counters)
         return True  # XML-RPC (bridge) can't marshal a None return
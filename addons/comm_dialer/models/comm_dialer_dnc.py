@@ -1,5 +1,67 @@
 # -*- coding: utf-8 -*-
-from odoo import fields, models
+import io
+import re
+import threading
+from array import array
+from bisect import bisect_left
+
+from odoo import api, fields, models, sql_db
+
+_NON_DIGITS = re.compile(r'\D')
+DEFAULT_COUNTRY_CODE = '27'
+# Bumped after every commit that changes the list; workers reload their copy
+# of the list when it moves.
+GENERATION_SEQUENCE = 'comm_dialer_dnc_generation'
+_DIRTY_KEY = 'comm_dialer.dnc_changed'
+
+# dbname -> _NumberSet, this worker's copy of the list.
+_NUMBER_SETS = {}
+_NUMBER_SETS_LOCK = threading.Lock()
+
+
+def normalize_number(number, country_code=DEFAULT_COUNTRY_CODE):
+    """Digits of ``number`` in international form, without the '+'.
+
+    ``+27 82 123 4567``, ``0027821234567`` and ``082 123 4567`` all give
+    ``27821234567``. Returns '' when there are no digits.
+    """
+    digits = _NON_DIGITS.sub('', number or '')
+    if digits.startswith('00'):
+        return digits[2:]
+    if digits.startswith('0'):
+        return country_code + digits[1:]
+    return digits
+
+
+# Same rules in SQL, for rows that never pass through Python (bulk import).
+_NORMALIZE_SQL = """
+    CASE WHEN d LIKE '00%%' THEN substr(d, 3)
+         WHEN d LIKE '0%%' THEN %(country_code)s || substr(d, 2)
+         ELSE d END
+"""
+
+
+class _NumberSet:
+    """Normalised DNC numbers, as a sorted int64 array.
+
+    A few million numbers take 8 bytes each here, where a Python set of
+    strings would cost each worker hundreds of megabytes.
+    """
+    __slots__ = ('generation', 'numbers')
+
+    def __init__(self, generation, numbers):
+        self.generation = generation
+        self.numbers = numbers
+
+    def __contains__(self, number):
+        if not number or len(number) > 18:
+            return False
+        value = int(number)
+        i = bisect_left(self.numbers, value)
+        return i < len(self.numbers) and self.numbers[i] == value
+
+    def __len__(self):
+        return len(self.numbers)
 
 
 class CommDialerDnc(models.Model):
@@ -9,10 +71,175 @@ class CommDialerDnc(models.Model):
     _rec_name = 'number'
 
     number = fields.Char('Number', required=True, index=True)
+    number_normalized = fields.Char('Normalised Number', compute='_compute_number_normalized',
+                                    store=True, readonly=True)
     partner_id = fields.Many2one('res.partner', 'Contact', ondelete='set null')
     reason = fields.Char('Reason')
 
     _sql_constraints = [
-        ('number_uniq', 'unique(number)',
+        ('number_normalized_uniq', 'unique(number_normalized)',
          'This number is already on the Do-Not-Call list.'),
     ]
+
+    def init(self):
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % GENERATION_SEQUENCE)
+
+    @api.model
+    def _country_code(self):
+        return self.env['ir.config_parameter'].sudo().get_param(
+            'comm_dialer.country_code', DEFAULT_COUNTRY_CODE)
+
+    @api.depends('number')
+    def _compute_number_normalized(self):
+        country_code = self._country_code()
+        for r in self:
+            r.number_normalized = normalize_number(r.number, country_code)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self._list_changed()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'number' in vals:
+            self._list_changed()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._list_changed()
+        return res
+
+    # ── Worker-side copy of the list ─────────────────────────────────────
+    @api.model
+    def _list_changed(self):
+        """Bump the generation once this transaction commits.
+
+        Until then this transaction reads the table directly, so it sees its
+        own changes and nobody caches rows that may still roll back."""
+        cr = self.env.cr
+        if cr.postcommit.data.get(_DIRTY_KEY):
+            return
+        cr.precommit.data[_DIRTY_KEY] = True
+        cr.postcommit.data[_DIRTY_KEY] = True
+        dbname = cr.dbname
+
+        def bump_generation():
+            with sql_db.db_connect(dbname).cursor() as bump_cr:
+                bump_cr.execute("SELECT nextval(%s)", [GENERATION_SEQUENCE])
+        cr.postcommit.add(bump_generation)
+
+    @api.model
+    def _generation(self):
+        """Current list generation. A sequence nextval() was never called on
+        reports last_value 1, the same as after the first call, so it reads
+        as 0 until then."""
+        self.env.cr.execute(
+            "SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM %s"
+            % GENERATION_SEQUENCE)
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _number_set(self):
+        """This worker's copy of the list, reloaded when the generation moved.
+
+        The rows are loaded on a fresh cursor: the sequence is not bound to
+        any snapshot, and the caller's snapshot may predate the commit that
+        moved the generation, which would cache the old list under the new
+        generation for good."""
+        dbname = self.env.cr.dbname
+        generation = self._generation()
+        cached = _NUMBER_SETS.get(dbname)
+        if cached is not None and cached.generation == generation:
+            return cached
+        with _NUMBER_SETS_LOCK:
+            cached = _NUMBER_SETS.get(dbname)
+            if cached is None or cached.generation != generation:
+                self.flush_model(['number_normalized'])
+                with self.env.registry.cursor() as cr:
+                    cr.execute("""
+                        SELECT number_normalized::bigint
+                          FROM comm_dialer_dnc
+                         WHERE number_normalized ~ '^[0-9]{1,18}$'
+                      ORDER BY 1
+                    """)
+                    cached = _NumberSet(generation, array('q', (row[0] for row in cr.fetchall())))
+                _NUMBER_SETS[dbname] = cached
+        return cached
+
+    @api.model
+    def _listed(self, numbers):
+        """The normalised numbers among ``numbers`` (already normalised)
+        that are on the list."""
+        numbers = {n for n in numbers if n}
+        if not numbers:
+            return set()
+        if self.env.cr.precommit.data.get(_DIRTY_KEY):
+            self.flush_model(['number_normalized'])
+            self.env.cr.execute(
+                "SELECT number_normalized FROM comm_dialer_dnc WHERE number_normalized = ANY(%s)",
+                [list(numbers)])
+            return {row[0] for row in self.env.cr.fetchall()}
+        listed = self._number_set()
+        return {n for n in numbers if n in listed}
+
+    # ── Bulk import ──────────────────────────────────────────────────────
+    @api.model
+    def _import_numbers(self, numbers, reason=None):
+        """Add many numbers at once: COPY into a staging table, then one
+        INSERT of the normalised, de-duplicated rows that are not listed yet.
+
+        ``numbers`` is an iterable of raw number strings (e.g. the lines of a
+        national register). Contacts of every campaign still waiting to be
+        dialled are flagged in the same pass.
+
+        :return: (numbers added, contacts flagged)
+        """
+        cr = self.env.cr
+        self.flush_model()
+        buffer = io.StringIO()
+        for number in numbers:
+            digits = _NON_DIGITS.sub('', number or '')
+            if digits:
+                buffer.write(digits + '\n')
+        buffer.seek(0)
+        cr.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS comm_dialer_dnc_staging (d text)
+                ON COMMIT DROP
+        """)
+        cr.execute("TRUNCATE comm_dialer_dnc_staging")
+        cr.copy_expert("COPY comm_dialer_dnc_staging (d) FROM STDIN", buffer)
+        now = fields.Datetime.now()
+        cr.execute("""
+            INSERT INTO comm_dialer_dnc
+                   (number, number_normalized, reason,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT DISTINCT ON (n) n, n, %(reason)s, %(uid)s, %(now)s, %(uid)s, %(now)s
+              FROM (SELECT {normalize} AS n FROM comm_dialer_dnc_staging) staged
+             WHERE n <> ''
+          ORDER BY n
+                ON CONFLICT DO NOTHING
+        """.format(normalize=_NORMALIZE_SQL), {
+            'country_code': self._country_code(),
+            'reason': reason or 'Bulk import',
+            'uid': self.env.uid,
+            'now': now,
+        })
+        added = cr.rowcount
+        if added:
+            self.invalidate_model()
+            self._list_changed()
+        flagged = self.env['comm.dialer.contact']._flag_dnc_pending()
+        return added, flagged
+
+    @api.model
+    def action_open_import(self):
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Import Do-Not-Call Numbers',
+            'res_model': 'comm.dialer.dnc.import',
+            'view_mode': 'form',
+            'target': 'new',
+        }
@@ -1,12 +1,24 @@
 # -*- coding: utf-8 -*-
 import logging
-import re
+import select
+import time
+from collections import defaultdict
 
-from odoo import api, fields, models
+from odoo import api, fields, models, sql_db
+
+from .comm_dialer_dnc import normalize_number
+from .transcription_mixin import TRANSCRIBE_RUN_SECONDS
 
 _logger = logging.getLogger(__name__)
 RECORDING_MANAGER_GROUP = 'comm_whatsapp_calling.group_whatsapp_call_recording_manager'
 
+# Postgres channel the pacer NOTIFYs when it commits new queued dialer calls;
+# dialer_wait_pending() LISTENs on it for the ARI bridge.
+DISPATCH_CHANNEL = 'comm_dialer_dispatch'
+DISPATCH_WAIT_MAX = 50.0  # seconds; keep under the HTTP workers' time limits
+DISPATCH_FIELDS = ['id', 'to_number', 'dialer_contact_id', 'dialer_agent_session_id',
+                   'agent_sip_ext', 'dialer_campaign_id']
+
 
 class CommVoipCall(models.Model):
     # Transcription + AI insights come from the shared mixin (also on whatsapp.call.log).
@@ -43,121 +55,235 @@ class CommVoipCall(models.Model):
     recording_player_html = fields.Html(
         string='Recording', compute='_compute_recording_player_html', sanitize=False)
 
+    def init(self):
+        # One interaction per call; _sync_to_conversation finds it by source_id.
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS comm_interaction_voip_call_uniq
+                ON comm_interaction (source_id) WHERE source_model = 'comm.voip.call'
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        calls = super().create(vals_list)
+        if any(c.state == 'queued' and c.dialer_contact_id for c in calls):
+            # Delivered on commit only, and folded into one per transaction.
+            self.env.cr.execute("SELECT pg_notify(%s, '')", [DISPATCH_CHANNEL])
+        return calls
+
     def write(self, vals):
-        res = super().write(vals)
         # Whenever a call is closed out (end_time set), fill duration from the
         # span if it wasn't provided, and surface the call in the omnichannel
         # inbox as a conversation interaction — covers softphone + ARI paths.
-        if vals.get('end_time'):
+        if not vals.get('end_time'):
+            return super().write(vals)
+        if vals.get('duration'):
+            groups = {None: self}
+        else:
+            # Same write, with each call's duration; calls sharing a
+            # duration share a write.
+            end = fields.Datetime.to_datetime(vals['end_time'])
+            start = fields.Datetime.to_datetime(vals.get('start_time'))
+            groups = defaultdict(lambda: self.browse())
             for c in self:
-                if c.end_time and c.start_time and not c.duration:
-                    secs = int((c.end_time - c.start_time).total_seconds())
-                    if secs > 0:
-                        super(CommVoipCall, c).write({'duration': secs})
-                c._sync_to_conversation()
-        return res
-
-    def _do_transcription(self):
+                secs = 0
+                if (start or c.start_time) and not c.duration:
+                    secs = int((end - (start or c.start_time)).total_seconds())
+                groups[secs if secs > 0 else None] |= c
+        for secs, calls in groups.items():
+            super(CommVoipCall, calls).write(dict(vals, duration=secs) if secs else vals)
+        self._sync_to_conversation()
+        return True
+
+    # ── ARI bridge dispatch ───────────────────────────────────────────────
+    @api.model
+    def dialer_wait_pending(self, exclude_ids=None, timeout=25, limit=20):
+        """Long-poll for queued dialer calls the ARI bridge should originate.
+
+        Returns at once when there are some (other than ``exclude_ids``, the
+        ones the bridge is still originating), else waits until the pacer
+        commits new queued calls or ``timeout`` seconds pass, and returns
+        whatever is pending then (possibly nothing). The wait LISTENs on a
+        pooled connection of its own; every read uses a fresh transaction so
+        it sees calls committed while the request was waiting.
+
+        Calls are queued outgoing calls on Asterisk accounts, not yet
+        originated, carrying the pre-assigned agent (progressive) as
+        agent_sip_ext + dialer_agent_session_id, and the campaign (for
+        predictive pick-on-answer).
+        """
+        timeout = max(0.0, min(float(timeout or 0), DISPATCH_WAIT_MAX))
+        with sql_db.db_connect(self.env.cr.dbname).cursor() as listen_cr:
+            # Channel names are identifiers, not parameters.
+            listen_cr.execute('LISTEN %s' % DISPATCH_CHANNEL)
+            listen_cr.commit()
+            try:
+                # Read after LISTEN: a call committed in between still wakes us.
+                calls = self._dialer_pending(exclude_ids, limit)
+                if not calls and timeout:
+                    conn = listen_cr._cnx
+                    if select.select([conn], [], [], timeout)[0]:
+                        conn.poll()
+                        conn.notifies.clear()
+                        calls = self._dialer_pending(exclude_ids, limit)
+            finally:
+                listen_cr.execute('UNLISTEN *')
+                listen_cr.commit()
+        return calls
+
+    @api.model
+    def _dialer_pending(self, exclude_ids, limit):
+        domain = [
+            ('state', '=', 'queued'),
+            ('external_id', 'in', [False, '']),
+            ('dialer_contact_id', '!=', False),
+            ('account_id.provider', '=', 'asterisk'),
+            ('account_id.active', '=', True),
+        ]
+        if exclude_ids:
+            domain.append(('id', 'not in', list(exclude_ids)))
+        with self.env.registry.cursor() as cr:
+            return self.env(cr=cr)[self._name].search_read(
+                domain, DISPATCH_FIELDS, order='id', limit=limit)
+
+    def _on_transcribed(self):
         # After (re)transcribing, refresh the inbox interaction so the transcript
         # + AI summary show in the conversation timeline.
-        super()._do_transcription()
+        super()._on_transcribed()
         self._sync_to_conversation()
 
     @api.model
     def _cron_transcribe_all(self):
-        """Cron entry point — transcribe every recorded call, all types."""
-        self._cron_transcribe_pending()
-        self.env['whatsapp.call.log']._cron_transcribe_pending()
+        """Cron entry point — transcribe every recorded call, all types, within
+        one run's time budget."""
+        deadline = time.monotonic() + TRANSCRIBE_RUN_SECONDS
+        self._cron_transcribe_pending(deadline)
+        self.env['whatsapp.call.log']._cron_transcribe_pending(deadline)
 
-    def _find_or_create_partner(self):
-        """Match the call's number to a res.partner (tolerant last-9-digits
-        match), or create one. Creation is gated by comm_dialer.auto_create_partner
+    def _resolve_partners(self):
+        """Set partner_id on the calls without one: match the remote number
+        on the partners' normalised phone/mobile, or create a partner per
+        number. Creation is gated by comm_dialer.auto_create_partner
         (default on) so it can be turned off for POPIA-strict setups."""
-        self.ensure_one()
-        number = (self.to_number if self.direction == 'outgoing' else self.from_number) or ''
-        number = number.strip()
-        if not number:
-            return self.env['res.partner']
+        country_code = self.env['comm.dialer.dnc']._country_code()
+        by_number = defaultdict(lambda: self.browse())
+        raw_numbers = {}
+        for call in self.filtered(lambda c: not c.partner_id):
+            number = ((call.to_number if call.direction == 'outgoing' else call.from_number)
+                      or '').strip()
+            normalized = normalize_number(number, country_code)
+            if normalized:
+                by_number[normalized] |= call
+                raw_numbers.setdefault(normalized, number)
+        if not by_number:
+            return
         Partner = self.env['res.partner']
-        digits = re.sub(r'\D', '', number)
-        partner = Partner.browse()
-        if len(digits) >= 6:
-            tail = digits[-9:]  # national significant number, format-tolerant
-            partner = Partner.search(
-                ['|', ('phone', 'like', tail), ('mobile', 'like', tail)], limit=1)
-        if not partner:
-            partner = Partner.search(
-                ['|', ('phone', '=', number), ('mobile', '=', number)], limit=1)
-        if not partner:
-            allow = self.env['ir.config_parameter'].sudo().get_param(
-                'comm_dialer.auto_create_partner', '1')
-            if allow not in ('0', 'False', 'false'):
-                partner = Partner.create({'name': number, 'phone': number})
-        return partner
+        partners = Partner._by_normalized_number(by_number)
+        missing = [n for n in by_number if n not in partners]
+        allow = self.env['ir.config_parameter'].sudo().get_param(
+            'comm_dialer.auto_create_partner', '1')
+        if missing and allow not in ('0', 'False', 'false'):
+            created = Partner.create([{'name': raw_numbers[n], 'phone': raw_numbers[n]}
+                                      for n in missing])
+            partners.update(zip(missing, created))
+        for number, calls in by_number.items():
+            if number in partners:
+                calls.partner_id = partners[number]
 
-    def _sync_to_conversation(self):
-        """Surface this VoIP call in the omnichannel inbox: find/open a
-        comm.conversation for the partner on the 'voip' channel and add (or
-        update) a call interaction. Idempotent; skipped without a partner."""
+    def _interaction_body(self):
         self.ensure_one()
-        if not self.partner_id:
-            partner = self._find_or_create_partner()
-            if partner:
-                self.partner_id = partner.id
-        if not self.partner_id:
-            return
-        channel = self.env.ref('comm_chatbot_voip.channel_voip', raise_if_not_found=False)
-        if not channel:
-            return
-        Conv = self.env['comm.conversation']
-        conv = self.conversation_id
-        if not conv:
-            conv = Conv.search([
-                ('partner_id', '=', self.partner_id.id),
-                ('lifecycle_state', 'in', ('open', 'waiting')),
-            ], limit=1, order='last_activity_at desc')
-            if not conv:
-                conv = Conv.create({
-                    'partner_id': self.partner_id.id,
-                    'primary_channel_id': channel.id,
-                })
-            self.conversation_id = conv.id
-
-        direction = 'inbound' if self.direction == 'incoming' else 'outbound'
+        inbound = self.direction == 'incoming'
         state_label = dict(self._fields['state'].selection).get(self.state, self.state or '')
         body = '\U0001F4DE %s call — %s (%s)' % (
-            'Inbound' if direction == 'inbound' else 'Outbound',
-            self.duration_display or '—', state_label)
+            'Inbound' if inbound else 'Outbound', self.duration_display or '—', state_label)
         if self.ai_summary:
             body += '\n' + self.ai_summary
         if self.transcript:
             body += '\n\nTranscript:\n' + self.transcript
+        return body
+
+    def _sync_to_conversation(self):
+        """Surface these VoIP calls in the omnichannel inbox: find/open a
+        comm.conversation per partner on the 'voip' channel and add (or
+        update) each call's interaction. Idempotent; calls without a partner
+        are skipped. Works on the whole recordset, so closing a burst of
+        calls costs a fixed number of queries."""
+        if not self:
+            return
+        self._resolve_partners()
+        calls = self.filtered('partner_id')
+        if not calls:
+            return
+        channel = self.env.ref('comm_chatbot_voip.channel_voip', raise_if_not_found=False)
+        if not channel:
+            return
 
+        # Conversations: the latest open one per partner, else a new one.
+        Conv = self.env['comm.conversation']
+        orphans = calls.filtered(lambda c: not c.conversation_id)
+        if orphans:
+            partner_ids = orphans.partner_id.ids
+            convs = {}
+            for conv in Conv.search([('partner_id', 'in', partner_ids),
+                                     ('lifecycle_state', 'in', ('open', 'waiting'))],
+                                    order='last_activity_at desc'):
+                convs.setdefault(conv.partner_id.id, conv)
+            new_partner_ids = [pid for pid in partner_ids if pid not in convs]
+            if new_partner_ids:
+                created = Conv.create([{'partner_id': pid, 'primary_channel_id': channel.id}
+                                       for pid in new_partner_ids])
+                convs.update(zip(new_partner_ids, created))
+            for call in orphans:
+                call.conversation_id = convs[call.partner_id.id]
+
+        # Interactions, keyed by (source_model, source_id): existing ones are
+        # updated in one statement; the rest are created in one batch through
+        # the ORM so create hooks (inbox bus, webhooks) still run.
         Interaction = self.env['comm.interaction']
-        existing = Interaction.search([
-            ('source_model', '=', 'comm.voip.call'), ('source_id', '=', self.id)], limit=1)
-        if existing:
-            existing.write({'raw_body': body, 'rendered_body': body})
-        else:
-            Interaction.create({
-                'conversation_id': conv.id,
-                'channel_id': channel.id,
-                'direction': direction,
-                'at': self.end_time or self.start_time or fields.Datetime.now(),
-                'raw_body': body,
-                'rendered_body': body,
-                'status': 'received',
-                'source_model': 'comm.voip.call',
-                'source_id': self.id,
-            })
-        conv.touch()
+        bodies = {call.id: call._interaction_body() for call in calls}
+        Interaction.flush_model()
+        # Two workers syncing the same call would each miss the other's
+        # uncommitted interaction and the later create would hit the unique
+        # index. Touch the call rows first: under REPEATABLE READ the later
+        # transaction then fails here with a serialization error, is retried,
+        # and finds the interaction to update.
+        self.env.cr.execute(
+            "UPDATE comm_voip_call SET write_date = write_date WHERE id = ANY(%s)",
+            [calls.ids])
+        self.env.cr.execute("""
+            UPDATE comm_interaction i
+               SET raw_body = v.body, rendered_body = v.body,
+                   write_uid = %s, write_date = now() AT TIME ZONE 'UTC'
+              FROM unnest(%s::int[], %s::text[]) AS v(source_id, body)
+             WHERE i.source_model = 'comm.voip.call' AND i.source_id = v.source_id
+         RETURNING i.id, i.source_id
+        """, [self.env.uid, list(bodies), list(bodies.values())])
+        updated = self.env.cr.fetchall()
+        if updated:
+            existing = Interaction.browse([row[0] for row in updated])
+            existing.invalidate_recordset(['raw_body', 'rendered_body', 'write_uid', 'write_date'])
+            existing.modified(['raw_body', 'rendered_body'])
+        done = {row[1] for row in updated}
+        now = fields.Datetime.now()
+        Interaction.create([{
+            'conversation_id': call.conversation_id.id,
+            'channel_id': channel.id,
+            'direction': 'inbound' if call.direction == 'incoming' else 'outbound',
+            'at': call.end_time or call.start_time or now,
+            'raw_body': bodies[call.id],
+            'rendered_body': bodies[call.id],
+            'status': 'received',
+            'source_model': 'comm.voip.call',
+            'source_id': call.id,
+        } for call in calls if call.id not in done])
+        calls.conversation_id.touch()
 
         # Also surface in the Gen-1 Contact Centre inbox, if that stack is installed.
         if 'contact.centre.contact' in self.env:
-            try:
-                self.env['contact.centre.contact'].sudo()._sync_voip_call(self)
-            except Exception:
-                _logger.exception("comm_dialer: Gen-1 inbox sync failed for call %s", self.id)
+            for call in calls:
+                try:
+                    self.env['contact.centre.contact'].sudo()._sync_voip_call(call)
+                except Exception:
+                    _logger.exception("comm_dialer: Gen-1 inbox sync failed for call %s", call.id)
 
     @api.depends('recording_ids')
     def _compute_has_recording(self):
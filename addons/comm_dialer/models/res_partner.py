@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+
+from .comm_dialer_dnc import normalize_number
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    # Indexed international-form digits of phone/mobile, so calls match their
+    # partner with an equality lookup whatever the number's formatting.
+    phone_normalized = fields.Char(compute='_compute_numbers_normalized', store=True, index=True)
+    mobile_normalized = fields.Char(compute='_compute_numbers_normalized', store=True, index=True)
+
+    @api.depends('phone', 'mobile')
+    def _compute_numbers_normalized(self):
+        country_code = self.env['comm.dialer.dnc']._country_code()
+        for r in self:
+            r.phone_normalized = normalize_number(r.phone, country_code) or False
+            r.mobile_normalized = normalize_number(r.mobile, country_code) or False
+
+    @api.model
+    def _by_normalized_number(self, numbers):
+        """{normalised number: partner} for the partners whose phone or mobile
+        matches one of ``numbers`` (already normalised), in one query."""
+        numbers = list({n for n in numbers if n})
+        if not numbers:
+            return {}
+        found = {}
+        for partner in self.search(['|', ('phone_normalized', 'in', numbers),
+                                    ('mobile_normalized', 'in', numbers)], order='id'):
+            for number in (partner.phone_normalized, partner.mobile_normalized):
+                if number:
+                    found.setdefault(number, partner)
+        return found
@@ -4,11 +4,23 @@
 Any model with a ``recording_ids`` One2many of audio ir.attachments (VoIP calls,
 WhatsApp calls, …) can inherit this mixin to get self-hosted Whisper transcription
 plus Claude summary/sentiment/disposition — one implementation for every call type.
+
+Transcription runs as a small job pool. The cron claims recorded calls with
+``FOR UPDATE SKIP LOCKED`` (so overlapping runs never take the same call),
+commits the claim, and keeps at most ``comm_dialer.whisper_workers`` requests
+in flight against the Whisper container. Audio is streamed from the filestore
+in chunks, never base64-decoded into memory. The pool threads only do HTTP;
+claiming and writing results back stay on the cron's cursor. Failed jobs are
+retried with backoff up to ``TRANSCRIBE_MAX_ATTEMPTS`` times.
 """
-import base64
 import json
 import logging
+import os
 import re
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
 
 import requests
 
@@ -16,6 +28,109 @@ from odoo import api, fields, models
 
 _logger = logging.getLogger(__name__)
 
+TRANSCRIBE_WORKERS = 2        # default concurrent requests to Whisper
+TRANSCRIBE_TIMEOUT = 600      # seconds per recording
+TRANSCRIBE_MAX_ATTEMPTS = 3
+TRANSCRIBE_RETRY_MINUTES = 5  # first backoff, doubled on every attempt
+TRANSCRIBE_STALE_MINUTES = 30  # a claim older than this is taken over
+TRANSCRIBE_RUN_SECONDS = 90   # a cron run stops claiming after this
+UPLOAD_CHUNK = 64 * 1024
+
+
+class _AudioUpload:
+    """multipart/form-data body with one audio part, read in chunks.
+
+    It has a length, so requests sends a Content-Length header and streams
+    the iterator instead of building the whole body in memory.
+    """
+
+    def __init__(self, filename, mimetype, path=None, data=b''):
+        boundary = uuid.uuid4().hex
+        filename = re.sub(r'["\r\n]', '', filename or 'audio.webm')
+        self.content_type = 'multipart/form-data; boundary=%s' % boundary
+        self.head = (
+            '--%s\r\nContent-Disposition: form-data; name="audio_file"; filename="%s"\r\n'
+            'Content-Type: %s\r\n\r\n' % (boundary, filename, mimetype or 'audio/webm')
+        ).encode('utf-8')
+        self.tail = ('\r\n--%s--\r\n' % boundary).encode('utf-8')
+        self.path = path
+        self.data = data
+        self.size = os.path.getsize(path) if path else len(data)
+
+    def __len__(self):
+        return len(self.head) + self.size + len(self.tail)
+
+    def __iter__(self):
+        yield self.head
+        if self.path:
+            with open(self.path, 'rb') as f:
+                for chunk in iter(lambda: f.read(UPLOAD_CHUNK), b''):
+                    yield chunk
+        elif self.data:
+            yield self.data
+        yield self.tail
+
+
+def _request_insights(key, model, transcript):
+    """Claude: 1-2 sentence summary + sentiment + suggested disposition."""
+    prompt = (
+        "You are a contact-centre QA assistant. Read the call transcript and reply with "
+        'STRICT JSON only, no prose: {"summary": "<1-2 sentence summary>", '
+        '"sentiment": "positive|neutral|negative", '
+        '"disposition": "<short suggested call-outcome label>"}.\n\n'
+        "Transcript:\n" + transcript[:8000]
+    )
+    resp = requests.post(
+        'https://api.anthropic.com/v1/messages',
+        headers={'x-api-key': key, 'anthropic-version': '2023-06-01',
+                 'content-type': 'application/json'},
+        json={'model': model, 'max_tokens': 400,
+              'messages': [{'role': 'user', 'content': prompt}]},
+        timeout=60,
+    )
+    resp.raise_for_status()
+    text = ''.join(b.get('text', '') for b in resp.json().get('content', [])
+                   if b.get('type') == 'text')
+    m = re.search(r'\{.*\}', text, re.S)
+    if not m:
+        return {}
+    try:
+        return json.loads(m.group(0))
+    except ValueError:
+        return {}
+
+
+def _run_transcription_job(job):
+    """Transcribe one recording, then fetch its insights.
+
+    Plain function, no ORM: it runs on the pool threads. Returns a dict with
+    ``text``, ``insights``, ``error`` (None on success) and ``duration``.
+    """
+    start = time.monotonic()
+    result = {'id': job['id'], 'text': '', 'insights': {}, 'error': None}
+    try:
+        upload = _AudioUpload(job['name'], job['mimetype'], job.get('path'), job.get('data', b''))
+        if upload.size:
+            resp = requests.post(
+                job['url'] + '/asr',
+                params={'task': 'transcribe', 'output': 'txt', 'encode': 'true'},
+                data=upload,
+                headers={'Content-Type': upload.content_type},
+                timeout=(10, job['timeout']),
+            )
+            resp.raise_for_status()
+            result['text'] = (resp.text or '').strip()
+    except Exception as e:
+        result['error'] = str(e) or e.__class__.__name__
+    # AI insights are best-effort — never lose the transcript if they fail.
+    if result['text'] and job.get('insights'):
+        try:
+            result['insights'] = _request_insights(*job['insights'], result['text'])
+        except Exception:
+            _logger.exception("AI insights failed for %s %s", job['model'], job['id'])
+    result['duration'] = time.monotonic() - start
+    return result
+
 
 class CallTranscriptionMixin(models.AbstractModel):
     _name = 'comm.call.transcription.mixin'
@@ -25,9 +140,19 @@ class CallTranscriptionMixin(models.AbstractModel):
     transcript_state = fields.Selection([
         ('none', 'Not transcribed'),
         ('pending', 'Queued'),
+        ('processing', 'Transcribing'),
         ('done', 'Transcribed'),
         ('failed', 'Failed'),
     ], default='none', index=True)
+    transcript_attempts = fields.Integer('Transcription Attempts', default=0, readonly=True)
+    transcript_started_at = fields.Datetime('Transcription Started', readonly=True)
+    transcript_next_try = fields.Datetime(
+        'Transcription Retry At', readonly=True,
+        help="A failed transcription is queued again after this time.")
+    transcript_duration = fields.Float(
+        'Transcription Time (s)', readonly=True,
+        help="Wall-clock time of the last transcription job, insights included.")
+    transcript_error = fields.Char('Transcription Error', readonly=True)
     ai_summary = fields.Text('AI Summary')
     ai_sentiment = fields.Selection([
         ('positive', 'Positive'),
@@ -36,102 +161,194 @@ class CallTranscriptionMixin(models.AbstractModel):
     ], string='Sentiment')
     ai_suggested_disposition = fields.Char('Suggested Disposition')
 
-    # ── Transcription (self-hosted Whisper) ────────────────────────────────
+    # ── Settings ───────────────────────────────────────────────────────────
     def _whisper_url(self):
         return (self.env['ir.config_parameter'].sudo().get_param('comm_dialer.whisper_url')
                 or 'http://whisper:9000').rstrip('/')
 
-    def _transcribe_recording(self):
-        """POST the latest recording audio to the self-hosted Whisper service
-        (audio never leaves the box). Returns the transcript text."""
-        self.ensure_one()
-        att = self.recording_ids[:1]
-        if not att:
-            return ''
-        audio = base64.b64decode(att.datas or b'')
-        if not audio:
-            return ''
-        resp = requests.post(
-            self._whisper_url() + '/asr',
-            params={'task': 'transcribe', 'output': 'txt', 'encode': 'true'},
-            files={'audio_file': (att.name or 'audio.webm', audio, att.mimetype or 'audio/webm')},
-            timeout=600,
-        )
-        resp.raise_for_status()
-        return (resp.text or '').strip()
-
-    def _run_ai_insights(self, transcript):
-        """Claude: 1-2 sentence summary + sentiment + suggested disposition."""
-        if not transcript:
-            return {}
+    def _whisper_workers(self):
+        try:
+            workers = int(self.env['ir.config_parameter'].sudo().get_param(
+                'comm_dialer.whisper_workers') or TRANSCRIBE_WORKERS)
+        except ValueError:
+            workers = TRANSCRIBE_WORKERS
+        return max(1, workers)
+
+    def _ai_insights_settings(self):
+        """(api key, model) for the insights call, or None when not configured."""
         ICP = self.env['ir.config_parameter'].sudo()
         key = (ICP.get_param('comm_chatbot.anthropic_api_key')
                or ICP.get_param('whatsapp.anthropic_api_key') or '').strip()
         if not key:
-            return {}
-        model = ICP.get_param('comm_dialer.insight_model') or 'claude-haiku-4-5-20251001'
-        prompt = (
-            "You are a contact-centre QA assistant. Read the call transcript and reply with "
-            'STRICT JSON only, no prose: {"summary": "<1-2 sentence summary>", '
-            '"sentiment": "positive|neutral|negative", '
-            '"disposition": "<short suggested call-outcome label>"}.\n\n'
-            "Transcript:\n" + transcript[:8000]
-        )
-        resp = requests.post(
-            'https://api.anthropic.com/v1/messages',
-            headers={'x-api-key': key, 'anthropic-version': '2023-06-01',
-                     'content-type': 'application/json'},
-            json={'model': model, 'max_tokens': 400,
-                  'messages': [{'role': 'user', 'content': prompt}]},
-            timeout=60,
-        )
-        resp.raise_for_status()
-        text = ''.join(b.get('text', '') for b in resp.json().get('content', [])
-                       if b.get('type') == 'text')
-        m = re.search(r'\{.*\}', text, re.S)
-        if not m:
-            return {}
-        try:
-            return json.loads(m.group(0))
-        except ValueError:
-            return {}
+            return None
+        return key, ICP.get_param('comm_dialer.insight_model') or 'claude-haiku-4-5-20251001'
 
-    def _do_transcription(self):
+    # ── Jobs ───────────────────────────────────────────────────────────────
+    def _transcription_job(self, url=None, insights=None):
+        """What a pool thread needs to transcribe this record's latest
+        recording: the filestore path (or raw bytes for attachments kept in
+        the database), never the ORM record itself."""
         self.ensure_one()
-        if not self.recording_ids:
-            self.transcript_state = 'none'
-            return
-        try:
-            text = self._transcribe_recording()
-        except Exception:
-            _logger.exception("transcription failed for %s %s", self._name, self.id)
-            self.write({'transcript_state': 'failed'})
+        att = self.recording_ids[:1].sudo()
+        job = {
+            'model': self._name,
+            'id': self.id,
+            'url': url or self._whisper_url(),
+            'timeout': TRANSCRIBE_TIMEOUT,
+            'name': att.name or 'audio.webm',
+            'mimetype': att.mimetype or 'audio/webm',
+            'insights': insights,
+        }
+        if att.store_fname:
+            job['path'] = att._full_path(att.store_fname)
+        else:
+            job['data'] = att.raw or b''
+        return job
+
+    @api.model
+    def _insight_vals(self, insights):
+        vals = {}
+        if insights:
+            vals['ai_summary'] = (insights.get('summary') or '')[:2000]
+            sentiment = (insights.get('sentiment') or '').strip().lower()
+            if sentiment in ('positive', 'neutral', 'negative'):
+                vals['ai_sentiment'] = sentiment
+            vals['ai_suggested_disposition'] = (insights.get('disposition') or '')[:120]
+        return vals
+
+    def _transcription_apply(self, result):
+        """Write a pool result back: the transcript, or a retry/failure."""
+        self.ensure_one()
+        vals = {'transcript_duration': round(result['duration'], 3)}
+        if result['error']:
+            _logger.warning("transcription failed for %s %s (attempt %s): %s",
+                            self._name, self.id, self.transcript_attempts, result['error'])
+            vals['transcript_error'] = result['error'][:255]
+            if self.transcript_attempts >= TRANSCRIBE_MAX_ATTEMPTS:
+                vals.update(transcript_state='failed', transcript_next_try=False)
+            else:
+                backoff = TRANSCRIBE_RETRY_MINUTES * 2 ** max(self.transcript_attempts - 1, 0)
+                vals.update(transcript_state='pending',
+                            transcript_next_try=fields.Datetime.now() + timedelta(minutes=backoff))
+            self.write(vals)
             return
-        vals = {'transcript': text or '', 'transcript_state': 'done'}
-        # AI insights are best-effort — never lose the transcript if they fail.
-        if text:
-            try:
-                insights = self._run_ai_insights(text)
-            except Exception:
-                _logger.exception("AI insights failed for %s %s", self._name, self.id)
-                insights = {}
-            if insights:
-                vals['ai_summary'] = (insights.get('summary') or '')[:2000]
-                sentiment = (insights.get('sentiment') or '').strip().lower()
-                if sentiment in ('positive', 'neutral', 'negative'):
-                    vals['ai_sentiment'] = sentiment
-                vals['ai_suggested_disposition'] = (insights.get('disposition') or '')[:120]
+        vals.update(transcript=result['text'], transcript_state='done',
+                    transcript_error=False, transcript_next_try=False)
+        vals.update(self._insight_vals(result['insights']))
         self.write(vals)
+        self._on_transcribed()
 
-    def action_transcribe(self):
+    def _on_transcribed(self):
+        """Hook called after a transcript (and its insights) is written."""
+
+    # ── Pool ───────────────────────────────────────────────────────────────
+    @api.model
+    def _transcription_claim(self, limit):
+        """Claim up to ``limit`` recorded calls that are due: queued (or
+        never transcribed) and past their retry time, or stuck in
+        'processing' by a run that died. Claimed rows move to 'processing'
+        with one more attempt; rows another transaction holds are skipped."""
+        now = fields.Datetime.now()
+        stale = now - timedelta(minutes=TRANSCRIBE_STALE_MINUTES)
+        self.flush_model()
+        cr = self.env.cr
+        # A run that died on its last attempt does not get another one.
+        cr.execute("""
+            UPDATE {table} SET transcript_state = 'failed'
+             WHERE transcript_state = 'processing' AND transcript_started_at < %s
+               AND transcript_attempts >= %s
+        """.format(table=self._table), [stale, TRANSCRIBE_MAX_ATTEMPTS])
+        if cr.rowcount:
+            self.invalidate_model()
+        candidates = self.search([
+            ('recording_ids', '!=', False),
+            '|',
+            '&', ('transcript_state', 'in', ('none', 'pending')),
+            '|', ('transcript_next_try', '=', False), ('transcript_next_try', '<=', now),
+            '&', ('transcript_state', '=', 'processing'), ('transcript_started_at', '<', stale),
+        ], order='id', limit=limit * 4)
+        if not candidates:
+            return self.browse()
+        cr.execute("""
+            UPDATE {table} t
+               SET transcript_state = 'processing',
+                   transcript_started_at = %(now)s,
+                   transcript_attempts = COALESCE(t.transcript_attempts, 0) + 1,
+                   transcript_error = NULL
+              FROM (SELECT id FROM {table}
+                     WHERE id = ANY(%(ids)s)
+                       AND (transcript_state IN ('none', 'pending')
+                            OR (transcript_state = 'processing'
+                                AND transcript_started_at < %(stale)s))
+                  ORDER BY id
+                     LIMIT %(limit)s
+                       FOR UPDATE SKIP LOCKED) due
+             WHERE t.id = due.id
+         RETURNING t.id
+        """.format(table=self._table), {
+            'now': now, 'stale': stale, 'ids': list(candidates._ids), 'limit': limit,
+        })
+        ids = sorted(row[0] for row in cr.fetchall())
+        self.invalidate_model()
+        return self.browse(ids)
+
+    def _transcription_start(self):
+        """Mark these records as claimed, outside of the cron's claim."""
         for rec in self:
-            rec._do_transcription()
+            rec.write({
+                'transcript_state': 'processing',
+                'transcript_started_at': fields.Datetime.now(),
+                'transcript_attempts': rec.transcript_attempts + 1,
+                'transcript_error': False,
+            })
+        return self
+
+    @api.model
+    def _transcription_run(self, claim, deadline=None, commit=False):
+        """Keep the pool full: ``claim(n)`` returns up to n records to start,
+        until it runs dry or ``deadline`` (monotonic) passes. Each result is
+        written back as soon as it arrives. Returns the records processed."""
+        workers = self._whisper_workers()
+        url = self._whisper_url()
+        insights = self._ai_insights_settings()
+        commit = commit and not self.env.registry.in_test_mode()
+        processed = self.browse()
+        running = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='comm.whisper') as pool:
+            while True:
+                free = workers - len(running)
+                if free and (deadline is None or time.monotonic() < deadline):
+                    claimed = claim(free)
+                    if commit and claimed:
+                        self.env.cr.commit()
+                    for rec in claimed:
+                        running[pool.submit(
+                            _run_transcription_job, rec._transcription_job(url, insights))] = rec
+                if not running:
+                    break
+                finished, _pending = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    rec = running.pop(future)
+                    rec._transcription_apply(future.result())
+                    processed |= rec
+                if commit:
+                    self.env.cr.commit()
+        return processed
+
+    def action_transcribe(self):
+        """Transcribe now, on the pool, without waiting for the cron."""
+        self.filtered(lambda r: not r.recording_ids).write({'transcript_state': 'none'})
+        queue = list(self.filtered('recording_ids')._ids)
+
+        def claim(n):
+            ids, queue[:n] = queue[:n], []
+            return self.browse(ids)._transcription_start()
+        self._transcription_run(claim)
         return True
 
     @api.model
-    def _cron_transcribe_pending(self, limit=20):
+    def _cron_transcribe_pending(self, deadline=None):
         """Transcribe any recorded call not yet done — voip + whatsapp + …"""
-        pending = self.search([('transcript_state', 'in', ('none', 'pending')),
-                               ('recording_ids', '!=', False)], limit=limit)
-        for rec in pending:
-            rec._do_transcription()
+        if deadline is None:
+            deadline = time.monotonic() + TRANSCRIBE_RUN_SECONDS
+        return self._transcription_run(self._transcription_claim, deadline, commit=True)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""Deterministic discrete-event simulator for the dialer pacer.
+
+``comm.dialer.campaign._simulate_tick`` advances calls one stage per cron
+run on wall-clock time, which is fine for watching the UI but gives
+different numbers on every run. This simulator instead runs a campaign on a
+simulated clock: ``fields.Datetime.now`` is pinned to it, every ring, talk
+and wrap-up ends at a time drawn from a seeded random generator, and the
+pacer is called every ``tick`` simulated seconds. Same profile, same seed,
+same result.
+
+Only telephony is simulated. Pacing, claiming, origination, retries and
+the governor counters run through the real code (``_pace_once``,
+``_lines_to_open``, ``register_result``) against the current database, so
+run it in a test (see ``tests/test_pacing_simulation.py``) or on a scratch
+database. The campaign needs a calling window covering the whole day and
+its agents' sessions; it is set running by :meth:`PacingSimulator.run`.
+"""
+import heapq
+import math
+import random
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+
+
+class SimProfile:
+    """Traffic and telephony assumptions of a simulation run.
+
+    Durations are ``(kind, *params)`` tuples in seconds: ``('fixed', s)``,
+    ``('uniform', low, high)``, ``('exponential', mean)`` or
+    ``('lognormal', mean, sd)``.
+    """
+
+    def __init__(self, seconds=1800, tick=2, seed=1,
+                 answer_rate=0.35, busy_rate=0.3,
+                 machine_rate=0.1, amd_error_rate=0.05,
+                 ring_time=('uniform', 4, 25),
+                 handle_time=('lognormal', 180, 90),
+                 machine_talk_time=('fixed', 8),
+                 wrap_time=('fixed', 15)):
+        self.seconds = seconds
+        self.tick = tick
+        self.seed = seed
+        self.answer_rate = answer_rate          # dialled calls picked up
+        self.busy_rate = busy_rate              # unanswered calls that are busy
+        self.machine_rate = machine_rate        # pick-ups that are machines
+        self.amd_error_rate = amd_error_rate    # AMD verdicts that are wrong
+        self.ring_time = ring_time
+        self.handle_time = handle_time
+        self.machine_talk_time = machine_talk_time
+        self.wrap_time = wrap_time
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def sample(rng, spec):
+    """Draw a duration (seconds, >= 1) from a ``(kind, *params)`` spec."""
+    kind, *params = spec
+    if kind == 'fixed':
+        value = params[0]
+    elif kind == 'uniform':
+        value = rng.uniform(*params)
+    elif kind == 'exponential':
+        value = rng.expovariate(1.0 / params[0])
+    elif kind == 'lognormal':
+        mean, sd = params
+        sigma2 = math.log(1 + (sd / mean) ** 2)
+        value = rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+    else:
+        raise ValueError('Unknown duration distribution %r' % kind)
+    return max(1, round(value))
+
+
+class PacingSimulator:
+    """Run one campaign under a :class:`SimProfile` and report on it."""
+
+    def __init__(self, campaign, profile=None):
+        campaign.ensure_one()
+        self.campaign = campaign
+        self.env = campaign.env
+        self.profile = profile or SimProfile()
+        self.rng = random.Random(self.profile.seed)
+        self.start = fields.Datetime.now().replace(microsecond=0)
+        self.clock = 0
+        self.events = []           # heap of (time, seq, kind, record)
+        self._seq = 0
+        self.busy_since = {}       # session id -> sim time it took a call
+        self.busy_seconds = 0.0
+        self.counts = dict.fromkeys((
+            'dialed', 'no_answer', 'busy', 'machines', 'amd_dropped_humans',
+            'abandoned', 'connected', 'completed'), 0)
+        self.pace_queries = []
+        self.tick_queries = []
+
+    # ── clock and events ────────────────────────────────────────────────
+    def now(self):
+        return self.start + timedelta(seconds=self.clock)
+
+    def _schedule(self, delay, kind, record):
+        self._seq += 1
+        heapq.heappush(self.events, (self.clock + delay, self._seq, kind, record))
+
+    def _ready_agent(self):
+        return self.campaign.session_ids.filtered(lambda s: s.state == 'ready')[:1]
+
+    def _release(self, session, state):
+        if session:
+            session.write({'state': state, 'current_call_id': False,
+                           'last_state_change': self.now()})
+
+    # ── telephony outcomes ──────────────────────────────────────────────
+    def _ring_end(self, call):
+        profile, rng = self.profile, self.rng
+        contact = call.dialer_contact_id
+        pre = call.dialer_agent_session_id  # progressive pre-assignment
+        if rng.random() >= profile.answer_rate:
+            outcome = 'busy' if rng.random() < profile.busy_rate else 'no_answer'
+            self.counts[outcome] += 1
+            call.write({'state': outcome, 'end_time': self.now()})
+            contact.register_result(outcome)
+            self._release(pre, 'ready')
+            return
+        machine = rng.random() < profile.machine_rate
+        wrong = rng.random() < profile.amd_error_rate
+        self.counts['machines'] += machine
+        if machine != wrong:  # AMD says machine: drop it, retry later
+            self.counts['amd_dropped_humans'] += wrong
+            call.write({'state': 'no_answer', 'end_time': self.now()})
+            contact.register_result('no_answer')
+            self._release(pre, 'ready')
+            return
+        agent = pre if pre and pre.state == 'on_call' else self._ready_agent()
+        if not agent:
+            # A pick-up nobody can take: predictive drop (machines included,
+            # as AMD cleared them).
+            self.counts['abandoned'] += 1
+            call.write({'state': 'cancelled', 'end_time': self.now()})
+            contact.register_result('abandoned')
+            return
+        self.counts['connected'] += 1
+        call.write({'state': 'in_progress', 'dialer_agent_session_id': agent.id})
+        agent.write({'state': 'on_call', 'current_call_id': call.id,
+                     'last_state_change': self.now()})
+        self.busy_since[agent.id] = self.clock
+        talk = sample(rng, profile.machine_talk_time if machine else profile.handle_time)
+        self._schedule(talk, 'hangup', call)
+
+    def _hangup(self, call):
+        self.counts['completed'] += 1
+        call.write({'state': 'completed', 'end_time': self.now(),
+                    'duration': max(1, round(self.clock - self.busy_since.get(
+                        call.dialer_agent_session_id.id, self.clock)))})
+        call.dialer_contact_id.register_result('completed')
+        agent = call.dialer_agent_session_id
+        self._release(agent, 'wrap')
+        self._schedule(sample(self.rng, self.profile.wrap_time), 'wrap_end', agent)
+
+    def _wrap_end(self, agent):
+        self.busy_seconds += self.clock - self.busy_since.pop(agent.id, self.clock)
+        if agent.state == 'wrap':
+            agent._set_state('ready')
+
+    # ── main loop ───────────────────────────────────────────────────────
+    def _tick(self):
+        cr = self.env.cr
+        while self.events and self.events[0][0] <= self.clock:
+            _at, _seq, kind, record = heapq.heappop(self.events)
+            getattr(self, '_' + kind)(record)
+        before = cr.sql_log_count
+        self.campaign._pace_once()
+        self.pace_queries.append(cr.sql_log_count - before)
+        queued = self.env['comm.voip.call'].search([
+            ('dialer_campaign_id', '=', self.campaign.id), ('state', '=', 'queued')])
+        for call in queued:
+            self._schedule(sample(self.rng, self.profile.ring_time), 'ring_end', call)
+        queued.write({'state': 'ringing'})
+        self.counts['dialed'] += len(queued)
+
+    def run(self):
+        """Simulate ``profile.seconds`` of dialling and return the report."""
+        campaign = self.campaign
+        with patch.object(fields.Datetime, 'now', self.now):
+            campaign.session_ids.filtered(lambda s: s.state != 'offline')._set_state('ready')
+            campaign.state = 'running'
+            cr = self.env.cr
+            while self.clock < self.profile.seconds:
+                before = cr.sql_log_count
+                self._tick()
+                self.tick_queries.append(cr.sql_log_count - before)
+                if campaign.state == 'done' and not self.events:
+                    break
+                self.clock += self.profile.tick
+            report = self.report()
+        return report
+
+    def report(self):
+        counts = self.counts
+        elapsed = max(self.clock, 1)
+        agents = len(self.campaign.session_ids.filtered(lambda s: s.state != 'offline'))
+        busy = self.busy_seconds + sum(self.clock - since for since in self.busy_since.values())
+        picked_up = counts['connected'] + counts['abandoned']
+        ticks = len(self.tick_queries) or 1
+        return {
+            'mode': self.campaign.mode,
+            'agents': agents,
+            'sim_seconds': self.clock,
+            'ticks': len(self.tick_queries),
+            'profile': self.profile.as_dict(),
+            'counts': dict(counts),
+            'abandon_rate': round(counts['abandoned'] / picked_up, 4) if picked_up else 0.0,
+            'occupancy': round(busy / (agents * elapsed), 4) if agents else 0.0,
+            'dials_per_agent_hour': round(
+                counts['dialed'] / agents * 3600 / elapsed, 2) if agents else 0.0,
+            'queries_per_tick': {
+                'pace_avg': round(sum(self.pace_queries) / ticks, 2),
+                'pace_max': max(self.pace_queries, default=0),
+                'total_avg': round(sum(self.tick_queries) / ticks, 2),
+                'total_max': max(self.tick_queries, default=0),
+            },
+        }
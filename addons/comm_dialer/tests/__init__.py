@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from . import test_dialer_pacing
+from . import test_dialer_governor
+from . import test_dialer_dispatch
+from . import test_pacing_simulation
+from . import test_dialer_dnc
+from . import test_transcription_pool
+from . import test_recording_stream
+from . import test_voip_call_sync
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""ARI bridge dispatch: the dialer_wait_pending long-poll."""
+import time
+
+from odoo.tests import tagged, common
+
+
+@tagged('comm_dialer', 'post_install', '-at_install')
+class TestDialerDispatch(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.account = cls.env['comm.voip.account'].create({
+            'name': 'Dispatch Test Trunk', 'usage': 'automation', 'provider': 'asterisk',
+        })
+        cls.campaign = cls.env['comm.dialer.campaign'].create({
+            'name': 'Dispatch Test', 'account_id': cls.account.id,
+        })
+        cls.contact = cls.env['comm.dialer.contact'].create({
+            'campaign_id': cls.campaign.id, 'number': '27600000001',
+        })
+        cls.Call = cls.env['comm.voip.call']
+
+    def _queue(self, **vals):
+        return self.Call.create(dict({
+            'account_id': self.account.id,
+            'direction': 'outgoing',
+            'to_number': self.contact.number,
+            'state': 'queued',
+            'dialer_contact_id': self.contact.id,
+        }, **vals))
+
+    def test_returns_pending_at_once(self):
+        call = self._queue()
+        self._queue(external_id='chan-1')
+        self._queue(state='ringing')
+        self.env.flush_all()
+
+        start = time.monotonic()
+        rows = self.Call.dialer_wait_pending(timeout=10)
+
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual([row['id'] for row in rows], [call.id])
+        self.assertEqual(rows[0]['dialer_contact_id'][0], self.contact.id)
+        self.assertEqual(rows[0]['dialer_campaign_id'][0], self.campaign.id)
+
+    def test_excludes_calls_in_flight(self):
+        call = self._queue()
+        self.env.flush_all()
+
+        self.assertEqual(self.Call.dialer_wait_pending(exclude_ids=[call.id], timeout=0), [])
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Do-Not-Call list: normalisation, bulk import and load-time flagging."""
+import os
+from array import array
+
+from odoo import SUPERUSER_ID, api
+from odoo.modules.registry import Registry
+from odoo.tests import tagged, common
+
+from ..models.comm_dialer_dnc import (
+    GENERATION_SEQUENCE, _NUMBER_SETS, _NumberSet, normalize_number,
+)
+
+
+@tagged('comm_dialer', 'post_install', '-at_install')
+class TestDialerDnc(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Dnc = cls.env['comm.dialer.dnc']
+        cls.campaign = cls.env['comm.dialer.campaign'].create({
+            'name': 'DNC Test',
+            'account_id': cls.env['comm.voip.account'].create({
+                'name': 'DNC Test Trunk', 'usage': 'automation',
+            }).id,
+        })
+
+    def _contact(self, number, **vals):
+        return self.env['comm.dialer.contact'].create(dict({
+            'campaign_id': self.campaign.id, 'number': number,
+        }, **vals))
+
+    def test_normalize_number(self):
+        for raw in ('+27 82 123 4567', '0027821234567', '082-123-4567', '27821234567'):
+            self.assertEqual(normalize_number(raw), '27821234567', raw)
+        self.assertEqual(normalize_number('0821234567', '44'), '44821234567')
+        self.assertEqual(normalize_number('n/a'), '')
+
+    def test_number_set(self):
+        numbers = _NumberSet(1, array('q', [27821234567, 27831234567]))
+
+        self.assertIn('27831234567', numbers)
+        self.assertNotIn('27841234567', numbers)
+        self.assertNotIn('', numbers)
+        self.assertNotIn('9' * 20, numbers)
+
+    def test_first_change_moves_generation(self):
+        # Put the sequence back in its just-created state for this test.
+        self.cr.execute("SELECT last_value, is_called FROM %s" % GENERATION_SEQUENCE)
+        last_value, is_called = self.cr.fetchone()
+        self.cr.execute("SELECT setval(%s, 1, false)", [GENERATION_SEQUENCE])
+        self.addCleanup(self.cr.execute, "SELECT setval(%s, %s, %s)",
+                        [GENERATION_SEQUENCE, last_value, is_called])
+        self.addCleanup(_NUMBER_SETS.pop, self.cr.dbname, None)
+
+        before = self.Dnc._generation()
+        self.Dnc._list_changed()
+        self.cr.postcommit.run()  # what the cursor runs after the commit
+        self.assertNotEqual(self.Dnc._generation(), before)
+
+    def test_same_number_any_format(self):
+        self.Dnc.create({'number': '+27 82 123 4567'})
+        contact = self._contact('082 123 4567', state='contacted')
+
+        self.assertTrue(contact._is_dnc())
+        with self.assertRaises(Exception), self.cr.savepoint():
+            self.Dnc.create({'number': '0821234567'})
+            self.env.flush_all()
+
+    def test_flagged_when_loaded(self):
+        self.Dnc.create({'number': '0821234567'})
+
+        listed = self._contact('+27821234567')
+        other = self._contact('0831234567')
+
+        self.assertEqual(listed.state, 'dnc')
+        self.assertEqual(other.state, 'pending')
+
+    def test_bulk_import(self):
+        self.Dnc.create({'number': '0821234567'})
+        waiting = self._contact('0841234567')
+        done = self._contact('0851234567', state='contacted')
+
+        added, flagged = self.Dnc._import_numbers([
+            'number',            # header line, no digits
+            '082 123 4567',      # already listed
+            '+27 84 123 4567',
+            '0841234567',        # duplicate within the file
+            '0851234567',
+            '',
+        ], reason='Register test')
+
+        self.assertEqual(added, 2)
+        self.assertEqual(flagged, 1)
+        self.assertEqual(waiting.state, 'dnc')
+        self.assertEqual(done.state, 'contacted')
+        imported = self.Dnc.search([('reason', '=', 'Register test')])
+        self.assertEqual(sorted(imported.mapped('number_normalized')),
+                         ['27841234567', '27851234567'])
+        self.assertTrue(self._contact('0851234567')._is_dnc())
+
+
+@tagged('comm_dialer', 'post_install', '-at_install')
+class TestDncCacheSnapshot(common.BaseCase):
+    """Real committed transactions: the worker copy must not pair an older
+    snapshot's rows with a newer generation."""
+
+    def test_reload_sees_rows_committed_after_snapshot(self):
+        registry = Registry(common.get_db_name())
+        number = '2779%07d' % (os.getpid() % 10 ** 7)
+        try:
+            with registry.cursor() as cr:
+                Dnc = api.Environment(cr, SUPERUSER_ID, {})['comm.dialer.dnc']
+                self.assertNotIn(number, Dnc._number_set())  # snapshot taken
+                with registry.cursor() as other:
+                    api.Environment(other, SUPERUSER_ID, {})['comm.dialer.dnc'].create(
+                        {'number': number, 'reason': 'Snapshot test'})
+                # The generation moved after the commit above; this
+                # transaction's snapshot predates it.
+                self.assertIn(number, Dnc._number_set())
+        finally:
+            with registry.cursor() as cr:
+                api.Environment(cr, SUPERUSER_ID, {})['comm.dialer.dnc'].search(
+                    [('number_normalized', '=', number)]).unlink()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Rolling governor counters: updates from results, decay and pacing."""
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import tagged, common, new_test_user
+
+
+@tagged('comm_dialer', 'post_install', '-at_install')
+class TestDialerGovernor(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.account = cls.env['comm.voip.account'].create({
+            'name': 'Governor Test Trunk', 'usage': 'automation',
+        })
+        cls.campaign = cls.env['comm.dialer.campaign'].create({
+            'name': 'Governor Test',
+            'account_id': cls.account.id,
+            'mode': 'predictive',
+            'max_attempts': 3,
+            'pacing_ratio': 1.0,
+            'target_abandon_rate': 5.0,
+            'stats_half_life': 10.0,
+        })
+        cls.Stats = cls.env['comm.dialer.campaign.stats']
+
+    def _contact(self, number='27600000001'):
+        return self.env['comm.dialer.contact'].create({
+            'campaign_id': self.campaign.id, 'number': number, 'attempts': 1,
+        })
+
+    def _counters(self):
+        return self.Stats._current(self.campaign)
+
+    def test_results_feed_counters(self):
+        contact = self._contact()
+        self.env['comm.voip.call'].create({
+            'account_id': self.account.id,
+            'direction': 'outgoing',
+            'to_number': contact.number,
+            'state': 'completed',
+            'duration': 60,
+            'dialer_contact_id': contact.id,
+        })
+        contact.register_result('completed')
+        self._contact('27600000002').register_result('no_answer')
+        dropped = self._contact('27600000003')
+        dropped.register_result('abandoned')
+
+        counters = self._counters()
+        self.assertAlmostEqual(counters['attempts'], 3, places=2)
+        self.assertAlmostEqual(counters['answers'], 2, places=2)
+        self.assertAlmostEqual(counters['abandons'], 1, places=2)
+        self.assertAlmostEqual(counters['handle_time'], 60, places=0)
+        self.assertEqual(dropped.state, 'retry')
+        self.assertEqual(self.Stats.search_count([('campaign_id', '=', self.campaign.id)]), 1)
+
+    def test_counters_decay(self):
+        self.Stats._record(self.campaign, attempts=40, answers=20)
+        stats = self.Stats.search([('campaign_id', '=', self.campaign.id)])
+        # One half-life ago.
+        stats.updated_at = fields.Datetime.now() - timedelta(minutes=10)
+        self.env.flush_all()
+
+        counters = self._counters()
+        self.assertAlmostEqual(counters['attempts'], 20, delta=0.1)
+
+        self.Stats._record(self.campaign, attempts=1)
+        stats.invalidate_recordset()
+        self.assertAlmostEqual(stats.attempts, 21, delta=0.1)
+        self.assertAlmostEqual(stats.answers, 10, delta=0.1)
+
+    def test_governor_uses_rolling_rates(self):
+        # Cold start: nothing recorded yet.
+        self.assertEqual(self.campaign._answer_rate(), 0.35)
+
+        self.Stats._record(self.campaign, attempts=100, answers=50, abandons=1)
+        self.assertAlmostEqual(self.campaign._answer_rate(), 0.5, places=2)
+        # 4 ready agents at 50% answers: over-dial to 8 lines.
+        self.assertEqual(self.campaign._lines_to_open(4, room=20), 8)
+
+    def test_abandon_ceiling_stops_over_dialling(self):
+        # 10% of answers dropped, over the 5% ceiling.
+        self.Stats._record(self.campaign, attempts=100, answers=50, abandons=5)
+
+        self.assertEqual(self.campaign._lines_to_open(4, room=20), 4)
+        self.assertEqual(self.campaign._lines_to_open(4, room=20, live=3), 1)
+        self.assertAlmostEqual(self.campaign.rolling_abandon_rate, 10.0, places=1)
+
+    def test_reset_list_as_internal_user(self):
+        self._contact().register_result('no_answer')
+        self.assertTrue(self.Stats.search([('campaign_id', '=', self.campaign.id)]))
+        user = new_test_user(self.env, login='dialer_reset_user', groups='base.group_user')
+
+        self.campaign.with_user(user).action_reset_contacts()
+
+        self.assertFalse(self.Stats.search([('campaign_id', '=', self.campaign.id)]))
+        self.assertEqual(self.campaign.contact_ids.mapped('state'), ['pending'])
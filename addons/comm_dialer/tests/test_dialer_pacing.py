@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Pacer contact claiming: order, eligibility, DNC and flat query cost."""
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import tagged, common, new_test_user
+
+
+@tagged('comm_dialer', 'post_install', '-at_install')
+class TestDialerPacing(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.account = cls.env['comm.voip.account'].create({
+            'name': 'Dialer Test Trunk', 'usage': 'automation',
+        })
+        cls.campaign = cls.env['comm.dialer.campaign'].create({
+            'name': 'Pacing Test',
+            'account_id': cls.account.id,
+            'mode': 'predictive',
+            'window_start': 0.0,
+            'window_end': 24.0,
+            'max_attempts': 3,
+        })
+
+    def _contacts(self, count, **vals):
+        return self.env['comm.dialer.contact'].create([dict({
+            'campaign_id': self.campaign.id,
+            'number': '2760%07d' % i,
+            'sequence': i,
+        }, **vals) for i in range(count)])
+
+    def test_claim_order_and_dnc(self):
+        contacts = self._contacts(6)
+        self.env['comm.dialer.dnc'].create({'number': contacts[1].number})
+        contacts[2].attempts = 3
+        contacts[3].next_attempt = fields.Datetime.now() + timedelta(hours=1)
+
+        claimed = self.campaign._claim_contacts(2)
+
+        self.assertEqual(claimed, contacts[0] | contacts[4])
+        self.assertEqual(claimed.mapped('state'), ['dialing', 'dialing'])
+        self.assertEqual(contacts[1].state, 'dnc')
+        self.assertEqual(contacts[2].state, 'pending')
+        self.assertEqual(contacts[3].state, 'pending')
+
+        self.assertEqual(self.campaign._claim_contacts(5), contacts[5])
+        self.assertFalse(self.campaign._claim_contacts(5))
+
+    def test_claim_cost_is_flat(self):
+        self._contacts(60)
+        self.env.flush_all()
+
+        def queries(limit):
+            before = self.env.cr.sql_log_count
+            claimed = self.campaign._claim_contacts(limit)
+            self.assertEqual(len(claimed), limit)
+            return self.env.cr.sql_log_count - before
+
+        self.assertEqual(queries(5), queries(50))
+
+    def test_pace_opens_claimed_lines(self):
+        contacts = self._contacts(30)
+        self.env['comm.dialer.agent.session'].create({
+            'user_id': new_test_user(self.env, login='dialer_pacing_agent').id,
+            'campaign_id': self.campaign.id,
+            'state': 'ready',
+        })
+
+        self.campaign.state = 'running'
+        self.campaign._pace_once()
+
+        dialing = contacts.filtered(lambda c: c.state == 'dialing')
+        self.assertTrue(dialing)
+        self.assertEqual(dialing, contacts[:len(dialing)])
+        self.assertEqual(dialing.mapped('attempts'), [1] * len(dialing))
+        self.assertEqual(len(dialing.call_ids), len(dialing))
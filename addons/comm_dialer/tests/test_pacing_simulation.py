@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Pacing simulator: determinism, plus the pacing benchmark (``comm_bench``).
+
+``COMM_DIALER_SIM_SECONDS`` sets the simulated time per scenario (default
+one hour); ``COMM_DIALER_SIM_OUTPUT`` names the JSON report file.
+"""
+import os
+
+from odoo.tests import tagged, common, new_test_user
+from odoo.addons.comm_whatsapp.tests.common import BenchmarkReport
+
+from ..pacing_sim import PacingSimulator, SimProfile
+
+
+class PacingSimCase(common.TransactionCase):
+
+    def _campaign(self, name, agents, contacts, **vals):
+        account = self.env['comm.voip.account'].create({
+            'name': '%s Trunk' % name, 'usage': 'automation',
+        })
+        campaign = self.env['comm.dialer.campaign'].create(dict({
+            'name': name,
+            'account_id': account.id,
+            'mode': 'predictive',
+            'window_start': 0.0,
+            'window_end': 24.0,
+            'max_attempts': 3,
+            'retry_gap_hours': 0.25,
+        }, **vals))
+        slug = name.lower().replace(' ', '_')
+        self.env['comm.dialer.agent.session'].create([{
+            'user_id': new_test_user(self.env, login='%s_agent_%d' % (slug, i)).id,
+            'campaign_id': campaign.id,
+            'state': 'ready',
+        } for i in range(agents)])
+        self.env['comm.dialer.contact'].create([{
+            'campaign_id': campaign.id,
+            'number': '2761%07d' % i,
+            'sequence': i,
+        } for i in range(contacts)])
+        return campaign
+
+
+@tagged('comm_dialer', 'post_install', '-at_install')
+class TestPacingSimulation(PacingSimCase):
+
+    def test_same_seed_same_result(self):
+        profile = SimProfile(seconds=300, seed=7)
+        first = PacingSimulator(self._campaign('Sim A', 3, 200), profile).run()
+        second = PacingSimulator(self._campaign('Sim B', 3, 200), profile).run()
+
+        self.assertTrue(first['counts']['dialed'])
+        self.assertTrue(first['counts']['completed'])
+        self.assertEqual(first['counts'], second['counts'])
+        self.assertEqual(first['occupancy'], second['occupancy'])
+        self.assertEqual(first['abandon_rate'], second['abandon_rate'])
+
+    def test_progressive_never_abandons(self):
+        campaign = self._campaign('Sim Progressive', 2, 100, mode='progressive')
+        report = PacingSimulator(campaign, SimProfile(seconds=300, seed=3)).run()
+
+        self.assertTrue(report['counts']['connected'])
+        self.assertEqual(report['counts']['abandoned'], 0)
+
+
+@tagged('comm_bench', '-standard', 'post_install', '-at_install')
+class TestPacingBenchmark(BenchmarkReport, PacingSimCase):
+
+    suite = 'comm_dialer.pacing_sim'
+    output_env = 'COMM_DIALER_SIM_OUTPUT'
+    seconds = int(os.environ.get('COMM_DIALER_SIM_SECONDS') or 3600)
+
+    # name -> (campaign values, agents, SimProfile overrides)
+    SCENARIOS = {
+        'progressive_10': ({'mode': 'progressive'}, 10, {}),
+        'predictive_10': ({}, 10, {}),
+        'predictive_10_high_answer': ({}, 10, {'answer_rate': 0.6}),
+        'predictive_10_aggressive': ({'pacing_ratio': 1.5}, 10, {}),
+        'predictive_30_short_calls': ({}, 30, {'handle_time': ('lognormal', 60, 30)}),
+    }
+
+    @classmethod
+    def _report_settings(cls):
+        return {'sim_seconds': cls.seconds}
+
+    def test_scenarios(self):
+        for name, (vals, agents, overrides) in self.SCENARIOS.items():
+            with self.subTest(scenario=name):
+                # Enough contacts that no scenario runs out of numbers.
+                campaign = self._campaign(name, agents, agents * self.seconds // 20, **vals)
+                profile = SimProfile(seconds=self.seconds, **overrides)
+                report = PacingSimulator(campaign, profile).run()
+                self.results[name] = report
+                self.assertTrue(report['counts']['dialed'])
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Recording upload to the filestore and Range playback."""
+from odoo.tests import tagged, HttpCase
+
+
+@tagged('comm_dialer', 'post_install', '-at_install')
+class TestRecordingStream(HttpCase):
+
+    def setUp(self):
+        super().setUp()
+        account = self.env['comm.voip.account'].create({
+            'name': 'Recording Test Trunk', 'usage': 'automation',
+        })
+        self.call = self.env['comm.voip.call'].create({
+            'account_id': account.id,
+            'direction': 'outgoing',
+            'to_number': '27610000001',
+            'state': 'completed',
+        })
+        self.audio = bytes(range(256)) * 4096  # 1 MiB
+        self.authenticate('admin', 'admin')
+
+    def _upload(self, audio):
+        return self.url_open(
+            '/voip/call/upload_recording/%d' % self.call.id,
+            data={'duration': '42'},
+            files={'recording': ('rec.webm', audio, 'audio/webm')},
+        )
+
+    def test_upload_goes_to_filestore(self):
+        res = self._upload(self.audio)
+        self.assertEqual(res.status_code, 200)
+
+        attachment = self.env['ir.attachment'].browse(res.json()['attachment_id'])
+        self.assertEqual(attachment.res_id, self.call.id)
+        self.assertEqual(attachment.file_size, len(self.audio))
+        self.assertEqual(attachment.recording_duration, 42)
+        if attachment._storage() == 'file':
+            self.assertTrue(attachment.store_fname)
+            self.assertFalse(attachment.db_datas)
+        self.assertEqual(attachment.raw, self.audio)
+        self.assertEqual(self.call.transcript_state, 'pending')
+
+    def test_empty_upload_rejected(self):
+        self.assertEqual(self._upload(b'').status_code, 400)
+        self.assertFalse(self.call.recording_ids)
+
+    def test_range_and_etag(self):
+        attachment_id = self._upload(self.audio).json()['attachment_id']
+        url = '/voip/call/recording/%d' % attachment_id
+
+        full = self.url_open(url)
+        self.assertEqual(full.status_code, 200)
+        self.assertEqual(full.content, self.audio)
+        self.assertEqual(full.headers['Accept-Ranges'], 'bytes')
+        self.assertIn('inline', full.headers['Content-Disposition'])
+        etag = full.headers['ETag']
+        self.assertTrue(etag)
+
+        part = self.url_open(url, headers={'Range': 'bytes=1000-1999'})
+        self.assertEqual(part.status_code, 206)
+        self.assertEqual(part.headers['Content-Range'], 'bytes 1000-1999/%d' % len(self.audio))
+        self.assertEqual(part.content, self.audio[1000:2000])
+
+        tail = self.url_open(url, headers={'Range': 'bytes=-10'})
+        self.assertEqual(tail.status_code, 206)
+        self.assertEqual(tail.content, self.audio[-10:])
+
+        cached = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Transcription pool against a fake local Whisper server: bounded
+concurrency, streamed uploads, retries with backoff and stale claims."""
+import re
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from odoo import fields
+from odoo.tests import tagged, common
+
+from ..models.transcription_mixin import TRANSCRIBE_MAX_ATTEMPTS, UPLOAD_CHUNK
+
+
+class _WhisperHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            time.sleep(server.delay)
+            marker = re.search(rb'AUDIO-\d+', body)
+            with server.lock:
+                server.received.append({
+                    'path': self.path,
+                    'headers': dict(self.headers),
+                    'size': len(body),
+                    'marker': marker and marker.group(0).decode(),
+                })
+        finally:
+            with server.lock:
+                server.active -= 1
+        if server.fail:
+            self.send_response(500)
+            self.end_headers()
+            return
+        text = ('hello from %s\n' % (marker and marker.group(0).decode())).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(text)))
+        self.end_headers()
+        self.wfile.write(text)
+
+    def log_message(self, *args):
+        pass
+
+
+@tagged('comm_dialer', 'post_install', '-at_install')
+class TestTranscriptionPool(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _WhisperHandler)
+        cls.server.lock = threading.Lock()
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+        ICP = cls.env['ir.config_parameter'].sudo()
+        ICP.set_param('comm_dialer.whisper_url', 'http://127.0.0.1:%s' % cls.server.server_address[1])
+        ICP.set_param('comm_dialer.whisper_workers', '2')
+        cls.account = cls.env['comm.voip.account'].create({
+            'name': 'Transcription Test Trunk', 'usage': 'automation',
+        })
+        cls.Call = cls.env['comm.voip.call']
+
+    def setUp(self):
+        super().setUp()
+        self.server.received = []
+        self.server.active = self.server.peak = 0
+        self.server.delay = 0
+        self.server.fail = False
+
+    def _recorded_call(self, i, size=3 * UPLOAD_CHUNK):
+        call = self.Call.create({
+            'account_id': self.account.id,
+            'direction': 'outgoing',
+            'to_number': '2761000%04d' % i,
+            'state': 'completed',
+        })
+        audio = (b'AUDIO-%d-' % i).ljust(size, b'x')
+        self.env['ir.attachment'].create({
+            'name': 'call_%d.webm' % i,
+            'res_model': 'comm.voip.call',
+            'res_id': call.id,
+            'res_field': 'recording_ids',
+            'raw': audio,
+            'mimetype': 'audio/webm',
+        })
+        call.transcript_state = 'pending'
+        return call
+
+    def _ours(self, calls):
+        markers = {'AUDIO-%d' % i for i in range(len(calls))}
+        return [r for r in self.server.received if r['marker'] in markers]
+
+    def test_pool_transcribes_with_bounded_concurrency(self):
+        self.server.delay = 0.3
+        calls = self.Call.browse([self._recorded_call(i).id for i in range(5)])
+
+        self.Call._cron_transcribe_pending()
+
+        for i, call in enumerate(calls):
+            self.assertEqual(call.transcript_state, 'done')
+            self.assertEqual(call.transcript, 'hello from AUDIO-%d' % i)
+            self.assertEqual(call.transcript_attempts, 1)
+            self.assertGreaterEqual(call.transcript_duration, 0.3)
+            self.assertFalse(call.transcript_error)
+        received = self._ours(calls)
+        self.assertEqual(len(received), 5)
+        self.assertEqual(self.server.peak, 2)
+        for request in received:
+            self.assertTrue(request['path'].startswith('/asr?'))
+            # Sized stream: Content-Length, no chunked encoding.
+            self.assertNotIn('Transfer-Encoding', request['headers'])
+            self.assertGreater(request['size'], 3 * UPLOAD_CHUNK)
+
+    def test_failures_back_off_then_fail(self):
+        self.server.fail = True
+        call = self._recorded_call(0)
+
+        self.Call._cron_transcribe_pending()
+        self.assertEqual(call.transcript_state, 'pending')
+        self.assertEqual(call.transcript_attempts, 1)
+        self.assertIn('500', call.transcript_error)
+        self.assertGreater(call.transcript_next_try, fields.Datetime.now())
+
+        # Still backing off: not claimed again.
+        self.Call._cron_transcribe_pending()
+        self.assertEqual(len(self._ours(call)), 1)
+
+        for attempt in range(2, TRANSCRIBE_MAX_ATTEMPTS + 1):
+            call.transcript_next_try = fields.Datetime.now() - timedelta(seconds=1)
+            self.Call._cron_transcribe_pending()
+            self.assertEqual(call.transcript_attempts, attempt)
+        self.assertEqual(call.transcript_state, 'failed')
+        self.assertFalse(call.transcript_next_try)
+        self.assertEqual(len(self._ours(call)), TRANSCRIBE_MAX_ATTEMPTS)
+
+    def test_claim_skips_running_and_takes_over_stale(self):
+        now = fields.Datetime.now()
+        running, stale, exhausted = (self._recorded_call(i) for i in range(3))
+        running.write({'transcript_state': 'processing', 'transcript_started_at': now,
+                       'transcript_attempts': 1})
+        stale.write({'transcript_state': 'processing', 'transcript_attempts': 1,
+                     'transcript_started_at': now - timedelta(hours=2)})
+        exhausted.write({'transcript_state': 'processing',
+                         'transcript_attempts': TRANSCRIBE_MAX_ATTEMPTS,
+                         'transcript_started_at': now - timedelta(hours=2)})
+
+        claimed = self.Call._transcription_claim(10)
+
+        self.assertIn(stale, claimed)
+        self.assertNotIn(running, claimed)
+        self.assertNotIn(exhausted, claimed)
+        self.assertEqual(stale.transcript_attempts, 2)
+        self.assertEqual(running.transcript_state, 'processing')
+        self.assertEqual(exhausted.transcript_state, 'failed')
+
+    def test_action_transcribe_runs_now(self):
+        call = self._recorded_call(0)
+        bare = self.Call.create({
+            'account_id': self.account.id, 'direction': 'outgoing',
+            'to_number': '27610009999', 'state': 'completed',
+        })
+
+        (call | bare).action_transcribe()
+
+        self.assertEqual(call.transcript_state, 'done')
+        self.assertEqual(call.transcript, 'hello from AUDIO-0')
+        self.assertEqual(bare.transcript_state, 'none')
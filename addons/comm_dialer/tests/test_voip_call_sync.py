@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Call close-out: duration in the same write, batched partner matching and
+interaction upserts into the omnichannel inbox."""
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import tagged, common
+
+
+@tagged('comm_dialer', 'post_install', '-at_install')
+class TestVoipCallSync(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env['ir.config_parameter'].sudo().set_param('comm_dialer.country_code', '27')
+        cls.account = cls.env['comm.voip.account'].create({
+            'name': 'Sync Test Trunk', 'usage': 'automation',
+        })
+        cls.partner = cls.env['res.partner'].create({
+            'name': 'Thandi Sync', 'mobile': '082 555 0101',
+        })
+        cls.Call = cls.env['comm.voip.call']
+        cls.Interaction = cls.env['comm.interaction']
+
+    def setUp(self):
+        super().setUp()
+        self.end = fields.Datetime.now()
+
+    def _call(self, number, start_offset):
+        return self.Call.create({
+            'account_id': self.account.id,
+            'direction': 'outgoing',
+            'to_number': number,
+            'state': 'in_progress',
+            'start_time': self.end - timedelta(seconds=start_offset),
+        })
+
+    def _interactions(self, calls):
+        return self.Interaction.search([('source_model', '=', 'comm.voip.call'),
+                                        ('source_id', 'in', calls.ids)])
+
+    def test_partner_normalized_number(self):
+        self.assertEqual(self.partner.mobile_normalized, '27825550101')
+        self.assertEqual(
+            self.env['res.partner']._by_normalized_number(['27825550101']),
+            {'27825550101': self.partner})
+
+    def test_burst_close_out(self):
+        known_a = self._call('+27 82 555 0101', 60)
+        known_b = self._call('0825550101', 90)
+        stranger = self._call('0825550199', 30)
+        calls = known_a | known_b | stranger
+        if not self.env.ref('comm_chatbot_voip.channel_voip', raise_if_not_found=False):
+            self.skipTest('no voip channel')
+
+        calls.write({'state': 'completed', 'end_time': self.end})
+
+        self.assertEqual(known_a.duration, 60)
+        self.assertEqual(known_b.duration, 90)
+        self.assertEqual(stranger.duration, 30)
+        self.assertEqual((known_a | known_b).partner_id, self.partner)
+        self.assertTrue(stranger.partner_id)
+        self.assertNotEqual(stranger.partner_id, self.partner)
+        self.assertEqual(known_a.conversation_id, known_b.conversation_id)
+        interactions = self._interactions(calls)
+        self.assertEqual(len(interactions), 3)
+        self.assertIn('1m 0s', interactions.filtered(
+            lambda i: i.source_id == known_a.id).raw_body)
+
+        # Re-sync (e.g. after transcription) updates in place.
+        known_a.ai_summary = 'Customer asked for a callback.'
+        calls._sync_to_conversation()
+        interactions = self._interactions(calls)
+        self.assertEqual(len(interactions), 3)
+        body = interactions.filtered(lambda i: i.source_id == known_a.id).raw_body
+        self.assertIn('Customer asked for a callback.', body)
+
+    def test_explicit_duration_kept(self):
+        call = self._call('0825550101', 60)
+        call.write({'state': 'completed', 'end_time': self.end, 'duration': 5})
+        self.assertEqual(call.duration, 5)
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+from . import comm_dialer_dnc_import
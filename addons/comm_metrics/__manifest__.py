@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+{
+    'name': 'Communication Metrics',
+    'version': '18.0.1.0.0',
+    'category': 'Communications',
+    'summary': 'Prometheus /metrics endpoint for the comms application layer',
+    'description': """
+Communication Metrics
+=====================
+
+Exposes application metrics in the Prometheus text format on ``/metrics``,
+behind a bearer token (``comm_metrics.token`` system parameter, or the
+file named by the ``comm_metrics_token_file`` server option):
+
+- Request-duration histograms for the WhatsApp, SMS, USSD, MCP and kiosk
+  routes, labelled by route
+- Outbound provider calls (Meta, Infobip, Anthropic, Whisper, ...) by
+  status, plus their latency
+- Campaign, transcription and webhook-outbox backlogs, read from the
+  database at scrape time
+
+Counters and histograms are kept in prometheus_client's multiprocess
+store (one mmap file per worker), so every prefork worker contributes to
+the same scrape. Add the module to ``server_wide_modules`` so the prefork
+master can empty that store on start and release the files of exited
+workers.
+
+SQL query budgets: every HTTP request and cron job is profiled (query
+count, SQL time, repeated statement shapes) and logged when it goes over
+``query_budget_http`` / ``query_budget_cron`` from the server config.
+Tests can pin a hot path with ``QueryBudgetCase.assertQueryBudget(n)``
+from ``comm_metrics.tests.common``.
+    """,
+    'author': 'XR Co.',
+    'license': 'LGPL-3',
+    'depends': [
+        'base',
+        'web',
+    ],
+    'external_dependencies': {'python': ['prometheus_client']},
+    'data': [],
+    'installable': True,
+    'application': False,
+    'auto_install': False,
+}
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import hmac
+import logging
+
+from odoo import http
+from odoo.http import request
+from odoo.tools import config
+
+from .. import metrics
+
+_logger = logging.getLogger(__name__)
+
+
+def _file_token():
+    """Token from the file named by the ``comm_metrics_token_file`` server
+    option, the one the Prometheus scrape job reads its credentials from."""
+    path = config.get('comm_metrics_token_file')
+    if not path:
+        return None
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except OSError as e:
+        _logger.warning("comm_metrics: cannot read token file %s: %s", path, e)
+        return None
+
+
+class MetricsController(http.Controller):
+
+    @http.route('/metrics', type='http', auth='none', methods=['GET'], csrf=False)
+    def metrics(self, **kw):
+        """Prometheus scrape endpoint.
+
+        Requires ``Authorization: Bearer <token>``, the token being the
+        ``comm_metrics.token`` system parameter or else the content of the
+        ``comm_metrics_token_file`` server option's file. Without either
+        the endpoint refuses every scrape rather than serving anyone who
+        can reach the port.
+        """
+        env = request.env(su=True)
+        token = env['ir.config_parameter'].get_param('comm_metrics.token') or _file_token()
+        if not token:
+            return request.make_response('Metrics token not configured', status=403)
+        header = request.httprequest.headers.get('Authorization', '')
+        expected = 'Bearer %s' % token
+        if not hmac.compare_digest(header.encode(), expected.encode()):
+            return request.make_response('Unauthorized', status=401)
+        body, content_type = metrics.render(env['comm.metrics']._backlog_metrics())
+        return request.make_response(body, headers=[('Content-Type', content_type)])
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Process-wide Prometheus metrics.
+
+Odoo runs several prefork workers, each with its own memory, so counters
+and histograms go through prometheus_client's multiprocess mode: every
+process writes its samples to mmap files named after its pid in a shared
+directory and ``/metrics`` merges all of them at scrape time. Files of
+workers that were recycled keep counting towards the totals, which is what
+Prometheus expects from counters.
+
+The directory comes from the ``prometheus_multiproc_dir`` server option,
+falling back to ``$TMPDIR/odoo-prometheus``. It must be set before
+prometheus_client is imported anywhere in the process, hence the
+environment juggling at the top of this module.
+
+The files belong to one server run: the prefork master empties the
+directory when it starts and tells prometheus_client when a worker exits
+(``mark_process_dead``). Both happen in the master process, so the module
+must be loaded there, i.e. listed in ``server_wide_modules``; workers log
+a warning when it is not. Counter and histogram files of exited workers
+stay until the next start so totals never go backwards.
+
+Backlog gauges are not stored here: they are read from the database on
+each scrape (see ``comm.metrics``), which is always current and needs no
+cross-worker bookkeeping.
+"""
+import functools
+import logging
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from odoo.modules.registry import Registry
+from odoo.service import server
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    config.get('prometheus_multiproc_dir')
+    or os.path.join(tempfile.gettempdir(), 'odoo-prometheus'),
+)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+import requests  # noqa: E402
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Route prefix -> metrics group. Inbound SMS/USSD are served by the chatbot
+# module and the contact-centre webhooks, so groups go by URL, not addon.
+ROUTE_GROUPS = (
+    ('/whatsapp/', 'whatsapp'),
+    ('/contact_centre/webhook/whatsapp', 'whatsapp'),
+    ('/sms/', 'sms'),
+    ('/contact_centre/webhook/sms', 'sms'),
+    ('/ussd/', 'ussd'),
+    ('/mcp/', 'mcp'),
+    ('/receipt/', 'kiosk'),
+    ('/catalog/export', 'kiosk'),
+    ('/sync/push', 'kiosk'),
+)
+
+# Host (or parent domain) -> provider label for outbound calls. Anything
+# else, customer webhook targets included, is reported as "other".
+PROVIDER_HOSTS = (
+    ('graph.facebook.com', 'meta'),
+    ('infobip.com', 'infobip'),
+    ('api.anthropic.com', 'anthropic'),
+    ('whisper', 'whisper'),
+)
+
+REQUEST_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_DURATION = Histogram(
+    'odoo_http_request_duration_seconds',
+    'Time spent serving an HTTP request, by route.',
+    ['group', 'route', 'method', 'status'],
+    buckets=REQUEST_BUCKETS,
+)
+PROVIDER_REQUESTS = Counter(
+    'odoo_provider_requests_total',
+    'Outbound HTTP calls to external providers, by response status class.',
+    ['provider', 'status'],
+)
+PROVIDER_REQUEST_DURATION = Histogram(
+    'odoo_provider_request_duration_seconds',
+    'Time until an outbound provider call returned its response headers.',
+    ['provider'],
+    buckets=REQUEST_BUCKETS,
+)
+
+
+def route_group(route):
+    """Metrics group of a route template, or None when it is not tracked."""
+    for prefix, group in ROUTE_GROUPS:
+        if route.startswith(prefix):
+            return group
+    return None
+
+
+def provider_for_url(url):
+    host = (urlsplit(url).hostname or '').lower()
+    for domain, provider in PROVIDER_HOSTS:
+        if host == domain or host.endswith('.' + domain):
+            return provider
+    return 'other'
+
+
+def status_class(code):
+    return '%dxx' % (code // 100) if code else 'error'
+
+
+def observe_request(group, route, method, status, seconds):
+    HTTP_REQUEST_DURATION.labels(group, route, method, status_class(status)).observe(
+        seconds)
+
+
+def _installed_here():
+    """Whether the database the current thread works for has this module
+    installed. The patched transport is shared by every database the
+    server hosts; the others' traffic is not ours to count."""
+    dbname = getattr(threading.current_thread(), 'dbname', None)
+    registry = dbname and Registry.registries.get(dbname)
+    return bool(registry) and 'comm.metrics' in registry
+
+
+def _instrument_requests():
+    """Count every ``requests`` call, whichever module makes it.
+
+    Providers are called straight through ``requests`` from a dozen models,
+    so the transport is the one place that sees all of them.
+    """
+    send = requests.Session.send
+    if getattr(send, '_comm_metrics', False):
+        return
+
+    @functools.wraps(send)
+    def instrumented_send(session, request, **kwargs):
+        if not _installed_here():
+            return send(session, request, **kwargs)
+        provider = provider_for_url(request.url)
+        start = time.perf_counter()
+        status = None
+        try:
+            response = send(session, request, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            PROVIDER_REQUESTS.labels(provider, status_class(status)).inc()
+            PROVIDER_REQUEST_DURATION.labels(provider).observe(
+                time.perf_counter() - start)
+
+    instrumented_send._comm_metrics = True
+    requests.Session.send = instrumented_send
+
+
+def clear_multiproc_dir():
+    """Remove the sample files of every process: a new server run starts
+    its counters from zero."""
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    for name in os.listdir(directory):
+        if name.endswith('.db'):
+            os.remove(os.path.join(directory, name))
+
+
+def _hook_prefork_server():
+    """Manage the multiprocess directory from the prefork master: empty it
+    on start, and release a worker's files once the master reaped it."""
+    prefork = server.PreforkServer
+    if getattr(prefork.worker_pop, '_comm_metrics', False):
+        return
+    if isinstance(server.server, prefork):
+        # Imported in a forked worker: the master never loaded the module.
+        _logger.warning(
+            "comm_metrics is not in server_wide_modules: the metrics directory "
+            "%s is not emptied on restart, nor are exited workers' files released.",
+            os.environ['PROMETHEUS_MULTIPROC_DIR'])
+        return
+    start, worker_pop = prefork.start, prefork.worker_pop
+
+    @functools.wraps(start)
+    def start_clearing(self, *args, **kwargs):
+        clear_multiproc_dir()
+        return start(self, *args, **kwargs)
+
+    @functools.wraps(worker_pop)
+    def worker_pop_releasing(self, pid):
+        multiprocess.mark_process_dead(pid)
+        return worker_pop(self, pid)
+
+    worker_pop_releasing._comm_metrics = True
+    prefork.start = start_clearing
+    prefork.worker_pop = worker_pop_releasing
+
+
+class _Families:
+    """Collector returning metric families computed beforehand."""
+
+    def __init__(self, families):
+        self.families = families
+
+    def collect(self):
+        return self.families
+
+
+def render(families=()):
+    """Merge all workers' samples plus ``families`` into the text format.
+
+    :return: (body, content type)
+    """
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(_Families(list(families)))
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+_instrument_requests()
+_hook_prefork_server()
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+from . import comm_metrics
+from . import ir_cron
+from . import ir_http
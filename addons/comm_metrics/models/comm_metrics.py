@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from prometheus_client.core import GaugeMetricFamily
+
+from odoo import api, models
+
+TRANSCRIPTION_MIXIN = 'comm.call.transcription.mixin'
+
+
+class CommMetrics(models.AbstractModel):
+    """Scrape-time gauges read from the database.
+
+    Backlogs live in tables owned by optional modules, so each gauge is only
+    reported when its model is installed. Modules adding a queue can extend
+    :meth:`_backlog_metrics`.
+    """
+    _name = 'comm.metrics'
+    _description = 'Prometheus Metrics'
+
+    def _count_by(self, model_name, field_name, domain):
+        Model = self.env[model_name].sudo()
+        return Model._read_group(domain, [field_name], ['__count'])
+
+    @api.model
+    def _backlog_metrics(self):
+        families = []
+        if 'comm.campaign.send' in self.env:
+            gauge = GaugeMetricFamily(
+                'odoo_campaign_send_backlog',
+                'Campaign sends waiting to go out, by status.',
+                labels=['status'])
+            for status, count in self._count_by(
+                    'comm.campaign.send', 'status',
+                    [('status', 'in', ('queued', 'deferred'))]):
+                gauge.add_metric([status], count)
+            families.append(gauge)
+
+        if TRANSCRIPTION_MIXIN in self.env:
+            gauge = GaugeMetricFamily(
+                'odoo_transcription_backlog',
+                'Call recordings queued for transcription, by call model.',
+                labels=['model'])
+            for model_name in self.env.registry.descendants(
+                    [TRANSCRIPTION_MIXIN], '_inherit'):
+                Model = self.env[model_name]
+                if Model._abstract or not Model._auto:
+                    continue
+                count = Model.sudo().search_count(
+                    [('transcript_state', '=', 'pending')])
+                gauge.add_metric([model_name], count)
+            families.append(gauge)
+
+        if 'cx.integration.webhook.delivery' in self.env:
+            gauge = GaugeMetricFamily(
+                'odoo_webhook_outbox_backlog',
+                'Outbound webhook deliveries not sent yet.',
+                labels=['state'])
+            for state, count in self._count_by(
+                    'cx.integration.webhook.delivery', 'state',
+                    [('state', '=', 'pending')]):
+                gauge.add_metric([state], count)
+            families.append(gauge)
+        return families
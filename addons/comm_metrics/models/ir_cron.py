@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+from .. import query_profiler
+
+
+class IrCron(models.Model):
+    _inherit = 'ir.cron'
+
+    @api.model
+    def _callback(self, cron_name, server_action_id, *args):
+        with query_profiler.watch_queries('cron', cron_name):
+            return super()._callback(cron_name, server_action_id, *args)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import time
+
+from werkzeug.exceptions import HTTPException
+
+from odoo import models
+from odoo.http import request
+
+from .. import metrics, query_profiler
+
+
+class IrHttp(models.AbstractModel):
+    _inherit = 'ir.http'
+
+    @classmethod
+    def _metrics_route(cls, endpoint):
+        """Route template the request matched: bounded label values even
+        for routes with path arguments."""
+        routes = endpoint.routing.get('routes') or ['']
+        path = request.httprequest.path
+        return path if path in routes else routes[0]
+
+    @classmethod
+    def _dispatch(cls, endpoint):
+        route = cls._metrics_route(endpoint)
+        with query_profiler.watch_queries('http', route):
+            group = metrics.route_group(route)
+            if not group:
+                return super()._dispatch(endpoint)
+            start = time.perf_counter()
+            status = 500
+            try:
+                response = super()._dispatch(endpoint)
+                status = getattr(response, 'status_code', 200)
+                return response
+            except HTTPException as e:
+                status = e.code or 500
+                raise
+            finally:
+                metrics.observe_request(
+                    group, route, request.httprequest.method, status,
+                    time.perf_counter() - start)
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""Per-request / per-cron SQL query budgets.
+
+Odoo's cursor calls every function in ``current_thread().query_hooks``
+after each statement (the same hook ``odoo.tools.profiler`` uses), so
+counting needs no cursor patching. A profile only keeps a counter per
+distinct statement text; statements are normalised into shapes when a
+report is actually needed.
+
+Budgets come from the server configuration, ``0`` disabling the check::
+
+    query_budget_http = 150
+    query_budget_cron = 5000
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGETS = {
+    'http': 150,
+    'cron': 5000,
+}
+
+_STRING_LITERALS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'\b\d+\b')
+_PLACEHOLDER_LISTS = re.compile(r'%s(?:\s*,\s*%s)+')
+_SPACES = re.compile(r'\s+')
+
+
+def statement_shape(query):
+    """Statement text with literals and placeholder lists collapsed."""
+    if isinstance(query, bytes):
+        query = query.decode(errors='replace')
+    shape = _STRING_LITERALS.sub('?', str(query))
+    shape = _NUMBERS.sub('?', shape)
+    shape = _PLACEHOLDER_LISTS.sub('%s, ...', shape)
+    return _SPACES.sub(' ', shape).strip()
+
+
+class QueryProfile:
+    """Statements run on the current thread while the profile is active."""
+
+    def __init__(self, label, budget=None):
+        self.label = label
+        self.budget = budget
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, cr, query, params, start, delay):
+        self.count += 1
+        self.duration += delay
+        self.statements[query] += 1
+
+    def over_budget(self):
+        return self.budget is not None and self.count > self.budget
+
+    def repeated(self, limit=5):
+        """Most frequent statement shapes run more than once, with counts."""
+        shapes = Counter()
+        for query, count in self.statements.items():
+            shapes[statement_shape(query)] += count
+        return [(shape, count) for shape, count in shapes.most_common(limit)
+                if count > 1]
+
+    def summary(self):
+        lines = ['%s: %d queries (budget %s), %.1f ms in SQL' % (
+            self.label, self.count, self.budget, self.duration * 1000)]
+        lines += ['  x%d  %s' % (count, shape[:300])
+                  for shape, count in self.repeated()]
+        return '\n'.join(lines)
+
+
+@contextmanager
+def profile_queries(label, budget=None):
+    """Record the queries run on this thread inside the block."""
+    thread = threading.current_thread()
+    if not hasattr(thread, 'query_hooks'):
+        thread.query_hooks = []
+    profile = QueryProfile(label, budget)
+    thread.query_hooks.append(profile)
+    try:
+        yield profile
+    finally:
+        thread.query_hooks.remove(profile)
+
+
+def budget_for(kind):
+    return int(config.get('query_budget_%s' % kind) or DEFAULT_BUDGETS[kind])
+
+
+@contextmanager
+def watch_queries(kind, label):
+    """Log the block's queries when they exceed the ``kind`` budget."""
+    budget = budget_for(kind)
+    if budget <= 0:
+        yield None
+        return
+    with profile_queries(label, budget) as profile:
+        try:
+            yield profile
+        finally:
+            if profile.over_budget():
+                _logger.warning('Query budget exceeded by %s', profile.summary())
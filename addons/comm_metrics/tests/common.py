@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from contextlib import contextmanager
+
+from odoo.addons.comm_metrics.query_profiler import profile_queries
+
+
+class QueryBudgetCase:
+    """Mixin for TransactionCase: ``assertQueryBudget(n)`` fails when the
+    block runs more than ``n`` queries and lists the repeated statements,
+    which is where an N+1 shows up.
+
+    Like ``assertQueryCount`` it flushes before and after the block, and it
+    only sees queries run on the test thread (not HttpCase server requests).
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, budget, flush=True):
+        if flush:
+            self.env.flush_all()
+        with profile_queries(self.id(), budget) as profile:
+            yield profile
+            if flush:
+                self.env.flush_all()
+        if profile.over_budget():
+            self.fail('Query budget exceeded by %s' % profile.summary())
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""/metrics: route histograms, provider counters, backlog gauges, token."""
+import os
+import tempfile
+import threading
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from odoo.service import server
+from odoo.tools import config
+from odoo.tests import tagged, common
+
+from odoo.addons.comm_metrics import metrics
+
+
+def _fake_send(adapter, request, **kwargs):
+    response = requests.Response()
+    response.status_code = 503 if 'fail' in request.url else 200
+    response.url = request.url
+    response.request = request
+    return response
+
+
+@tagged('comm_metrics', 'post_install', '-at_install')
+class TestMetricHelpers(common.BaseCase):
+
+    def test_route_groups(self):
+        self.assertEqual(metrics.route_group('/whatsapp/webhook'), 'whatsapp')
+        self.assertEqual(metrics.route_group('/ussd/inbound'), 'ussd')
+        self.assertEqual(metrics.route_group('/contact_centre/webhook/sms'), 'sms')
+        self.assertEqual(metrics.route_group('/mcp/xmlrpc/object'), 'mcp')
+        self.assertEqual(metrics.route_group('/receipt/send'), 'kiosk')
+        self.assertIsNone(metrics.route_group('/web/login'))
+
+    def test_providers(self):
+        self.assertEqual(
+            metrics.provider_for_url('https://graph.facebook.com/v19.0/1/messages'),
+            'meta')
+        self.assertEqual(
+            metrics.provider_for_url('https://x1y2.api.infobip.com/sms/2/text'),
+            'infobip')
+        self.assertEqual(metrics.provider_for_url('http://whisper:9000/asr'), 'whisper')
+        self.assertEqual(metrics.provider_for_url('https://notinfobip.com/'), 'other')
+
+    def _post_as(self, dbname, url):
+        with patch.object(threading.current_thread(), 'dbname', dbname, create=True), \
+                patch.object(requests.adapters.HTTPAdapter, 'send', _fake_send):
+            requests.post(url, json={})
+
+    def test_outbound_calls_counted(self):
+        ok = metrics.PROVIDER_REQUESTS.labels('meta', '2xx')
+        failed = metrics.PROVIDER_REQUESTS.labels('meta', '5xx')
+        before_ok, before_failed = ok._value.get(), failed._value.get()
+        self._post_as(common.get_db_name(), 'https://graph.facebook.com/v19.0/1/messages')
+        self._post_as(common.get_db_name(), 'https://graph.facebook.com/v19.0/fail')
+        self.assertEqual(ok._value.get() - before_ok, 1)
+        self.assertEqual(failed._value.get() - before_failed, 1)
+
+    def test_other_databases_not_counted(self):
+        ok = metrics.PROVIDER_REQUESTS.labels('meta', '2xx')
+        before = ok._value.get()
+        self._post_as('comm_metrics_not_installed', 'https://graph.facebook.com/v19.0/1/messages')
+        self._post_as(None, 'https://graph.facebook.com/v19.0/1/messages')
+        self.assertEqual(ok._value.get(), before)
+
+    def test_multiproc_dir_cleared(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory):
+            for name in ('counter_4242.db', 'histogram_4242.db', 'README'):
+                open(os.path.join(directory, name), 'wb').close()
+            metrics.clear_multiproc_dir()
+            self.assertEqual(os.listdir(directory), ['README'])
+
+    def test_prefork_master_releases_workers(self):
+        self.assertTrue(getattr(server.PreforkServer.worker_pop, '_comm_metrics', False))
+        with patch.object(metrics.multiprocess, 'mark_process_dead') as mark_dead:
+            master = server.PreforkServer.__new__(server.PreforkServer)
+            master.long_polling_pid = None
+            master.workers = {4242: MagicMock()}
+            master.workers_http, master.workers_cron = {4242: None}, {}
+            server.PreforkServer.worker_pop(master, 4242)
+        mark_dead.assert_called_once_with(4242)
+        self.assertNotIn(4242, master.workers)
+
+
+@tagged('comm_metrics', 'post_install', '-at_install')
+class TestMetricsEndpoint(common.HttpCase):
+
+    def setUp(self):
+        super().setUp()
+        self.env['ir.config_parameter'].sudo().set_param('comm_metrics.token', 's3cret')
+
+    def _scrape(self, token='s3cret'):
+        headers = {'Authorization': 'Bearer %s' % token} if token else {}
+        return self.url_open('/metrics', headers=headers)
+
+    def test_scrape(self):
+        with patch.object(metrics, 'ROUTE_GROUPS', (('/web/health', 'test'),)):
+            self.url_open('/web/health')
+        response = self._scrape()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['Content-Type'].startswith('text/plain'))
+        body = response.text
+        self.assertIn(
+            'odoo_http_request_duration_seconds_count{group="test",'
+            'method="GET",route="/web/health",status="2xx"}', body)
+        self.assertIn('odoo_provider_requests_total', body)
+        for model_name, family in (
+                ('comm.campaign.send', 'odoo_campaign_send_backlog'),
+                ('comm.call.transcription.mixin', 'odoo_transcription_backlog'),
+                ('cx.integration.webhook.delivery', 'odoo_webhook_outbox_backlog')):
+            if model_name in self.env:
+                self.assertIn('# TYPE %s gauge' % family, body)
+
+    def test_token(self):
+        self.assertEqual(self._scrape(token=None).status_code, 401)
+        self.assertEqual(self._scrape(token='wrong').status_code, 401)
+        self.assertEqual(self._scrape().status_code, 200)
+
+    def test_token_required_by_default(self):
+        self.env['ir.config_parameter'].sudo().set_param('comm_metrics.token', False)
+        with patch.dict(config.options, comm_metrics_token_file=None):
+            self.assertEqual(self._scrape(token=None).status_code, 403)
+
+    def test_token_file(self):
+        self.env['ir.config_parameter'].sudo().set_param('comm_metrics.token', False)
+        with tempfile.NamedTemporaryFile('w', suffix='.token') as f:
+            f.write('from-file\n')
+            f.flush()
+            with patch.dict(config.options, comm_metrics_token_file=f.name):
+                self.assertEqual(self._scrape().status_code, 401)
+                self.assertEqual(self._scrape(token='from-file').status_code, 200)
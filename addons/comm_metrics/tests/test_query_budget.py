@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Query profiler: counting, repeated shapes, budget logging, test helper."""
+from unittest.mock import patch
+
+from odoo.tests import tagged, common
+from odoo.tools import config
+
+from odoo.addons.comm_metrics import query_profiler
+from odoo.addons.comm_metrics.tests.common import QueryBudgetCase
+
+
+@tagged('comm_metrics', 'post_install', '-at_install')
+class TestQueryBudget(QueryBudgetCase, common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partners = cls.env['res.partner'].create(
+            [{'name': 'Budget %s' % i} for i in range(5)])
+
+    def _n_plus_one(self):
+        for partner in self.partners:
+            self.env.cr.execute(
+                'SELECT name FROM res_partner WHERE id = %s', [partner.id])
+
+    def test_statement_shape(self):
+        self.assertEqual(
+            query_profiler.statement_shape(
+                "SELECT *  FROM t\n WHERE id IN (%s, %s, %s) AND x = 'a''b' LIMIT 10"),
+            'SELECT * FROM t WHERE id IN (%s, ...) AND x = ? LIMIT ?')
+
+    def test_profile_counts_and_repeats(self):
+        with query_profiler.profile_queries('n+1') as profile:
+            self._n_plus_one()
+            self.env.cr.execute('SELECT 1')
+        self.assertEqual(profile.count, 6)
+        self.assertGreaterEqual(profile.duration, 0)
+        self.assertEqual(
+            profile.repeated(),
+            [('SELECT name FROM res_partner WHERE id = %s', 5)])
+
+    def test_budget_exceeded_is_logged(self):
+        with patch.dict(config.options, {'query_budget_cron': '3'}), \
+                self.assertLogs(query_profiler._logger, 'WARNING') as logs:
+            with query_profiler.watch_queries('cron', 'Test cron'):
+                self._n_plus_one()
+        self.assertIn('Test cron: 5 queries (budget 3)', logs.output[0])
+        self.assertIn('x5  SELECT name FROM res_partner', logs.output[0])
+
+        with patch.dict(config.options, {'query_budget_cron': '0'}):
+            with query_profiler.watch_queries('cron', 'Off') as profile:
+                self._n_plus_one()
+        self.assertIsNone(profile)
+
+    def test_assert_query_budget(self):
+        with self.assertQueryBudget(5):
+            self._n_plus_one()
+        with self.assertRaises(AssertionError) as failure:
+            with self.assertQueryBudget(4):
+                self._n_plus_one()
+        self.assertIn('x5', str(failure.exception))
+
+    def test_scrape_budget(self):
+        """Backlog gauges cost one query per queue, however big it is."""
+        with self.assertQueryBudget(5):
+            self.env['comm.metrics']._backlog_metrics()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Shared plumbing for the ``comm_bench`` benchmarks.
+
+Benchmark classes are tagged ``comm_bench`` and ``-standard``, so the
+regular run skips them; select them explicitly::
+
+    odoo -d bench -i <module> --test-tags comm_bench --stop-after-init
+
+Lives here because every module with a benchmark depends on comm_whatsapp.
+"""
+import json
+import logging
+import math
+import os
+from datetime import datetime, timezone
+
+from odoo import release
+
+_logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class BenchmarkReport:
+    """Mixin for benchmark test classes: tests put their figures in
+    ``cls.results`` (one entry per scenario), and the class reports them
+    once at the end, as JSON to the file named by the ``output_env``
+    environment variable when set, and to the log otherwise.
+
+    ``suite`` names the report; ``_report_settings()`` adds the run
+    parameters a reader needs to compare two reports.
+    """
+    suite = None
+    output_env = 'COMM_BENCH_OUTPUT'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = {}
+
+    @classmethod
+    def _report_settings(cls):
+        return {}
+
+    @classmethod
+    def tearDownClass(cls):
+        modules = cls.env['ir.module.module'].search_read(
+            [('name', '=like', 'comm_%'), ('state', '=', 'installed')],
+            ['name', 'latest_version'])
+        report = dict(cls._report_settings(), **{
+            'suite': cls.suite,
+            'created': datetime.now(timezone.utc).isoformat(),
+            'odoo_version': release.version,
+            'modules': {m['name']: m['latest_version'] for m in modules},
+            'scenarios': cls.results,
+        })
+        output = os.environ.get(cls.output_env)
+        if output:
+            with open(output, 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+        _logger.info('Benchmark %s: %s', cls.suite, json.dumps(report, sort_keys=True))
+        super().tearDownClass()
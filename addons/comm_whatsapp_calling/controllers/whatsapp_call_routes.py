@@ -1,9 +1,8 @@
 # -*- coding: utf-8 -*-
 
-import base64
 import logging
 from odoo import fields, http
-from odoo.http import request
+from odoo.http import Stream, request
 
 _logger = logging.getLogger(__name__)
 
@@ -68,9 +67,7 @@ class WhatsappCallRoutes(http.Controller):
 
         # Restrict the target set to Available team members so the
         # source agent doesn't hand off to an Away team.
-        targets = team.member_ids.filtered(
-            lambda u: u.active and u.wa_call_presence == "available"
-        )
+        targets = team.member_ids._wa_call_available()
         # Exclude the transferring agent so they don't ring themselves.
         targets = targets - request.env.user
 
@@ -127,9 +124,7 @@ class WhatsappCallRoutes(http.Controller):
         teams = Team.search([("active", "=", True)], order="sequence, name")
         out = []
         for t in teams:
-            available = t.member_ids.filtered(
-                lambda u: u.active and u.wa_call_presence == "available"
-            )
+            available = t.member_ids._wa_call_available()
             out.append({
                 "id":               t.id,
                 "name":             t.name,
@@ -291,10 +286,6 @@ class WhatsappCallRoutes(http.Controller):
         if not audio_file:
             return request.make_json_response({"success": False, "error": "Missing recording file"}, status=400)
 
-        data = audio_file.read()
-        if not data:
-            return request.make_json_response({"success": False, "error": "Empty recording"}, status=400)
-
         # The browser is the only party that knows how long the
         # MediaRecorder session actually ran — sent alongside the file
         # as a plain form field.
@@ -304,19 +295,20 @@ class WhatsappCallRoutes(http.Controller):
         except (TypeError, ValueError):
             duration_seconds = 0
 
-        attachment = request.env["ir.attachment"].sudo().create({
+        # Copied to the filestore in chunks, never read whole into memory.
+        attachment = request.env["ir.attachment"].sudo()._create_from_stream(audio_file.stream, {
             "name": f"call_recording_{call_log.call_id or call_log.id}.webm",
             "res_model": "whatsapp.call.log",
             "res_id": call_log.id,
             "res_field": "recording_ids",
-            "type": "binary",
-            "datas": base64.b64encode(data),
             "mimetype": audio_file.mimetype or "audio/webm",
             "recording_duration": duration_seconds,
         })
+        if not attachment:
+            return request.make_json_response({"success": False, "error": "Empty recording"}, status=400)
         _logger.info(
             "comm_whatsapp_calling: stored recording (%d bytes) for call %s as attachment %s",
-            len(data), call_log_id, attachment.id,
+            attachment.file_size, call_log_id, attachment.id,
         )
         return request.make_json_response({"success": True, "attachment_id": attachment.id})
 
@@ -351,15 +343,11 @@ class WhatsappCallRoutes(http.Controller):
                 status=403,
             )
 
-        data = base64.b64decode(attachment.datas or b"")
-        disposition = "attachment" if want_download else "inline"
-        headers = [
-            ("Content-Type", attachment.mimetype or "audio/webm"),
-            ("Content-Length", str(len(data))),
-            ("Content-Disposition", f'{disposition}; filename="{attachment.name}"'),
-            ("Cache-Control", "private, max-age=0"),
-        ]
-        return request.make_response(data, headers=headers)
+        # Streamed from the filestore with ETag and Range / 206 support, so
+        # the player can seek without the whole file passing through memory.
+        response = Stream.from_attachment(attachment).get_response(as_attachment=want_download)
+        response.headers["Cache-Control"] = "private, max-age=0"
+        return response
 
     @http.route(
         "/whatsapp/call/answer/<int:call_log_id>",
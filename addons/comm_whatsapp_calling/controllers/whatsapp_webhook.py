@@ -256,10 +256,8 @@ class WhatsAppWebhookCalling(WhatsAppAuthController):
                 call_log.from_number or "",
             )
             if not users:
-                users = request.env["res.users"].sudo().search([
-                    ("active", "=", True),
-                    ("wa_call_presence", "=", "available"),
-                ])
+                Users = request.env["res.users"].sudo()
+                users = Users.browse(sorted(Users._wa_call_available_ids()))
             bus = request.env["bus.bus"].sudo()
             # Target the user's partner record — Odoo 18 auto-subscribes
             # each authenticated session to its partner channel, so this
@@ -3,6 +3,7 @@
 from . import comm_disposition
 from . import whatsapp_call_log
 from . import ir_attachment
+from . import ir_websocket
 from . import res_partner
 from . import res_users
 from . import whatsapp_call_team
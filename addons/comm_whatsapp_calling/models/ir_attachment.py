@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
+import os
+import tempfile
+
 from odoo import _, api, fields, models
 from odoo.exceptions import AccessError
 
+# Uploads are hashed and copied to the filestore this many bytes at a time.
+UPLOAD_CHUNK = 256 * 1024
+
 
 class IrAttachment(models.Model):
     _inherit = "ir.attachment"
@@ -22,6 +29,49 @@ class IrAttachment(models.Model):
             secs = att.recording_duration or 0
             att.recording_duration_display = f"{secs // 60}:{secs % 60:02d}" if secs else ""
 
+    @api.model
+    def _create_from_stream(self, stream, vals):
+        """Create a binary attachment from a file-like object, hashing and
+        copying it into the filestore in chunks so the upload is never held
+        in memory. With database storage it falls back to a ``raw`` create.
+
+        Returns the attachment, or an empty recordset for an empty stream.
+        """
+        if self._storage() != "file":
+            raw = stream.read()
+            return self.create(dict(vals, raw=raw)) if raw else self.browse()
+        filestore = self._filestore()
+        os.makedirs(filestore, exist_ok=True)
+        sha, size = hashlib.sha1(), 0
+        fd, tmp_path = tempfile.mkstemp(dir=filestore, prefix="upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in iter(lambda: stream.read(UPLOAD_CHUNK), b""):
+                    sha.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+            if not size:
+                return self.browse()
+            checksum = sha.hexdigest()
+            # Same layout as ir.attachment._get_path.
+            fname = checksum[:2] + "/" + checksum
+            full_path = self._full_path(fname)
+            if not os.path.exists(full_path):
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(tmp_path, full_path)
+                self._mark_for_gc(fname)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        attachment = self.create(dict(vals, type="binary"))
+        # create()/write() drop the storage fields, so set them directly.
+        self.env.cr.execute("""
+            UPDATE ir_attachment SET store_fname = %s, file_size = %s, checksum = %s
+             WHERE id = %s
+        """, [fname, size, checksum, attachment.id])
+        attachment.invalidate_recordset()
+        return attachment
+
     def _is_call_recording(self):
         return self.filtered(
             lambda a: a.res_model == "whatsapp.call.log" and a.res_field == "recording_ids"
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = "ir.websocket"
+
+    def _build_bus_channel_list(self, channels):
+        # Subscribe each session to its user's shared channels (call teams,
+        # internal users — see res.users._comm_bus_channels) on the server
+        # side, so browsers can't pick channels they don't belong to.
+        # Membership changes apply from the session's next subscription.
+        channels = list(super()._build_bus_channel_list(channels))
+        user = self.env.user
+        if user and not user._is_public():
+            channels.extend(user.sudo()._comm_bus_channels())
+        return channels
@@ -1,6 +1,17 @@
 # -*- coding: utf-8 -*-
 
-from odoo import fields, models
+import threading
+
+from odoo import api, fields, models, sql_db
+
+# Bumped after every commit that changes someone's call availability;
+# workers reload their copy of the available set when it moves.
+PRESENCE_SEQUENCE = "wa_call_presence_generation"
+_DIRTY_KEY = "comm_whatsapp_calling.presence_changed"
+
+# dbname -> (generation, frozenset of available user ids), per worker.
+_AVAILABLE = {}
+_AVAILABLE_LOCK = threading.Lock()
 
 
 class ResUsers(models.Model):
@@ -16,3 +27,98 @@ class ResUsers(models.Model):
     ], string="Call Presence", default="available",
        help="Controls whether inbound WhatsApp call notifications ring "
             "this user's browser. Set from the systray phone menu.")
+
+    def init(self):
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % PRESENCE_SEQUENCE)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        users = super().create(vals_list)
+        users._presence_changed()
+        return users
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "wa_call_presence" in vals or "active" in vals:
+            self._presence_changed()
+            # Browsers showing agent status follow along over the bus.
+            self.env["bus.bus"].sudo()._sendone(
+                self.env.ref("base.group_user"), "whatsapp_call_presence",
+                [{"user_id": u.id, "presence": u.wa_call_presence if u.active else False}
+                 for u in self])
+        return res
+
+    # ── Presence cache ──────────────────────────────────────────────────
+    def _presence_changed(self):
+        """Bump the generation once this transaction commits, so every
+        worker reloads its available set. Until then this transaction reads
+        the table directly, so it sees its own changes and nobody caches
+        rows that may still roll back."""
+        cr = self.env.cr
+        if cr.postcommit.data.get(_DIRTY_KEY):
+            return
+        cr.precommit.data[_DIRTY_KEY] = True
+        cr.postcommit.data[_DIRTY_KEY] = True
+        dbname = cr.dbname
+
+        def bump_generation():
+            with sql_db.db_connect(dbname).cursor() as bump_cr:
+                bump_cr.execute("SELECT nextval(%s)", [PRESENCE_SEQUENCE])
+        cr.postcommit.add(bump_generation)
+
+    @api.model
+    def _wa_call_presence_generation(self):
+        """Current presence generation. A sequence nextval() was never
+        called on reports last_value 1, the same as after the first call,
+        so it reads as 0 until then."""
+        self.env.cr.execute(
+            "SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM %s"
+            % PRESENCE_SEQUENCE)
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _wa_call_available_ids(self):
+        """Ids of the active users marked Available for calls, from this
+        worker's cache (one sequence read when nothing changed)."""
+        cr = self.env.cr
+        if cr.precommit.data.get(_DIRTY_KEY):
+            return self._wa_call_read_available()
+        generation = self._wa_call_presence_generation()
+        cached = _AVAILABLE.get(cr.dbname)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        with _AVAILABLE_LOCK:
+            cached = _AVAILABLE.get(cr.dbname)
+            if cached is None or cached[0] != generation:
+                # Read on a fresh cursor: this transaction's snapshot may
+                # predate the commit that moved the generation.
+                with self.env.registry.cursor() as fresh_cr:
+                    available = self.with_env(self.env(cr=fresh_cr))._wa_call_read_available()
+                cached = (generation, available)
+                _AVAILABLE[cr.dbname] = cached
+        return cached[1]
+
+    @api.model
+    def _wa_call_read_available(self):
+        self.flush_model(["active", "wa_call_presence"])
+        self.env.cr.execute("""
+            SELECT id FROM res_users WHERE active AND wa_call_presence = 'available'
+        """)
+        return frozenset(row[0] for row in self.env.cr.fetchall())
+
+    def _wa_call_available(self):
+        """The users of this recordset who are active and Available."""
+        available = self._wa_call_available_ids()
+        return self.filtered(lambda u: u.id in available)
+
+    def _comm_bus_channels(self):
+        """Shared bus channels this user listens on besides their partner:
+        the call teams they are on and, for internal users, the internal
+        user group. Team- or audience-wide events are sent once to one of
+        these instead of once per user."""
+        self.ensure_one()
+        channels = list(self.env["whatsapp.call.team"].sudo().search(
+            [("member_ids", "in", self.id)]))
+        if self._is_internal():
+            channels.append(self.env.ref("base.group_user"))
+        return channels
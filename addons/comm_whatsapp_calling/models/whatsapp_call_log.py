@@ -574,11 +574,13 @@ class WhatsappCallLog(models.Model):
         return self._send_call_action_to_meta("pre_accept")
 
     def _broadcast_call_taken(self, verb):
-        """Push a whatsapp_call_taken bus event to every user's partner
-        channel so any other agent who still has this call's popup
-        showing can remove it. verb is one of accepted / declined /
-        terminated so the notification can carry context if a future
-        UI wants to show 'answered by Alice' etc."""
+        """Push a whatsapp_call_taken bus event so any other agent who
+        still has this call's popup showing can remove it. Sent once to
+        the internal-user group channel every agent's session listens on
+        (see res.users._comm_bus_channels), not once per user. verb is one
+        of accepted / declined / terminated / remote_ended so the
+        notification can carry context if a future UI wants to show
+        'answered by Alice' etc."""
         try:
             if "bus.bus" not in self.env:
                 return
@@ -590,17 +592,8 @@ class WhatsappCallLog(models.Model):
                 # popup isn't nuked before it can complete accept.
                 "taken_by_uid": self.env.uid,
             }
-            users = self.env["res.users"].sudo().search(
-                [("active", "=", True)]
-            )
-            bus = self.env["bus.bus"].sudo()
-            for u in users:
-                if u.partner_id:
-                    try:
-                        bus._sendone(u.partner_id,
-                                     "whatsapp_call_taken", payload)
-                    except AttributeError:
-                        break
+            self.env["bus.bus"].sudo()._sendone(
+                self.env.ref("base.group_user"), "whatsapp_call_taken", payload)
         except Exception as e:
             _logger.warning(
                 "comm_whatsapp_calling: could not broadcast call taken: %s", e
@@ -6,12 +6,18 @@ matching rule's target agent set (intersected with users currently
 Available) receives the popup. If no rule matches, we fall back to
 broadcasting to every available user — preserving the pre-routing
 behaviour so an install with zero rules keeps working as before.
+
+The active rules are compiled once into an ordered matcher per WABA
+(``_compiled_rules``, an ormcache cleared whenever a rule or team
+changes), and availability comes from the per-worker presence cache on
+res.users, so resolving a ringing call costs no rule query and no regex
+compilation.
 """
 
 import logging
 import re
 
-from odoo import api, fields, models
+from odoo import api, fields, models, tools
 
 _logger = logging.getLogger(__name__)
 
@@ -84,20 +90,42 @@ class WhatsappCallRoutingRule(models.Model):
             )
             return None
 
-    def _matches(self, account_id, from_number):
-        """Cheap check: WABA scope + optional regex on the caller."""
-        self.ensure_one()
-        if self.account_id and self.account_id.id != account_id:
-            return False
-        rx = self._regex()
-        if rx is not None and not rx.search(from_number or ""):
-            return False
-        return True
-
-    def _resolve_users(self):
-        """Union of every member of every attached team."""
-        self.ensure_one()
-        return self.mapped("team_ids.member_ids")
+    @api.model_create_multi
+    def create(self, vals_list):
+        rules = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return rules
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache()
+    def _compiled_rules(self):
+        """The active rules as ``(by_account, any_account)``: for each WABA
+        with rules of its own, the ordered tuple of rules that apply to it,
+        and the tuple for every other WABA. A rule is ``(name, regex or
+        None, frozenset of member user ids)``."""
+        rules = self.sudo().search([("active", "=", True)])
+        compiled = [
+            (rule.account_id.id or None,
+             (rule.name, rule._regex(), frozenset(rule.team_ids.member_ids.ids)))
+            for rule in rules
+        ]
+        any_account = tuple(entry for account, entry in compiled if account is None)
+        by_account = {
+            account_id: tuple(entry for account, entry in compiled
+                              if account in (None, account_id))
+            for account_id in {account for account, _entry in compiled if account}
+        }
+        return by_account, any_account
 
     @api.model
     def resolve_target_users(self, account_id, from_number):
@@ -108,18 +136,17 @@ class WhatsappCallRoutingRule(models.Model):
         matching rule resolves to zero available users, returns the
         empty set — the caller decides whether to fall back to all-
         available broadcast."""
-        rules = self.sudo().search([("active", "=", True)])
-        for rule in rules:
-            if not rule._matches(account_id, from_number):
+        by_account, any_account = self._compiled_rules()
+        Users = self.env["res.users"]
+        from_number = from_number or ""
+        for name, rx, members in by_account.get(account_id, any_account):
+            if rx is not None and not rx.search(from_number):
                 continue
-            targets = rule._resolve_users()
-            available = targets.filtered(
-                lambda u: u.active and u.wa_call_presence == "available"
-            )
+            available = members & Users._wa_call_available_ids()
             _logger.info(
                 "comm_whatsapp_calling: routing rule %s matched — "
                 "%s targets, %s available",
-                rule.name, len(targets), len(available),
+                name, len(members), len(available),
             )
-            return available
-        return self.env["res.users"]
+            return Users.browse(sorted(available))
+        return Users
@@ -60,6 +60,19 @@ class WhatsappCallTeam(models.Model):
          "Team names must be unique."),
     ]
 
+    # Routing rules are compiled with their active teams' members; see
+    # whatsapp.call.routing.rule._compiled_rules.
+    def write(self, vals):
+        res = super().write(vals)
+        if "member_ids" in vals or "active" in vals:
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
     def _compute_member_count(self):
         for t in self:
             t.member_count = len(t.member_ids)
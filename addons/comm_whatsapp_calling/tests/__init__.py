@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+from . import test_call_routing
+from . import test_bus_channels
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Shared bus channels: each websocket session is subscribed server-side
+to its user's call teams, and to no other team."""
+from unittest.mock import MagicMock, patch
+
+from odoo.tests import tagged, common, new_test_user
+
+
+@tagged('comm_whatsapp_calling', 'post_install', '-at_install')
+class TestBusChannels(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.agent = new_test_user(cls.env, login='wa_bus_agent', groups='base.group_user')
+        cls.other_agent = new_test_user(cls.env, login='wa_bus_other', groups='base.group_user')
+        Team = cls.env['whatsapp.call.team']
+        cls.team = Team.create({'name': 'Bus Team', 'member_ids': [(6, 0, cls.agent.ids)]})
+        cls.other_team = Team.create({'name': 'Other Bus Team', 'member_ids': [(6, 0, cls.other_agent.ids)]})
+
+    def _channels(self, user):
+        # The bus base implementation reads the session off the websocket
+        # request; there is none outside a real connection.
+        session_request = MagicMock()
+        session_request.session.uid = user.id
+        with patch('odoo.addons.bus.models.ir_websocket.request', session_request):
+            return self.env['ir.websocket'].with_user(user)._build_bus_channel_list([])
+
+    def test_session_gets_own_team_channels_only(self):
+        channels = self._channels(self.agent)
+        self.assertIn(self.team, channels)
+        self.assertIn(self.env.ref('base.group_user'), channels)
+        self.assertNotIn(self.other_team, channels)
+
+        channels = self._channels(self.other_agent)
+        self.assertIn(self.other_team, channels)
+        self.assertNotIn(self.team, channels)
+
+    def test_team_membership_applies_on_next_subscription(self):
+        self.assertNotIn(self.other_team, self._channels(self.agent))
+        self.other_team.member_ids = [(4, self.agent.id)]
+        self.assertIn(self.other_team, self._channels(self.agent))
+
+    def test_portal_user_gets_no_team_channel(self):
+        portal = new_test_user(self.env, login='wa_bus_portal', groups='base.group_portal')
+        channels = self._channels(portal)
+        self.assertNotIn(self.team, channels)
+        self.assertNotIn(self.env.ref('base.group_user'), channels)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""Inbound call routing: compiled rules, presence cache, plus the
+resolution benchmark (``comm_bench``).
+
+``COMM_WA_ROUTING_RULES`` sets the number of rules (default 500);
+``COMM_WA_ROUTING_OUTPUT`` names the JSON report file.
+"""
+import logging
+import os
+import time
+
+from odoo import SUPERUSER_ID, api
+from odoo.modules.registry import Registry
+from odoo.tests import tagged, common, new_test_user
+from odoo.addons.comm_whatsapp.tests.common import BenchmarkReport, percentile
+
+from ..models.res_users import PRESENCE_SEQUENCE, _AVAILABLE, _DIRTY_KEY
+
+
+class CallRoutingCase(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Rule = cls.env['whatsapp.call.routing.rule']
+        cls.Rule.search([]).write({'active': False})
+        cls.account = cls.env['comm.whatsapp.account'].create({
+            'name': 'Routing Test', 'phone_number': '+27693808801',
+            'phone_number_id': 'wa-routing-test', 'access_token': 'tok',
+        })
+
+    @classmethod
+    def _agents(cls, prefix, count):
+        return cls.env['res.users'].browse([
+            new_test_user(cls.env, login='%s%d' % (prefix, i), groups='base.group_user').id
+            for i in range(count)
+        ])
+
+    @classmethod
+    def _team(cls, name, users):
+        return cls.env['whatsapp.call.team'].create({
+            'name': name, 'member_ids': [(6, 0, users.ids)],
+        })
+
+    @classmethod
+    def _rule(cls, name, team, sequence, **vals):
+        return cls.Rule.create(dict({
+            'name': name, 'sequence': sequence, 'team_ids': [(6, 0, team.ids)],
+        }, **vals))
+
+
+@tagged('comm_whatsapp_calling', 'post_install', '-at_install')
+class TestCallRouting(CallRoutingCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.za_agents = cls._agents('wa_route_za', 2)
+        cls.vip_agents = cls._agents('wa_route_vip', 1)
+        cls.desk_agents = cls._agents('wa_route_desk', 1)
+        cls.vip_rule = cls._rule('VIP', cls._team('VIP', cls.vip_agents), 1,
+                                 caller_pattern=r'^\+2782555')
+        cls.za_rule = cls._rule('South Africa', cls._team('ZA', cls.za_agents), 5,
+                                caller_pattern=r'^\+27')
+        cls.desk_rule = cls._rule('Desk', cls._team('Desk', cls.desk_agents), 10,
+                                  account_id=cls.account.id)
+
+    def _resolve(self, number, account=None):
+        return self.Rule.resolve_target_users((account or self.env['comm.whatsapp.account']).id,
+                                              number)
+
+    def test_first_match_wins(self):
+        self.assertEqual(self._resolve('+27825550101'), self.vip_agents)
+        self.assertEqual(self._resolve('+27115550101'), self.za_agents)
+        self.assertFalse(self._resolve('+15555550101'))
+
+    def test_account_rules_only_apply_to_their_account(self):
+        self.assertEqual(self._resolve('+15555550101', self.account), self.desk_agents)
+        self.assertEqual(self._resolve('+27115550101', self.account), self.za_agents)
+        self.assertFalse(self._resolve('+15555550101'))
+
+    def test_unavailable_agents_skipped(self):
+        self.za_agents[0].wa_call_presence = 'away'
+        self.assertEqual(self._resolve('+27115550101'), self.za_agents[1])
+        self.za_agents[1].active = False
+        self.assertFalse(self._resolve('+27115550101'))
+        self.za_agents[0].wa_call_presence = 'available'
+        self.assertEqual(self._resolve('+27115550101'), self.za_agents[0])
+
+    def test_rule_and_team_edits_recompile(self):
+        self.assertEqual(self._resolve('+27825550101'), self.vip_agents)
+        self.vip_rule.active = False
+        self.assertEqual(self._resolve('+27825550101'), self.za_agents)
+        self.za_rule.caller_pattern = r'^\+2711'
+        self.assertFalse(self._resolve('+27825550101'))
+        self.za_rule.team_ids.member_ids = self.desk_agents
+        self.assertEqual(self._resolve('+27115550101'), self.desk_agents)
+
+    def test_archived_team_stops_ringing(self):
+        self.assertEqual(self._resolve('+27115550101'), self.za_agents)
+        self.za_rule.team_ids.active = False
+        self.assertFalse(self._resolve('+27115550101'))
+        self.za_rule.with_context(active_test=False).team_ids.active = True
+        self.assertEqual(self._resolve('+27115550101'), self.za_agents)
+
+    def test_first_presence_change_moves_generation(self):
+        # Put the sequence back in its just-created state for this test.
+        self.cr.execute("SELECT last_value, is_called FROM %s" % PRESENCE_SEQUENCE)
+        last_value, is_called = self.cr.fetchone()
+        self.cr.execute("SELECT setval(%s, 1, false)", [PRESENCE_SEQUENCE])
+        self.addCleanup(self.cr.execute, "SELECT setval(%s, %s, %s)",
+                        [PRESENCE_SEQUENCE, last_value, is_called])
+        self.addCleanup(_AVAILABLE.pop, self.cr.dbname, None)
+
+        Users = self.env['res.users']
+        before = Users._wa_call_presence_generation()
+        self.za_agents[0].wa_call_presence = 'away'
+        self.cr.postcommit.run()  # what the cursor runs after the commit
+        self.assertNotEqual(Users._wa_call_presence_generation(), before)
+
+    def test_invalid_pattern_matches_any_caller(self):
+        self.vip_rule.caller_pattern = '(unclosed'
+        self.assertEqual(self._resolve('+15555550101'), self.vip_agents)
+
+
+@tagged('comm_whatsapp_calling', 'post_install', '-at_install')
+class TestPresenceCacheSnapshot(common.BaseCase):
+    """Real committed transactions: the worker copy must not pair an older
+    snapshot's presence with a newer generation."""
+
+    def _set_admin_presence(self, registry, presence):
+        with registry.cursor() as cr:
+            admin = api.Environment(cr, SUPERUSER_ID, {}).ref('base.user_admin')
+            previous = admin.wa_call_presence
+            admin.wa_call_presence = presence
+        return previous
+
+    def test_reload_sees_presence_committed_after_snapshot(self):
+        registry = Registry(common.get_db_name())
+        previous = self._set_admin_presence(registry, 'available')
+        try:
+            with registry.cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                admin_id = env.ref('base.user_admin').id
+                self.assertIn(admin_id, env['res.users']._wa_call_available_ids())
+                self._set_admin_presence(registry, 'away')
+                # The generation moved after that commit; this transaction's
+                # snapshot predates it.
+                self.assertNotIn(admin_id, env['res.users']._wa_call_available_ids())
+        finally:
+            self._set_admin_presence(registry, previous)
+
+
+@tagged('comm_bench', '-standard', 'post_install', '-at_install')
+class TestCallRoutingBenchmark(BenchmarkReport, CallRoutingCase):
+
+    suite = 'comm_whatsapp_calling.routing'
+    output_env = 'COMM_WA_ROUTING_OUTPUT'
+    rules = int(os.environ.get('COMM_WA_ROUTING_RULES') or 500)
+    calls = 2000
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        agents = cls._agents('wa_bench', 100)
+        agents[::3].write({'wa_call_presence': 'away'})
+        teams = [cls._team('Bench %d' % i, agents[i * 5:i * 5 + 10]) for i in range(19)]
+        for i in range(cls.rules):
+            # Country-code prefixes that mostly miss, so a call walks a
+            # good part of the list before the catch-all at the end.
+            cls._rule('Bench %d' % i, teams[i % len(teams)], i,
+                      caller_pattern=r'^\+%d\d{3}%02d' % (200 + i % 700, i % 100),
+                      account_id=cls.account.id if i % 4 == 0 else False)
+        cls._rule('Catch-all', teams[0], cls.rules)
+        # As if committed: drop the uncommitted-changes flag and run the
+        # post-commit generation bump, so lookups go through the cache.
+        cls.env.flush_all()
+        cls.env.cr.precommit.data.pop(_DIRTY_KEY, None)
+        cls.env.cr.postcommit.run()
+
+    @classmethod
+    def _report_settings(cls):
+        return {'rules': cls.rules + 1, 'calls': cls.calls}
+
+    def test_resolution_under_a_millisecond(self):
+        numbers = ['+%d%07d' % (200 + i % 800, i * 7919 % 10 ** 7) for i in range(self.calls)]
+        self.Rule.resolve_target_users(self.account.id, numbers[0])  # warm the caches
+        logger = logging.getLogger('odoo.addons.comm_whatsapp_calling.models.whatsapp_call_routing_rule')
+        timings = []
+        with self.assertLogs(logger, 'INFO'):  # keep the per-call log line quiet
+            for i, number in enumerate(numbers):
+                account_id = self.account.id if i % 2 else None
+                start = time.perf_counter()
+                users = self.Rule.resolve_target_users(account_id, number)
+                timings.append(time.perf_counter() - start)
+                self.assertTrue(users)
+        timings.sort()
+        stats = self.results['resolve'] = {
+            'latency_ms': {
+                name: round(percentile(timings, pct) * 1000, 4)
+                for name, pct in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100))
+            },
+        }
+        self.assertLess(stats['latency_ms']['p50'], 1.0)
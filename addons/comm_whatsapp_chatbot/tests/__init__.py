@@ -6,3 +6,4 @@ from . import test_accounts
 from . import test_simulator
 from . import test_voice_and_isset
 from . import test_agent_workspace
+from . import test_replay_benchmark
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""Replay benchmark for the inbound webhook paths.
+
+Recorded, anonymised payloads under ``tests/replay/`` are posted to the
+in-process test server: Meta WhatsApp messages and statuses, Infobip SMS
+delivery reports and USSD sessions. Outbound provider calls (Graph API,
+Infobip, ...) are answered by a local stub, so only our own code is
+measured.
+
+A ``comm_bench`` benchmark. ``COMM_BENCH_ITERATIONS`` sets how many times
+each payload is replayed (default 50); ``COMM_BENCH_OUTPUT`` names the JSON
+report file. Compare two runs with ``scripts/compare_bench.py``.
+"""
+import json
+import os
+import time
+from datetime import datetime
+from unittest.mock import patch
+from urllib.parse import urlsplit
+
+import requests
+
+from odoo import sql_db
+from odoo.modules.module import get_module_path
+from odoo.tests import tagged, HttpCase
+from odoo.addons.comm_whatsapp.tests.common import BenchmarkReport, percentile
+
+PAYLOAD_DIR = os.path.join(get_module_path('comm_whatsapp_chatbot'), 'tests', 'replay')
+LOCAL_HOSTS = ('127.0.0.1', 'localhost')
+_real_send = requests.adapters.HTTPAdapter.send
+
+
+def _stub_json(url):
+    host = urlsplit(url).hostname or ''
+    if host.endswith('graph.facebook.com'):
+        return {'messaging_product': 'whatsapp',
+                'messages': [{'id': 'wamid.STUB%d' % time.perf_counter_ns()}]}
+    if host.endswith('infobip.com'):
+        return {'messages': [{'messageId': 'stub', 'status': {'groupName': 'PENDING'}}]}
+    return {}
+
+
+def _stub_send(adapter, request, **kwargs):
+    """Let requests to the test server through, answer everything else."""
+    if urlsplit(request.url).hostname in LOCAL_HOSTS:
+        return _real_send(adapter, request, **kwargs)
+    response = requests.Response()
+    response.status_code = 200
+    response.url = request.url
+    response.request = request
+    response.headers['Content-Type'] = 'application/json'
+    response._content = json.dumps(_stub_json(request.url)).encode()
+    return response
+
+
+def _fill(value, seq, ts):
+    """Make a payload unique per replay: ``{seq}`` and ``{ts}`` in strings."""
+    if isinstance(value, dict):
+        return {k: _fill(v, seq, ts) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill(v, seq, ts) for v in value]
+    if isinstance(value, str):
+        return value.replace('{seq}', '%07d' % seq).replace('{ts}', str(ts))
+    return value
+
+
+def load_payloads(name):
+    with open(os.path.join(PAYLOAD_DIR, name + '.json')) as f:
+        return json.load(f)
+
+
+@tagged('comm_bench', '-standard', 'post_install', '-at_install')
+class TestReplayBenchmark(BenchmarkReport, HttpCase):
+
+    suite = 'comm_whatsapp_chatbot.replay'
+    iterations = int(os.environ.get('COMM_BENCH_ITERATIONS') or 50)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Step = cls.env['whatsapp.chatbot.step']
+        for channel, sender in (('whatsapp', False), ('ussd', '*120*555#')):
+            bot = cls.env['whatsapp.chatbot'].create({
+                'name': 'Bench %s bot' % channel,
+                'channel': channel,
+                'sender_address': sender,
+                'status': 'published',
+            })
+            welcome = Step.create({
+                'name': 'Welcome', 'chatbot_id': bot.id, 'step_type': 'message',
+                'body_plain': 'Welcome', 'sequence': 1,
+            })
+            question = Step.create({
+                'name': 'Menu', 'chatbot_id': bot.id, 'step_type': 'question_text',
+                'body_plain': '1. Balance\n2. Help', 'parent_id': welcome.id,
+                'sequence': 10,
+            })
+            Step.create({
+                'name': 'End', 'chatbot_id': bot.id, 'step_type': 'end_flow',
+                'parent_id': question.id,
+            })
+            if channel == 'whatsapp':
+                cls.env['whatsapp.chatbot.trigger'].create(
+                    {'name': 'hi', 'chatbot_id': bot.id})
+
+        now = datetime.now()
+        cls.env['whatsapp.message'].create([{
+            'message_id': 'wamid.BENCH%07dOUT' % seq,
+            'message_timestamp': now,
+            'is_incoming': False,
+        } for seq in range(cls.iterations)])
+        cls.env['sms.sms'].create([{
+            'number': '2760%07d' % seq,
+            'body': 'Bench',
+            'state': 'sent',
+            'uuid': 'bench%07d00000000000000000' % seq,
+        } for seq in range(cls.iterations)])
+
+    @classmethod
+    def _report_settings(cls):
+        return {'iterations': cls.iterations}
+
+    def _replay(self, scenario, path, payloads, as_json=True):
+        """Post every payload ``iterations`` times; record the statistics."""
+        latencies = []
+        errors = 0
+        queries = 0
+        start = time.perf_counter()
+        with patch.object(requests.adapters.HTTPAdapter, 'send', _stub_send):
+            for seq in range(self.iterations):
+                for payload in _fill(payloads, seq, int(time.time())):
+                    if as_json:
+                        kwargs = {'data': json.dumps(payload),
+                                  'headers': {'Content-Type': 'application/json'}}
+                    else:
+                        kwargs = {'data': payload}
+                    before = sql_db.sql_counter
+                    sent = time.perf_counter()
+                    response = self.url_open(path, **kwargs)
+                    latencies.append(time.perf_counter() - sent)
+                    queries += sql_db.sql_counter - before
+                    if response.status_code != 200:
+                        errors += 1
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        count = len(latencies)
+        self.results[scenario] = {
+            'messages': count,
+            'errors': errors,
+            'seconds': round(elapsed, 3),
+            'messages_per_second': round(count / elapsed, 2) if elapsed else 0.0,
+            'latency_ms': {
+                name: round(percentile(latencies, pct) * 1000, 2)
+                for name, pct in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100))
+            },
+            'queries_per_message': round(queries / count, 2) if count else 0.0,
+        }
+        self.assertFalse(errors, '%s: %d failed requests' % (scenario, errors))
+        return self.results[scenario]
+
+    def test_whatsapp_inbound(self):
+        self._replay('whatsapp_inbound', '/whatsapp/webhook',
+                     load_payloads('whatsapp_inbound'))
+        self.assertEqual(
+            self.env['whatsapp.message'].search_count(
+                [('message_id', '=like', 'wamid.BENCH%IN')]),
+            self.iterations)
+
+    def test_whatsapp_statuses(self):
+        self._replay('whatsapp_statuses', '/whatsapp/webhook',
+                     load_payloads('whatsapp_statuses'))
+        self.assertEqual(
+            self.env['whatsapp.message'].search_count(
+                [('message_id', '=like', 'wamid.BENCH%OUT'),
+                 ('message_status', '=', 'read')]),
+            self.iterations)
+
+    def test_infobip_sms_status(self):
+        self._replay('infobip_sms_status', '/sms/infobip/status',
+                     load_payloads('infobip_status'))
+
+    def test_ussd_sessions(self):
+        stats = self._replay('ussd_sessions', '/ussd/inbound',
+                             load_payloads('ussd_sessions'), as_json=False)
+        self.assertEqual(stats['messages'], 2 * self.iterations)
+        self.assertEqual(
+            self.env['whatsapp.chatbot.ussd.session'].search_count(
+                [('session_id', '=like', 'ATUid_bench%')]),
+            self.iterations)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     "name": "Contact Centre Inbox",
-    "version": "18.0.1.0.0",
+    "version": "18.0.1.1.0",
     "category": "Communications",
     "summary": "Unified 3-pane inbox: conversation list, thread, AI copilot + internal notes",
     "description": """
@@ -10,13 +10,15 @@ from: a conversation list, the actual WhatsApp/SMS/voice thread with a
 composer to reply, and a side panel with the AI copilot (if
 contact_centre_ai_copilot is installed) plus internal notes (the
 contact.centre.contact chatter added by contact_centre_sync). Updates in
-real time via bus.bus.
+real time via bus.bus: new messages are announced once per transaction to
+the contact's queue (call team), or to all agents when it has none.
 """,
     "author": "Tsela NavTech",
     "license": "LGPL-3",
     "depends": ["contact_centre", "comm_whatsapp_calling"],
     "data": [
         "views/contact_centre_inbox_views.xml",
+        "views/contact_centre_contact_views.xml",
     ],
     "assets": {
         "web.assets_backend": [
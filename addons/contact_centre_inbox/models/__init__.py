@@ -1,2 +1,3 @@
 from . import contact_centre_contact
 from . import contact_centre_message
+from . import res_users
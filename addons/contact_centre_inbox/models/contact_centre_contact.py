@@ -18,6 +18,12 @@ class ContactCentreContact(models.Model):
         'comm.disposition', string='Disposition', ondelete='set null', index=True,
         help='Outcome / wrap-up code the agent set for this conversation.')
     disposition_note = fields.Text('Disposition Note')
+    # The queue working this contact. Inbox notifications for its messages
+    # go to this team's members only; without one, to every agent.
+    call_team_id = fields.Many2one(
+        'whatsapp.call.team', string='Queue', ondelete='set null', index=True,
+        help='Team whose agents are notified of new messages from this contact. '
+             'Leave empty to notify every Contact Centre agent.')
 
     def action_set_disposition(self, disposition_id, note=None):
         """Set (or clear) the disposition on this contact. Called from the
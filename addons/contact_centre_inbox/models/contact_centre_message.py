@@ -6,6 +6,9 @@ from odoo import api, models
 
 _logger = logging.getLogger(__name__)
 
+# cr.precommit.data key: ids of the messages created in this transaction
+PENDING_KEY = 'contact_centre_inbox.pending_notifications'
+
 
 class ContactCentreMessage(models.Model):
     _inherit = 'contact.centre.message'
@@ -16,39 +19,62 @@ class ContactCentreMessage(models.Model):
         records._notify_inbox_agents()
         return records
 
+    def _inbox_audience(self):
+        """Bus channel of the agents who should see this message: the
+        contact's queue (call team) when it has one, else every Contact
+        Centre agent."""
+        self.ensure_one()
+        return (self.contact_id.call_team_id
+                or self.env.ref('contact_centre.group_contact_centre_agent', raise_if_not_found=False))
+
     def _notify_inbox_agents(self):
-        """Push a real-time bus notification to every Contact Centre agent
-        so the inbox updates without polling. Single choke point: every
+        """Push a real-time bus notification to the agents concerned so the
+        inbox updates without polling. Single choke point: every
         contact.centre.message, regardless of source (webhook, sync,
-        campaign, automation, manual reply), passes through create()."""
-        try:
-            agent_group = self.env.ref('contact_centre.group_contact_centre_agent', raise_if_not_found=False)
-            if not agent_group:
-                return
-            users = self.env['res.users'].sudo().search([
-                ('active', '=', True),
-                ('groups_id', 'in', agent_group.id),
-            ])
-            if not users:
-                return
-            bus = self.env['bus.bus'].sudo()
-            for record in self:
-                payload = {
-                    'contact_id': record.contact_id.id,
-                    'message_id': record.id,
-                    'channel': record.channel,
-                    'direction': record.direction,
-                    'body_preview': (record.body_text or '')[:120],
-                    'message_timestamp': str(record.message_timestamp) if record.message_timestamp else False,
-                }
-                for user in users:
-                    partner = user.partner_id
-                    if not partner:
-                        continue
-                    try:
-                        bus._sendone(partner, 'contact_centre_new_message', payload)
-                    except AttributeError:
-                        _logger.warning("contact_centre_inbox: bus.bus._sendone missing; cannot notify user %s", user.id)
-                        return
-        except Exception as e:
-            _logger.error("contact_centre_inbox: failed to send bus notification: %s", e, exc_info=True)
+        campaign, automation, manual reply), passes through create().
+
+        Notifications are queued and sent at commit, one per audience
+        channel (agents subscribe to theirs, see res.users._comm_bus_channels)
+        for everything the transaction created, so a burst of messages
+        costs a bus row per queue rather than one per message per agent."""
+        if not self:
+            return
+        cr = self.env.cr
+        pending = cr.precommit.data.get(PENDING_KEY)
+        if pending is None:
+            pending = cr.precommit.data[PENDING_KEY] = set()
+            env = self.env
+
+            def send_pending():
+                # Built at commit from the rows that still exist: a message
+                # created in a savepoint that rolled back is not announced.
+                message_ids = cr.precommit.data.pop(PENDING_KEY, set())
+                try:
+                    messages = env['contact.centre.message'].sudo().browse(sorted(message_ids)).exists()
+                    by_audience = {}
+                    for message in messages:
+                        audience = message._inbox_audience()
+                        if audience:
+                            by_audience.setdefault(audience, []).append(message._inbox_payload())
+                    bus = env['bus.bus'].sudo()
+                    for audience, payloads in by_audience.items():
+                        bus._sendone(audience, 'contact_centre_new_message', {
+                            'contact_ids': sorted({p['contact_id'] for p in payloads}),
+                            'messages': payloads,
+                        })
+                except Exception as e:
+                    _logger.error("contact_centre_inbox: failed to send bus notification: %s", e,
+                                  exc_info=True)
+            cr.precommit.add(send_pending)
+        pending.update(self.ids)
+
+    def _inbox_payload(self):
+        self.ensure_one()
+        return {
+            'contact_id': self.contact_id.id,
+            'message_id': self.id,
+            'channel': self.channel,
+            'direction': self.direction,
+            'body_preview': (self.body_text or '')[:120],
+            'message_timestamp': str(self.message_timestamp) if self.message_timestamp else False,
+        }
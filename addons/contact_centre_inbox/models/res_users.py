@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    def _comm_bus_channels(self):
+        # Agents also listen on the agent group: inbox notifications for
+        # contacts without a queue are sent there once.
+        channels = super()._comm_bus_channels()
+        group = self.env.ref('contact_centre.group_contact_centre_agent', raise_if_not_found=False)
+        if group and self.has_group('contact_centre.group_contact_centre_agent'):
+            channels.append(group)
+        return channels
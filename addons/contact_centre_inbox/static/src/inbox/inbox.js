@@ -417,8 +417,9 @@ export class ContactCentreInbox extends Component {
     // -------------------------------------------------------------------------
 
     _onBusNotification(payload) {
+        // One notification per transaction, covering every contact it touched.
         this.loadContacts();
-        if (payload?.contact_id === this.state.selectedContactId) {
+        if ((payload?.contact_ids || []).includes(this.state.selectedContactId)) {
             this.loadMessages(this.state.selectedContactId);
         }
     }
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Real-time inbox notifications: one bus row per audience (the contact's
+queue, else the agent group) for everything a transaction created."""
+import json
+
+from odoo.addons.bus.models.bus import channel_with_db, json_dump
+from odoo.tests import tagged, common, new_test_user
+
+AGENT_GROUPS = 'base.group_user,contact_centre.group_contact_centre_agent'
+
+
+class _Rollback(Exception):
+    pass
+
+
+@tagged('contact_centre_inbox', 'post_install', '-at_install')
+class TestInboxNotifications(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.agents = cls.env['res.users'].browse([
+            new_test_user(cls.env, login='cc_inbox_agent%d' % i, groups=AGENT_GROUPS).id
+            for i in range(3)
+        ])
+        cls.agent_group = cls.env.ref('contact_centre.group_contact_centre_agent')
+        cls.team = cls.env['whatsapp.call.team'].create({
+            'name': 'Inbox Queue', 'member_ids': [(6, 0, cls.agents[:2].ids)],
+        })
+        cls.other_team = cls.env['whatsapp.call.team'].create({
+            'name': 'Other Queue', 'member_ids': [(6, 0, cls.agents[2:].ids)],
+        })
+        cls.queued_contacts = cls._contacts('Queued', 2, cls.team)
+        cls.open_contacts = cls._contacts('Open', 2, cls.env['whatsapp.call.team'])
+        # Anything queued while setting up is not what the tests count.
+        cls.env.cr.precommit.run()
+
+    @classmethod
+    def _contacts(cls, prefix, count, team):
+        contacts = cls.env['contact.centre.contact']
+        for i in range(count):
+            partner = cls.env['res.partner'].create({
+                'name': '%s Contact %d' % (prefix, i), 'mobile': '+2769380%04d' % i,
+            })
+            contacts |= contacts.create({'partner_id': partner.id, 'call_team_id': team.id})
+        return contacts
+
+    def _messages(self, contacts, per_contact):
+        return self.env['contact.centre.message'].create([{
+            'contact_id': contact.id,
+            'channel': 'whatsapp',
+            'direction': 'inbound',
+            'body_text': 'hello %d' % i,
+        } for contact in contacts for i in range(per_contact)])
+
+    def _sent(self, audience):
+        """Payloads of the inbox notifications sent to ``audience`` since
+        the test started."""
+        self.env.cr.precommit.run()
+        rows = self.env['bus.bus'].sudo().search([
+            ('id', '>', self.last_bus_id),
+            ('channel', '=', json_dump(channel_with_db(self.env.cr.dbname, audience))),
+        ])
+        return [
+            message['payload'] for message in (json.loads(row.message) for row in rows)
+            if message['type'] == 'contact_centre_new_message'
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.last_bus_id = self.env['bus.bus'].sudo().search([], order='id desc', limit=1).id or 0
+
+    def test_burst_is_one_notification_per_audience(self):
+        queued = self._messages(self.queued_contacts, 5)
+        unqueued = self._messages(self.open_contacts, 3)
+
+        team_sent = self._sent(self.team)
+        self.assertEqual(len(team_sent), 1)
+        self.assertEqual(sorted(m['message_id'] for m in team_sent[0]['messages']), queued.ids)
+        self.assertEqual(team_sent[0]['contact_ids'], sorted(self.queued_contacts.ids))
+
+        group_sent = self._sent(self.agent_group)
+        self.assertEqual(len(group_sent), 1)
+        self.assertEqual(sorted(m['message_id'] for m in group_sent[0]['messages']), unqueued.ids)
+
+        for agent in self.agents:
+            self.assertFalse(self._sent(agent.partner_id),
+                             "inbox notifications are not sent per agent")
+
+    def test_routing_to_queue_or_agent_group(self):
+        self._messages(self.queued_contacts[:1], 1)
+        self.assertEqual(len(self._sent(self.team)), 1)
+        self.assertFalse(self._sent(self.agent_group))
+        self.assertFalse(self._sent(self.other_team))
+
+        self.last_bus_id = self.env['bus.bus'].sudo().search([], order='id desc', limit=1).id
+        self._messages(self.open_contacts[:1], 1)
+        self.assertEqual(len(self._sent(self.agent_group)), 1)
+        self.assertFalse(self._sent(self.team))
+
+    def test_rolled_back_message_is_not_announced(self):
+        kept = self._messages(self.queued_contacts[:1], 1)
+        try:
+            with self.env.cr.savepoint():
+                self._messages(self.queued_contacts[1:], 1)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        sent = self._sent(self.team)
+        self.assertEqual(len(sent), 1)
+        self.assertEqual([m['message_id'] for m in sent[0]['messages']], kept.ids)
+
+    def test_agent_listens_on_queue_and_agent_group(self):
+        channels = self.agents[0]._comm_bus_channels()
+        self.assertIn(self.team, channels)
+        self.assertIn(self.agent_group, channels)
+        self.assertNotIn(self.other_team, channels)
+
+        clerk = new_test_user(self.env, login='cc_inbox_clerk', groups='base.group_user')
+        self.assertNotIn(self.agent_group, clerk._comm_bus_channels())
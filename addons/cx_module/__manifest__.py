@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'UCX',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.1.0',
     'category': 'Communications',
     'summary': 'One workspace to manage a customer end-to-end across every channel',
     'description': """
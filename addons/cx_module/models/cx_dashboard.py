@@ -625,9 +625,9 @@ class CxDashboard(models.TransientModel):
             SELECT coalesce(ch.name, '—') AS channel, count(*) AS sends
               FROM comm_campaign_send s
               LEFT JOIN comm_channel ch ON ch.id = s.chosen_channel_id
-             WHERE coalesce(s.sent_at, s.scheduled_at, s.create_date)
+             WHERE coalesce(s.sent_at, s.next_attempt_at, s.create_date)
                    >= %(dt_from)s
-               AND coalesce(s.sent_at, s.scheduled_at, s.create_date) < %(dt_to)s
+               AND coalesce(s.sent_at, s.next_attempt_at, s.create_date) < %(dt_to)s
              GROUP BY ch.name
              ORDER BY sends DESC
         """, {'dt_from': params['dt_from'], 'dt_to': params['dt_to']})
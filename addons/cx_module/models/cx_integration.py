@@ -9,11 +9,25 @@ Events enqueue cheap delivery rows on the hot path (no HTTP); a cron
 (`_cron_cx_dispatch`) does the actual POST off the hot path, with HMAC signing
 and exponential-backoff retries. So message creation never blocks on an
 external endpoint.
+
+Dispatch runs one job per webhook on a small thread pool, so a slow or dead
+subscriber only holds up its own queue. Within a webhook, events go out in
+creation order and a failure stops that webhook's run; backoff and the
+circuit breaker are tracked per webhook. The pool threads only do HTTP --
+everything touching the ORM stays on the cron's cursor, which records each
+webhook's results as soon as its job finishes.
+
+A job stops starting new POSTs once its time budget or the run's deadline
+is spent; what it did not send stays pending, with no attempt counted, for
+the next run. A POST under way still has its own timeout, so the run ends
+at most CX_POST_TIMEOUT after the deadline whatever the endpoints do.
 """
 import hashlib
 import hmac
 import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
 
 from odoo import api, fields, models
@@ -33,6 +47,66 @@ WEBHOOK_EVENTS = [
     ('all', 'All events'),
 ]
 
+CX_DISPATCH_WORKERS = 4      # concurrent webhooks per cron run
+CX_BATCH_MAX = 20            # events per batched POST
+CX_POST_TIMEOUT = 10         # seconds
+CX_JOB_BUDGET = 20           # seconds one webhook's job may keep posting
+CX_RUN_BUDGET = 40           # seconds a dispatch run may keep posting
+CX_CIRCUIT_THRESHOLD = 5     # consecutive failures that open the circuit
+CX_CIRCUIT_COOLDOWN = 30     # minutes before a half-open probe
+
+
+def _cx_deliver(url, secret, payload, delivery_ids, event):
+    """POST one (possibly batched) payload; return (ok, status_string).
+
+    Plain function, no ORM: it runs on the dispatcher's worker threads.
+    """
+    if not requests:
+        return False, 'requests library unavailable'
+    body = json.dumps(payload).encode('utf-8')
+    headers = {
+        'Content-Type': 'application/json',
+        'X-CX-Event': event,
+        'X-CX-Delivery': ','.join(str(i) for i in delivery_ids),
+    }
+    if secret:
+        sig = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+        headers['X-CX-Signature'] = 'sha256=%s' % sig
+    try:
+        resp = requests.post(url, data=body, headers=headers, timeout=CX_POST_TIMEOUT)
+        return (200 <= resp.status_code < 300), 'HTTP %s' % resp.status_code
+    except Exception as e:  # endpoint-side failures
+        _logger.warning('cx webhook post to %s failed: %s', url, e)
+        return False, 'error: %s' % e
+
+
+def _cx_run_job(job):
+    """Send one webhook's due events in order; stop at the first failure so
+    later events never overtake an undelivered one, and once the time
+    budget (``job['deadline']``, a ``time.monotonic()`` value, at the
+    latest) is spent.
+
+    :return: list of (delivery_ids, ok, status) for the POSTs attempted
+    """
+    items = job['items']
+    size = CX_BATCH_MAX if job['batch'] else 1
+    deadline = min(time.monotonic() + CX_JOB_BUDGET, job['deadline'])
+    outcomes = []
+    for i in range(0, len(items), size):
+        if time.monotonic() >= deadline:
+            break
+        chunk = items[i:i + size]
+        ids = [item['id'] for item in chunk]
+        if len(chunk) == 1:
+            payload, event = chunk[0]['payload'], chunk[0]['event']
+        else:
+            payload, event = {'events': chunk}, 'batch'
+        ok, status = _cx_deliver(job['url'], job['secret'], payload, ids, event)
+        outcomes.append((ids, ok, status))
+        if not ok:
+            break
+    return outcomes
+
 
 class CxIntegrationMcp(models.Model):
     _name = 'cx.integration.mcp'
@@ -66,8 +140,20 @@ class CxIntegrationWebhook(models.Model):
     active = fields.Boolean(default=True)
     max_attempts = fields.Integer(default=5,
                                   help='Give up after this many failed attempts.')
+    supports_batch = fields.Boolean(
+        string='Batch Deliveries',
+        help='The subscriber accepts several consecutive events in one signed '
+             'POST: {"events": [{"id", "event", "payload"}, ...]}.')
     last_triggered_at = fields.Datetime(readonly=True)
     last_status = fields.Char(readonly=True)
+    circuit_state = fields.Selection(
+        [('closed', 'Closed'), ('open', 'Open'), ('half_open', 'Half-open')],
+        default='closed', required=True, readonly=True,
+        help='Open after repeated failures: nothing is sent until the cooldown '
+             'ends, then a single event probes the endpoint.')
+    consecutive_failures = fields.Integer(readonly=True)
+    retry_at = fields.Datetime(readonly=True,
+                               help='Backoff: no delivery before this time.')
     delivery_ids = fields.One2many('cx.integration.webhook.delivery', 'webhook_id',
                                    string='Deliveries')
 
@@ -80,23 +166,17 @@ class CxIntegrationWebhook(models.Model):
             hook.write({'last_status': status, 'last_triggered_at': fields.Datetime.now()})
         return True
 
+    def action_cx_reset_circuit(self):
+        """Close the circuit and clear the backoff: retry on the next run."""
+        self.write({'circuit_state': 'closed', 'consecutive_failures': 0,
+                    'retry_at': False})
+        return True
+
     def _post(self, payload):
         """POST the payload; return (ok, status_string). HMAC-signs when a
         secret is set."""
         self.ensure_one()
-        if not requests:
-            return False, 'requests library unavailable'
-        body = json.dumps(payload).encode('utf-8')
-        headers = {'Content-Type': 'application/json'}
-        if self.secret:
-            sig = hmac.new(self.secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
-            headers['X-CX-Signature'] = 'sha256=%s' % sig
-        try:
-            resp = requests.post(self.target_url, data=body, headers=headers, timeout=10)
-            return (200 <= resp.status_code < 300), 'HTTP %s' % resp.status_code
-        except Exception as e:  # pragma: no cover - endpoint-side failures
-            _logger.warning('cx webhook %s post failed: %s', self.id, e)
-            return False, 'error: %s' % e
+        return _cx_deliver(self.target_url, self.secret, payload, [], 'test')
 
     @api.model
     def _cx_enqueue_event(self, event_code, payload):
@@ -114,6 +194,59 @@ class CxIntegrationWebhook(models.Model):
             for hook in hooks
         ])
 
+    def _cx_dispatch_job(self, deliveries):
+        """Snapshot of what a worker thread needs: no records cross threads."""
+        self.ensure_one()
+        items = []
+        for delivery in deliveries:
+            try:
+                payload = json.loads(delivery.payload or '{}')
+            except (ValueError, TypeError):
+                payload = {'raw': delivery.payload}
+            items.append({'id': delivery.id, 'event': delivery.event or '',
+                          'payload': payload})
+        return {
+            'url': self.target_url,
+            'secret': self.sudo().secret,
+            'batch': self.supports_batch and self.circuit_state == 'closed',
+            'items': items,
+        }
+
+    def _cx_apply_outcomes(self, outcomes, now):
+        """Record a dispatch job's results: delivery states, then this
+        webhook's backoff / circuit state."""
+        self.ensure_one()
+        Delivery = self.env['cx.integration.webhook.delivery']
+        max_attempts = self.max_attempts or 5
+        for ids, ok, status in outcomes:
+            for delivery in Delivery.browse(ids):
+                attempts = delivery.attempts + 1
+                vals = {'attempts': attempts, 'last_error': status}
+                if ok:
+                    vals['state'] = 'sent'
+                elif attempts >= max_attempts:
+                    vals['state'] = 'failed'
+                delivery.write(vals)
+        if not outcomes:
+            return
+        status = outcomes[-1][2]
+        vals = {'last_status': status, 'last_triggered_at': now}
+        if outcomes[-1][1]:
+            vals.update(circuit_state='closed', consecutive_failures=0, retry_at=False)
+        else:
+            failures = self.consecutive_failures + 1
+            vals['consecutive_failures'] = failures
+            if failures >= CX_CIRCUIT_THRESHOLD or self.circuit_state == 'half_open':
+                if self.circuit_state != 'open':
+                    _logger.warning('cx webhook %s: circuit opened after %s '
+                                    'failures (%s)', self.id, failures, status)
+                vals.update(circuit_state='open',
+                            retry_at=now + timedelta(minutes=CX_CIRCUIT_COOLDOWN))
+            else:
+                # exponential backoff, capped at ~64 min
+                vals['retry_at'] = now + timedelta(minutes=2 ** min(failures, 6))
+        self.write(vals)
+
 
 class CxIntegrationWebhookDelivery(models.Model):
     _name = 'cx.integration.webhook.delivery'
@@ -128,32 +261,41 @@ class CxIntegrationWebhookDelivery(models.Model):
         [('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')],
         default='pending', index=True, readonly=True)
     attempts = fields.Integer(default=0, readonly=True)
-    next_attempt_at = fields.Datetime(index=True, readonly=True)
+    next_attempt_at = fields.Datetime(
+        related='webhook_id.retry_at', string='Next Attempt',
+        help="Pending deliveries wait for their webhook's backoff.")
     last_error = fields.Char(readonly=True)
 
     @api.model
-    def _cron_cx_dispatch(self, batch=25):
-        """Deliver due pending rows. Backs off failures exponentially and gives
-        up after the webhook's max_attempts."""
+    def _cron_cx_dispatch(self, batch=25, workers=CX_DISPATCH_WORKERS):
+        """Deliver pending rows, up to ``batch`` per webhook, webhooks in
+        parallel on at most ``workers`` threads and within CX_RUN_BUDGET.
+        Webhooks in backoff or with an open circuit are skipped; once the
+        cooldown is over an open circuit goes half-open and sends a single
+        event as a probe."""
         now = fields.Datetime.now()
-        due = self.search([
-            ('state', '=', 'pending'),
-            '|', ('next_attempt_at', '=', False), ('next_attempt_at', '<=', now),
-        ], limit=batch, order='create_date')
-        for delivery in due:
-            try:
-                payload = json.loads(delivery.payload or '{}')
-            except (ValueError, TypeError):
-                payload = {'raw': delivery.payload}
-            ok, status = delivery.webhook_id._post(payload)
-            attempts = delivery.attempts + 1
-            vals = {'attempts': attempts, 'last_error': status}
-            if ok:
-                vals['state'] = 'sent'
-            elif attempts >= (delivery.webhook_id.max_attempts or 5):
-                vals['state'] = 'failed'
-            else:
-                # exponential backoff, capped at ~64 min
-                vals['next_attempt_at'] = now + timedelta(minutes=2 ** min(attempts, 6))
-            delivery.write(vals)
-            delivery.webhook_id.write({'last_status': status, 'last_triggered_at': now})
+        deadline = time.monotonic() + CX_RUN_BUDGET
+        Webhook = self.env['cx.integration.webhook']
+        groups = self._read_group(
+            [('state', '=', 'pending'), ('webhook_id.active', '=', True),
+             '|', ('webhook_id.retry_at', '=', False),
+             ('webhook_id.retry_at', '<=', now)],
+            ['webhook_id'], ['__count'])
+        jobs = {}
+        for hook, _count in groups:
+            limit = batch
+            if hook.circuit_state != 'closed':
+                # a probe cut off by the deadline stays half-open
+                hook.circuit_state = 'half_open'
+                limit = 1
+            due = self.search([('webhook_id', '=', hook.id), ('state', '=', 'pending')],
+                              order='create_date, id', limit=limit)
+            jobs[hook.id] = dict(hook._cx_dispatch_job(due), deadline=deadline)
+        if not jobs:
+            return
+        with ThreadPoolExecutor(max_workers=min(workers, len(jobs)),
+                                thread_name_prefix='cx.webhook') as pool:
+            futures = {pool.submit(_cx_run_job, job): hook_id
+                       for hook_id, job in jobs.items()}
+            for future in as_completed(futures):
+                Webhook.browse(futures[future])._cx_apply_outcomes(future.result(), now)
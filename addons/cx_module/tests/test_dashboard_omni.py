@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Omni-channel dashboard queries run against the current schema."""
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import tagged, common
+
+
+@tagged('cx_module', 'post_install', '-at_install')
+class TestDashboardOmni(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        bot = cls.env['comm.bot'].create({'name': 'Dashboard bot'})
+        cls.campaign = cls.env['comm.campaign'].create({
+            'name': 'Dashboard', 'bot_id': bot.id,
+        })
+        cls.channel = cls.env.ref('comm_chatbot.channel_sms')
+        partners = cls.env['res.partner'].create(
+            [{'name': f'Dashboard recipient {i}'} for i in range(3)])
+        now = fields.Datetime.now()
+        cls.env['comm.campaign.send'].create([
+            # sent in the window, deferred into the window, deferred past it
+            {'campaign_id': cls.campaign.id, 'partner_id': partners[0].id,
+             'chosen_channel_id': cls.channel.id, 'status': 'sent',
+             'sent_at': now - timedelta(minutes=1)},
+            {'campaign_id': cls.campaign.id, 'partner_id': partners[1].id,
+             'chosen_channel_id': cls.channel.id, 'status': 'deferred',
+             'next_attempt_at': now - timedelta(hours=1)},
+            {'campaign_id': cls.campaign.id, 'partner_id': partners[2].id,
+             'chosen_channel_id': cls.channel.id, 'status': 'deferred',
+             'next_attempt_at': now + timedelta(days=2)},
+        ])
+        cls.env.flush_all()
+
+    def test_campaign_sends_by_channel(self):
+        Dashboard = self.env['cx.dashboard']
+        dt_from, dt_to, _label = Dashboard._resolve_window(7, None, None)
+        omni = Dashboard._omni_campaigns({'dt_from': dt_from, 'dt_to': dt_to},
+                                         self.env.company.currency_id)
+        self.assertIn(self.campaign.id, [c['id'] for c in omni['list']])
+        sends = {r['channel']: r['sends'] for r in omni['by_channel']}
+        self.assertGreaterEqual(sends.get(self.channel.name, 0), 2)
+
+    def test_org_metrics(self):
+        self.env.user.groups_id += self.env.ref('cx_module.group_cx_manager')
+        payload = self.env['cx.dashboard'].get_metrics(scope='org', days=7)
+        self.assertIn('campaigns', payload['omni'])
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Webhook outbox dispatch against a local stub HTTP server: ordering,
+signatures, batching, per-endpoint backoff and the circuit breaker."""
+import hashlib
+import hmac
+import json
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import tagged, common
+
+from odoo.addons.cx_module.models import cx_integration
+from odoo.addons.cx_module.models.cx_integration import CX_CIRCUIT_THRESHOLD
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        delay, status = server.behaviour.get(self.path, (0, 200))
+        if delay:
+            time.sleep(delay)
+        with server.lock:
+            server.received.append({
+                'path': self.path,
+                'body': json.loads(body),
+                'raw': body,
+                'signature': self.headers.get('X-CX-Signature'),
+                'at': time.monotonic(),
+            })
+        self.send_response(status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@tagged('cx_module', 'post_install', '-at_install')
+class TestWebhookDispatch(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        cls.server.lock = threading.Lock()
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+        cls.base_url = 'http://127.0.0.1:%s' % cls.server.server_address[1]
+
+    def setUp(self):
+        super().setUp()
+        self.server.received = []
+        self.server.behaviour = {}
+        self.Delivery = self.env['cx.integration.webhook.delivery']
+
+    def _hook(self, path, **vals):
+        return self.env['cx.integration.webhook'].create(dict({
+            'name': path, 'target_url': self.base_url + path,
+            'event': 'all', 'secret': 'topsecret',
+        }, **vals))
+
+    def _enqueue(self, hook, count):
+        return self.Delivery.create([{
+            'webhook_id': hook.id, 'event': 'interaction.inbound',
+            'payload': json.dumps({'seq': i}),
+        } for i in range(count)])
+
+    def _received(self, path):
+        return [r for r in self.server.received if r['path'] == path]
+
+    def test_order_and_signature(self):
+        hook = self._hook('/a')
+        deliveries = self._enqueue(hook, 3)
+
+        self.Delivery._cron_cx_dispatch()
+
+        received = self._received('/a')
+        self.assertEqual([r['body']['seq'] for r in received], [0, 1, 2])
+        expected = hmac.new(b'topsecret', received[0]['raw'], hashlib.sha256).hexdigest()
+        self.assertEqual(received[0]['signature'], 'sha256=' + expected)
+        self.assertEqual(set(deliveries.mapped('state')), {'sent'})
+
+    def test_batched_delivery(self):
+        hook = self._hook('/batch', supports_batch=True)
+        deliveries = self._enqueue(hook, 3)
+
+        self.Delivery._cron_cx_dispatch()
+
+        received = self._received('/batch')
+        self.assertEqual(len(received), 1)
+        events = received[0]['body']['events']
+        self.assertEqual([e['payload']['seq'] for e in events], [0, 1, 2])
+        self.assertEqual([e['id'] for e in events], deliveries.ids)
+        self.assertEqual(set(deliveries.mapped('state')), {'sent'})
+
+    def test_failure_backs_off_only_that_endpoint(self):
+        failing, healthy = self._hook('/down'), self._hook('/up')
+        self.server.behaviour['/down'] = (0, 500)
+        down = self._enqueue(failing, 2)
+        up = self._enqueue(healthy, 2)
+
+        self.Delivery._cron_cx_dispatch()
+
+        # The head failed, so the second event was not sent out of order.
+        self.assertEqual(len(self._received('/down')), 1)
+        self.assertEqual(down.mapped('attempts'), [1, 0])
+        self.assertEqual(set(down.mapped('state')), {'pending'})
+        self.assertEqual(set(up.mapped('state')), {'sent'})
+        self.assertGreater(failing.retry_at, fields.Datetime.now())
+        self.assertFalse(healthy.retry_at)
+
+        # Still backing off: nothing is retried.
+        self.Delivery._cron_cx_dispatch()
+        self.assertEqual(len(self._received('/down')), 1)
+
+        # Backoff over and the endpoint recovered: delivered in order.
+        self.server.behaviour.pop('/down')
+        failing.retry_at = fields.Datetime.now() - timedelta(seconds=1)
+        self.Delivery._cron_cx_dispatch()
+        self.assertEqual([r['body']['seq'] for r in self._received('/down')], [0, 0, 1])
+        self.assertEqual(set(down.mapped('state')), {'sent'})
+        self.assertEqual(failing.consecutive_failures, 0)
+
+    def test_circuit_breaker(self):
+        hook = self._hook('/flaky', max_attempts=50)
+        self.server.behaviour['/flaky'] = (0, 503)
+        self._enqueue(hook, 3)
+
+        for _ in range(CX_CIRCUIT_THRESHOLD):
+            hook.retry_at = False
+            self.Delivery._cron_cx_dispatch()
+        self.assertEqual(hook.circuit_state, 'open')
+        self.assertGreater(hook.retry_at, fields.Datetime.now() + timedelta(minutes=10))
+
+        # Open: nothing goes out.
+        sent = len(self._received('/flaky'))
+        self.Delivery._cron_cx_dispatch()
+        self.assertEqual(len(self._received('/flaky')), sent)
+
+        # Cooldown over: one probe, which fails and re-opens the circuit.
+        hook.retry_at = fields.Datetime.now() - timedelta(seconds=1)
+        self.Delivery._cron_cx_dispatch()
+        self.assertEqual(len(self._received('/flaky')), sent + 1)
+        self.assertEqual(hook.circuit_state, 'open')
+
+        # Next probe succeeds: circuit closes, the rest is delivered next run.
+        self.server.behaviour.pop('/flaky')
+        hook.retry_at = fields.Datetime.now() - timedelta(seconds=1)
+        self.Delivery._cron_cx_dispatch()
+        self.assertEqual(hook.circuit_state, 'closed')
+        self.Delivery._cron_cx_dispatch()
+        self.assertFalse(self.Delivery.search(
+            [('webhook_id', '=', hook.id), ('state', '=', 'pending')]))
+
+    def test_slow_endpoint_does_not_stall_others(self):
+        slow, fast = self._hook('/slow'), self._hook('/fast')
+        self.server.behaviour['/slow'] = (0.3, 200)
+        self._enqueue(slow, 3)
+        self._enqueue(fast, 3)
+
+        self.Delivery._cron_cx_dispatch()
+
+        slow_done = max(r['at'] for r in self._received('/slow'))
+        fast_done = max(r['at'] for r in self._received('/fast'))
+        self.assertEqual(len(self._received('/fast')), 3)
+        self.assertLess(fast_done, slow_done)
+
+    def test_results_applied_as_jobs_finish(self):
+        slow, fast = self._hook('/slow'), self._hook('/fast')
+        self.server.behaviour['/slow'] = (0.3, 200)
+        self._enqueue(slow, 3)
+        self._enqueue(fast, 1)
+        Webhook = type(self.env['cx.integration.webhook'])
+        apply_outcomes = Webhook._cx_apply_outcomes
+        applied = []
+
+        def recording_apply(hook, outcomes, now):
+            applied.append((hook.id, time.monotonic()))
+            return apply_outcomes(hook, outcomes, now)
+
+        with patch.object(Webhook, '_cx_apply_outcomes', recording_apply):
+            self.Delivery._cron_cx_dispatch()
+
+        self.assertEqual([hook_id for hook_id, _at in applied], [fast.id, slow.id])
+        slow_done = max(r['at'] for r in self._received('/slow'))
+        self.assertLess(applied[0][1], slow_done)
+        self.assertEqual(fast.last_status, 'HTTP 200')
+
+    def test_job_budget_leaves_the_rest_pending(self):
+        slow, fast = self._hook('/slow'), self._hook('/fast')
+        self.server.behaviour['/slow'] = (0.3, 200)
+        slow_deliveries = self._enqueue(slow, 6)
+        fast_deliveries = self._enqueue(fast, 6)
+
+        with patch.object(cx_integration, 'CX_JOB_BUDGET', 0.5):
+            self.Delivery._cron_cx_dispatch()
+
+        sent = slow_deliveries.filtered(lambda d: d.state == 'sent')
+        self.assertTrue(0 < len(sent) < 6)
+        unsent = slow_deliveries - sent
+        self.assertEqual(set(unsent.mapped('state')), {'pending'})
+        self.assertEqual(set(unsent.mapped('attempts')), {0})
+        # Running out of time is not the endpoint failing.
+        self.assertFalse(slow.retry_at)
+        self.assertEqual(slow.consecutive_failures, 0)
+        self.assertEqual(set(fast_deliveries.mapped('state')), {'sent'})
+
+    def test_run_deadline(self):
+        hook = self._hook('/late')
+        deliveries = self._enqueue(hook, 2)
+
+        with patch.object(cx_integration, 'CX_RUN_BUDGET', 0):
+            self.Delivery._cron_cx_dispatch()
+
+        self.assertFalse(self._received('/late'))
+        self.assertEqual(set(deliveries.mapped('state')), {'pending'})
+        self.assertEqual(set(deliveries.mapped('attempts')), {0})
+        self.assertEqual(hook.circuit_state, 'closed')
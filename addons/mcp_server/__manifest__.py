@@ -1,6 +1,6 @@
 {
     "name": "MCP Server",
-    "version": "18.0.1.1.1",
+    "version": "18.0.1.3.0",
     "summary": "Connect AI assistants to your Odoo instance via Model Context Protocol",
     "description": """
 MCP Server for Odoo
@@ -1,3 +1,4 @@
+import json
 import logging
 import xmlrpc.client as xmlrpclib  # nosec
 from datetime import datetime
@@ -7,15 +8,19 @@ import defusedxml.xmlrpc
 
 from odoo import http
 from odoo.addons.base.controllers.rpc import dumps as odoo_dumps
+from odoo.api import call_kw
+from odoo.exceptions import AccessDenied, AccessError, MissingError, UserError
 from odoo.http import request
 from odoo.service import (
     common as common_service_root,
     db as db_service_root,
     model as model_service_root,
+    security,
 )
+from odoo.service.model import get_public_method
 
 from . import auth, utils
-from .rate_limiting import check_rate_limit, record_api_request
+from .rate_limiting import ANONYMOUS_ID, hit_rate_limit, rate_limit_headers
 
 _logger = logging.getLogger(__name__)
 defusedxml.xmlrpc.monkey_patch()
@@ -30,6 +35,19 @@ XMLRPC_FAULT_CODES = {
     "internal_error": 500,
 }
 
+# JSON-RPC 2.0 protocol errors. Errors raised by MCP checks or by the called
+# method use the XMLRPC_FAULT_CODES above as their JSON-RPC error code.
+JSONRPC_ERROR_CODES = {
+    "parse_error": -32700,
+    "invalid_request": -32600,
+    "method_not_found": -32601,
+    "invalid_params": -32602,
+    "not_executed": -32000,
+}
+
+# Upper bound on the number of calls in one JSON-RPC batch
+MAX_BATCH_SIZE = 100
+
 
 def _generate_xmlrpc_fault(code: int, message: str) -> str:
     """
@@ -46,6 +64,35 @@ def _generate_xmlrpc_fault(code: int, message: str) -> str:
     return xmlrpclib.dumps(fault, methodresponse=1, allow_none=1)
 
 
+def _jsonrpc_result(item_id: Any, result: Any) -> dict:
+    """JSON-RPC 2.0 success response object."""
+    return {"jsonrpc": "2.0", "id": item_id, "result": result}
+
+
+def _jsonrpc_error(item_id: Any, code: int, message: str) -> dict:
+    """JSON-RPC 2.0 error response object."""
+    error = {"code": code, "message": message}
+    return {"jsonrpc": "2.0", "id": item_id, "error": error}
+
+
+def _error_code_for(exc: Exception) -> int:
+    """
+    Error code reported for an exception raised by a batch item.
+
+    :param exc: The exception raised while executing the item
+    :return: An XMLRPC_FAULT_CODES value
+    """
+    if isinstance(exc, xmlrpclib.Fault):
+        return exc.faultCode
+    if isinstance(exc, (AccessDenied, AccessError)):
+        return XMLRPC_FAULT_CODES["forbidden"]
+    if isinstance(exc, MissingError):
+        return XMLRPC_FAULT_CODES["not_found"]
+    if isinstance(exc, UserError):
+        return XMLRPC_FAULT_CODES["bad_request"]
+    return XMLRPC_FAULT_CODES["internal_error"]
+
+
 def _get_client_ip() -> Optional[str]:
     """Get client IP address from request."""
     if request and hasattr(request, "httprequest"):
@@ -211,41 +258,58 @@ class MCPObjectController(http.Controller):
         :param model_method: The method being called
         :raises xmlrpclib.Fault: If rate limit exceeded
         """
-        is_enabled = (
+        if not self._rate_limiting_enabled():
+            return
+
+        result = hit_rate_limit(user_id or ANONYMOUS_ID)
+        if result.allowed:
+            return
+
+        self._log_rate_limited(
+            user_obj, user_id, f"{model_name}.{model_method}", "/mcp/xmlrpc/object"
+        )
+        fault = xmlrpclib.Fault(
+            XMLRPC_FAULT_CODES["rate_limit"],
+            "Too many requests. Rate limit exceeded.",
+        )
+        # Picked up by the route to send Retry-After alongside the fault
+        fault.headers = rate_limit_headers(result)
+        raise fault
+
+    def _rate_limiting_enabled(self) -> bool:
+        return (
             request.env["ir.config_parameter"]
             .sudo()
             .get_param("mcp_server.enable_rate_limiting", "True")
             == "True"
         )
-        if not is_enabled:
-            return
 
-        # Handle authenticated users
-        if user_id:
-            if not check_rate_limit(user_id):
-                _logger.warning(
-                    f"MCP XML-RPC: Rate limit exceeded for user ID "
-                    f"{user_id} on {model_name}.{model_method}."
-                )
-                env_for_log = request.env(user=user_obj.id) if user_obj else request.env
-                env_for_log["mcp.log"].sudo().log_rate_limit_exceeded(
-                    user_id=user_id,
-                    endpoint="/mcp/xmlrpc/object",
-                    ip_address=_get_client_ip(),
-                )
-                raise xmlrpclib.Fault(
-                    XMLRPC_FAULT_CODES["rate_limit"],
-                    "Too many requests. Rate limit exceeded.",
-                )
-            record_api_request(user_id)
-        else:
-            anonymous_id = -1
-            if not check_rate_limit(anonymous_id):
-                raise xmlrpclib.Fault(
-                    XMLRPC_FAULT_CODES["rate_limit"],
-                    "Too many requests. Rate limit exceeded.",
-                )
-            record_api_request(anonymous_id)
+    def _log_rate_limited(
+        self,
+        user_obj: Optional[Any],
+        user_id: Optional[int],
+        target: str,
+        endpoint: str,
+    ) -> None:
+        """
+        Log a rejected request for an identified user.
+
+        :param user_obj: The user object (if identified from API key)
+        :param user_id: The user ID the request was counted against
+        :param target: What was called, for the server log
+        :param endpoint: The MCP endpoint that rejected the request
+        """
+        if not user_id:
+            return
+        _logger.warning(
+            f"MCP XML-RPC: Rate limit exceeded for user ID {user_id} on {target}."
+        )
+        env_for_log = request.env(user=user_obj.id) if user_obj else request.env
+        env_for_log["mcp.log"].sudo().log_rate_limit_exceeded(
+            user_id=user_id,
+            endpoint=endpoint,
+            ip_address=_get_client_ip(),
+        )
 
     def _get_env_for_user(self, user_obj: Optional[Any], uid: Any) -> Any:
         """
@@ -398,9 +462,11 @@ class MCPObjectController(http.Controller):
                 f"MCPObjectController XML-RPC Fault: "
                 f"Code {e.faultCode}, String: {e.faultString}"
             )
+            headers = [("Content-Type", "text/xml")]
+            headers.extend(getattr(e, "headers", {}).items())
             return request.make_response(
                 xmlrpclib.dumps(e, methodresponse=1, allow_none=1),
-                [("Content-Type", "text/xml")],
+                headers,
             )
         except Exception as e:
             error_msg = str(e)
@@ -414,3 +480,296 @@ class MCPObjectController(http.Controller):
                 f"Internal Server Error in MCPObjectController: {error_msg}",
             )
             return request.make_response(fault_response, [("Content-Type", "text/xml")])
+
+    def _authenticate_batch(self, credentials: list, user_obj: Optional[Any]) -> int:
+        """
+        Authenticate a JSON-RPC batch once for all of its calls.
+
+        :param credentials: (db, uid, password or API key) from execute_kw
+        :param user_obj: The user identified from the API key, if any
+        :return: The authenticated user ID
+        :raises xmlrpclib.Fault: If the params are invalid
+        :raises AccessDenied: If the credentials are wrong
+        """
+        db, uid, password = credentials
+        if db != request.db:
+            raise xmlrpclib.Fault(
+                XMLRPC_FAULT_CODES["bad_request"],
+                f"Database '{db}' is not the database served here.",
+            )
+        try:
+            uid = int(uid)
+        except (TypeError, ValueError) as e:
+            raise xmlrpclib.Fault(
+                XMLRPC_FAULT_CODES["bad_request"], f"Invalid user ID: {uid}"
+            ) from e
+        # An API key already verified by _identify_user needs no second check
+        if not (user_obj and user_obj.id == uid):
+            security.check(db, uid, password)
+        return uid
+
+    def _execute_kw(
+        self, env: Any, model_name: str, method: str, args: Any, kwargs: Any
+    ) -> Any:
+        """
+        Call a public model method in the batch transaction.
+
+        :raises xmlrpclib.Fault: If the model or arguments are invalid
+        """
+        if not isinstance(args, list) or not isinstance(kwargs, dict):
+            raise xmlrpclib.Fault(
+                XMLRPC_FAULT_CODES["bad_request"],
+                "execute_kw expects a list of arguments and a dict of keywords.",
+            )
+        model = env.get(model_name)
+        if model is None:
+            raise xmlrpclib.Fault(
+                XMLRPC_FAULT_CODES["not_found"], f"Model {model_name} does not exist."
+            )
+        get_public_method(model, method)
+        return call_kw(model, method, args, kwargs)
+
+    def _run_batch_call(
+        self, env: Any, user_id: int, params: list, savepoint: bool
+    ) -> Any:
+        """
+        Check MCP access for one execute_kw call, run it and log it.
+
+        :param env: Environment of the authenticated user
+        :param user_id: The authenticated user ID
+        :param params: execute_kw params of the call
+        :param savepoint: Run the call in its own savepoint
+        :return: The result of the call
+        """
+        model_method = params[4]
+        args = params[5] if len(params) > 5 else []
+        kwargs = params[6] if len(params) > 6 else {}
+        ip_address = _get_client_ip()
+        try:
+            model_name = utils.sanitize_model_name(params[3])
+        except ValueError as e:
+            raise xmlrpclib.Fault(
+                XMLRPC_FAULT_CODES["bad_request"], f"Invalid model name: {e}"
+            ) from e
+
+        if not utils.check_mcp_access(env, model_name, model_method):
+            message = (
+                f"Access denied by MCP for model "
+                f"'{model_name}' method '{model_method}'."
+            )
+            env["mcp.log"].sudo().log_permission_denied(
+                model_name=model_name,
+                operation=model_method,
+                user_id=user_id,
+                endpoint="/mcp/jsonrpc/object",
+                ip_address=ip_address,
+                error_message=message,
+            )
+            raise xmlrpclib.Fault(XMLRPC_FAULT_CODES["forbidden"], message)
+
+        start_time = datetime.now()
+        try:
+            if savepoint:
+                with env.cr.savepoint():
+                    result = self._execute_kw(
+                        env, model_name, model_method, args, kwargs
+                    )
+            else:
+                result = self._execute_kw(env, model_name, model_method, args, kwargs)
+                # Surface constraint errors on the item that caused them
+                env.flush_all()
+        except Exception as e:
+            env["mcp.log"].sudo().log_error(
+                error_message=str(e),
+                error_code="E500",
+                endpoint="/mcp/jsonrpc/object",
+                model_name=model_name,
+                operation=model_method,
+                user_id=user_id,
+                ip_address=ip_address,
+            )
+            raise
+
+        duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+        env["mcp.log"].sudo().log_model_access(
+            model_name=model_name,
+            operation=model_method,
+            user_id=user_id,
+            record_ids=self._extract_record_ids(params),
+            endpoint="/mcp/jsonrpc/object",
+            http_method="POST",
+            duration_ms=duration_ms,
+            ip_address=ip_address,
+        )
+        return result
+
+    def _mcp_jsonrpc_batch(self, items: list, savepoints: bool) -> Tuple[list, dict]:
+        """
+        Execute JSON-RPC 2.0 execute_kw calls as one batch.
+
+        The batch is authenticated once with the credentials of its first
+        call, counts one rate-limit hit per call and runs in the request's
+        transaction. Without ``savepoints`` the batch is atomic: the first
+        failing call rolls back the whole transaction and the other calls
+        report that they were not applied. With ``savepoints`` each call
+        runs in its own savepoint and only failing calls are rolled back.
+
+        :param items: The JSON-RPC request objects, in order
+        :param savepoints: Isolate each call in a savepoint
+        :return: Tuple of (response object per item, HTTP headers)
+        """
+        responses = [None] * len(items)
+        calls = []
+        for index, item in enumerate(items):
+            item_id = item.get("id") if isinstance(item, dict) else None
+            if not isinstance(item, dict) or item.get("jsonrpc") != "2.0":
+                responses[index] = _jsonrpc_error(
+                    item_id,
+                    JSONRPC_ERROR_CODES["invalid_request"],
+                    "Invalid JSON-RPC 2.0 request.",
+                )
+            elif item.get("method") != "execute_kw":
+                responses[index] = _jsonrpc_error(
+                    item_id,
+                    JSONRPC_ERROR_CODES["method_not_found"],
+                    f"Unsupported method {item.get('method')}. "
+                    f"Only execute_kw is allowed.",
+                )
+            elif not isinstance(item.get("params"), list) or len(item["params"]) < 5:
+                responses[index] = _jsonrpc_error(
+                    item_id,
+                    JSONRPC_ERROR_CODES["invalid_params"],
+                    "execute_kw expects [db, uid, password, model, method, "
+                    "args, kwargs].",
+                )
+            else:
+                calls.append((index, item_id, item["params"]))
+        if not calls:
+            return responses, {}
+
+        credentials = calls[0][2][:3]
+        user_obj, user_id = self._identify_user(credentials[2], credentials[1])
+        headers = {}
+        granted = len(calls)
+        if self._rate_limiting_enabled():
+            result = hit_rate_limit(user_id or ANONYMOUS_ID, requests=len(calls))
+            headers = rate_limit_headers(result)
+            granted = result.granted
+            if granted < len(calls):
+                self._log_rate_limited(
+                    user_obj, user_id, "a JSON-RPC batch", "/mcp/jsonrpc/object"
+                )
+        for index, item_id, _params in calls[granted:]:
+            responses[index] = _jsonrpc_error(
+                item_id,
+                XMLRPC_FAULT_CODES["rate_limit"],
+                "Too many requests. Rate limit exceeded.",
+            )
+        calls = calls[:granted]
+
+        try:
+            user_id = self._authenticate_batch(credentials, user_obj)
+        except Exception as e:
+            code = (
+                XMLRPC_FAULT_CODES["unauthorized"]
+                if isinstance(e, AccessDenied)
+                else _error_code_for(e)
+            )
+            for index, item_id, _params in calls:
+                responses[index] = _jsonrpc_error(item_id, code, str(e))
+            return responses, headers
+
+        env = request.env(user=user_id)
+        done = []
+        failed = None
+        for index, item_id, params in calls:
+            if failed is not None:
+                responses[index] = _jsonrpc_error(
+                    item_id,
+                    JSONRPC_ERROR_CODES["not_executed"],
+                    f"Not executed: batch item {failed} failed.",
+                )
+                continue
+            if list(params[:3]) != list(credentials):
+                error = xmlrpclib.Fault(
+                    XMLRPC_FAULT_CODES["bad_request"],
+                    "All calls of a batch must use the same credentials.",
+                )
+            else:
+                try:
+                    result = self._run_batch_call(env, user_id, params, savepoints)
+                    responses[index] = _jsonrpc_result(item_id, result)
+                    done.append((index, item_id))
+                    continue
+                except Exception as e:
+                    _logger.info("MCP JSON-RPC batch item %s failed: %s", item_id, e)
+                    error = e
+            responses[index] = _jsonrpc_error(
+                item_id, _error_code_for(error), str(error)
+            )
+            if not savepoints:
+                failed = item_id if item_id is not None else index
+
+        if failed is not None:
+            env.cr.rollback()
+            for index, item_id in done:
+                responses[index] = _jsonrpc_error(
+                    item_id,
+                    JSONRPC_ERROR_CODES["not_executed"],
+                    f"Rolled back: batch item {failed} failed.",
+                )
+        return responses, headers
+
+    @http.route(
+        "/mcp/jsonrpc/object", type="http", auth="none", methods=["POST"], csrf=False
+    )
+    def jsonrpc(self, savepoints=None, **kwargs):
+        """
+        JSON-RPC 2.0 counterpart of /mcp/xmlrpc/object.
+
+        Accepts a single request object or a batch array of them, each with
+        ``"method": "execute_kw"`` and the execute_kw params list. Pass
+        ``?savepoints=1`` to run each call of a batch in its own savepoint
+        instead of all-or-nothing.
+        """
+        if not utils.is_mcp_enabled():
+            return request.make_json_response(
+                _jsonrpc_error(
+                    None,
+                    XMLRPC_FAULT_CODES["forbidden"],
+                    "MCP Server is disabled globally.",
+                )
+            )
+
+        try:
+            payload = json.loads(request.httprequest.get_data())
+        except ValueError:
+            return request.make_json_response(
+                _jsonrpc_error(None, JSONRPC_ERROR_CODES["parse_error"], "Parse error.")
+            )
+
+        is_batch = isinstance(payload, list)
+        items = payload if is_batch else [payload]
+        if not items or len(items) > MAX_BATCH_SIZE:
+            return request.make_json_response(
+                _jsonrpc_error(
+                    None,
+                    JSONRPC_ERROR_CODES["invalid_request"],
+                    f"A batch must hold between 1 and {MAX_BATCH_SIZE} requests.",
+                )
+            )
+
+        responses, headers = self._mcp_jsonrpc_batch(
+            items, savepoints in ("1", "true", "True")
+        )
+        # Requests without an id are notifications and get no response
+        responses = [
+            response
+            for item, response in zip(items, responses)
+            if not isinstance(item, dict) or "id" in item
+        ]
+        if not responses:
+            return request.make_response("", headers=list(headers.items()), status=204)
+        return request.make_json_response(
+            responses if is_batch else responses[0], headers=headers
+        )
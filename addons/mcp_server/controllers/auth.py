@@ -1,23 +1,121 @@
 """Authentication utilities for MCP Server."""
 
 import functools
+import hashlib
+import hmac
 import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
 
 from odoo.http import request
 
 _logger = logging.getLogger(__name__)
 
+DEFAULT_API_KEY_CACHE_TTL = 60
+MAX_CACHED_API_KEYS = 1024
+
+# Per-worker cache of verified API keys: keyed hash of the presented token ->
+# (user_id, expiry on the monotonic clock). The secret never leaves the
+# process, so the cache holds nothing that could be replayed as a key.
+_api_key_cache_secret = os.urandom(32)
+_api_key_cache: Dict[bytes, Tuple[int, float]] = {}
+_api_key_cache_lock = threading.Lock()
+
+
+def get_api_key_cache_ttl():
+    """
+    Get the verified-key cache TTL from `mcp_server.api_key_cache_ttl`.
+    A revoked key keeps working on other workers for at most this long.
+
+    :return: TTL in seconds, 0 to disable the cache
+    :rtype: int
+    """
+    try:
+        return max(
+            0,
+            int(
+                request.env["ir.config_parameter"]
+                .sudo()
+                .get_param("mcp_server.api_key_cache_ttl", DEFAULT_API_KEY_CACHE_TTL)
+            ),
+        )
+    except (ValueError, TypeError):
+        return DEFAULT_API_KEY_CACHE_TTL
+
+
+def _api_key_digest(api_key: str) -> bytes:
+    message = f"{request.env.cr.dbname}\0{api_key}".encode()
+    return hmac.new(_api_key_cache_secret, message, hashlib.sha256).digest()
+
+
+def _get_cached_user_id(digest: bytes) -> Optional[int]:
+    with _api_key_cache_lock:
+        entry = _api_key_cache.get(digest)
+        if not entry:
+            return None
+        if entry[1] <= time.monotonic():
+            del _api_key_cache[digest]
+            return None
+        return entry[0]
+
+
+def _cache_user_id(digest: bytes, user_id: int, ttl: int) -> None:
+    now = time.monotonic()
+    with _api_key_cache_lock:
+        if len(_api_key_cache) >= MAX_CACHED_API_KEYS:
+            # Drop expired entries first, then the oldest ones
+            for key in [k for k, v in _api_key_cache.items() if v[1] <= now]:
+                del _api_key_cache[key]
+            while len(_api_key_cache) >= MAX_CACHED_API_KEYS:
+                del _api_key_cache[next(iter(_api_key_cache))]
+        _api_key_cache[digest] = (user_id, now + ttl)
+
+
+def invalidate_api_key_cache(user_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Forget verified keys, for the given users or for everyone.
+
+    Called when keys are revoked or users deactivated; other workers drop
+    their entries when the TTL expires.
+
+    :param user_ids: Users whose keys to forget, or None for all
+    """
+    with _api_key_cache_lock:
+        if user_ids is None:
+            _api_key_cache.clear()
+            return
+        user_ids = set(user_ids)
+        for key in [k for k, v in _api_key_cache.items() if v[0] in user_ids]:
+            del _api_key_cache[key]
+
 
 def get_user_from_api_key(api_key):
     """
     Get user from API key.
 
+    Keys verified within the last `mcp_server.api_key_cache_ttl` seconds are
+    served from a per-worker cache, skipping the key hash check and the
+    authentication log line.
+
     :param api_key: The API key to validate
     :return: res.users record or None
     """
     if not api_key:
         return None
 
+    ttl = get_api_key_cache_ttl()
+    digest = _api_key_digest(api_key) if ttl else None
+    if digest:
+        cached_user_id = _get_cached_user_id(digest)
+        if cached_user_id:
+            # sudo: browse user by ID without requiring existing user context
+            user = request.env["res.users"].sudo().browse(cached_user_id).exists()
+            if user and user.active:
+                return user
+            invalidate_api_key_cache([cached_user_id])
+
     try:
         user_id = (
             request.env["res.users.apikeys"]
@@ -43,6 +141,8 @@ def get_user_from_api_key(api_key):
                 api_key_used=True,
                 ip_address=request.httprequest.remote_addr,
             )
+            if digest:
+                _cache_user_id(digest, user.id, ttl)
             return user
         else:
             # sudo: write to mcp.log regardless of user permissions
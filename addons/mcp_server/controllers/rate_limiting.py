@@ -1,9 +1,7 @@
 import functools
 import logging
 import signal
-import threading
-from datetime import datetime, timedelta, timezone
-from typing import Callable, Dict, List
+from typing import Callable, NamedTuple
 
 from odoo.http import request
 
@@ -13,11 +11,45 @@ _logger = logging.getLogger(__name__)
 DEFAULT_REQUEST_LIMIT = 300
 MINIMUM_REQUEST_LIMIT = 10
 RATE_LIMIT_WINDOW_MINUTES = 1
+RATE_LIMIT_WINDOW_SECONDS = RATE_LIMIT_WINDOW_MINUTES * 60
+
+# Bucket used when the caller could not be identified
+ANONYMOUS_ID = -1
+
+# One upsert per request (or batch): start a new window or count into the
+# current one.
+# Shared through Postgres, so the limit holds across all prefork workers.
+_CONSUME_SQL = """
+    INSERT INTO mcp_rate_limit AS rl (bucket, window_start, hits)
+    SELECT %(bucket)s,
+           to_timestamp(
+               floor(extract(epoch FROM clock_timestamp()) / %(window)s)
+               * %(window)s
+           ) AT TIME ZONE 'UTC',
+           %(requests)s
+    ON CONFLICT (bucket) DO UPDATE
+       SET hits = CASE WHEN rl.window_start = EXCLUDED.window_start
+                       THEN rl.hits + EXCLUDED.hits ELSE EXCLUDED.hits END,
+           window_start = EXCLUDED.window_start
+    RETURNING rl.hits,
+              ceil(extract(epoch FROM
+                  rl.window_start + make_interval(secs => %(window)s)
+                  - (clock_timestamp() AT TIME ZONE 'UTC')))::int
+"""
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of counting requests against a bucket.
+
+    ``granted`` is how many of the counted requests fit in the window; it
+    only differs from the number counted for a partially rejected batch.
+    """
 
-# Cache for API request timestamps (user_id: [timestamps])
-_api_request_cache: Dict[int, List[datetime]] = {}
-# Lock for thread-safe cache access
-_cache_lock = threading.Lock()
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int
+    granted: int = 1
 
 
 def get_request_limit():
@@ -45,57 +77,90 @@ def get_request_limit():
         return DEFAULT_REQUEST_LIMIT
 
 
-def record_api_request(user_id: int) -> None:
+def consume_request(
+    cr,
+    bucket: str,
+    limit: int,
+    window_seconds: int = RATE_LIMIT_WINDOW_SECONDS,
+    requests: int = 1,
+) -> RateLimitResult:
     """
-    Record API request timestamp for rate limiting.
-
-    :param user_id: The ID of the user making the request.
-    :type user_id: int
+    Count `requests` requests against `bucket` in the shared counter table.
+
+    :param cr: Database cursor to run the upsert on
+    :param bucket: Rate-limit bucket key (e.g. ``user:42``)
+    :type bucket: str
+    :param limit: Requests allowed per window
+    :type limit: int
+    :param window_seconds: Window length in seconds
+    :type window_seconds: int
+    :param requests: Number of requests to count, e.g. the items of a batch
+    :type requests: int
+    :return: Whether the requests are allowed, plus header values
+    :rtype: RateLimitResult
     """
-    now = datetime.now(timezone.utc)
-    with _cache_lock:
-        if user_id not in _api_request_cache:
-            _api_request_cache[user_id] = []
-
-        # Add current timestamp
-        _api_request_cache[user_id].append(now)
-
-        # Clean up old timestamps (older than 1 minute)
-        one_minute_ago = now - timedelta(minutes=RATE_LIMIT_WINDOW_MINUTES)
-        _api_request_cache[user_id] = [
-            ts for ts in _api_request_cache[user_id] if ts > one_minute_ago
-        ]
-
-
-def check_rate_limit(user_id: int) -> bool:
+    cr.execute(
+        _CONSUME_SQL,
+        {"bucket": bucket, "window": window_seconds, "requests": requests},
+    )
+    hits, reset_in = cr.fetchone()
+    return RateLimitResult(
+        allowed=hits <= limit,
+        limit=limit,
+        remaining=max(limit - hits, 0),
+        retry_after=max(reset_in or 0, 1),
+        granted=max(min(requests, limit - (hits - requests)), 0),
+    )
+
+
+def hit_rate_limit(user_id: int, requests: int = 1) -> RateLimitResult:
     """
-    Check if user has exceeded the configured request limit.
+    Count requests for `user_id` and tell whether they are within the limit.
+
+    The counter is updated on its own short transaction so the bucket row is
+    never held for the duration of the business call, and so rejected
+    requests (whose transaction is rolled back) still count.
 
     :param user_id: The ID of the user making the request.
     :type user_id: int
-    :return: True if the user is within the limit, False otherwise.
-    :rtype: bool
+    :param requests: Number of requests to count (items of a batch)
+    :type requests: int
+    :return: Rate-limit outcome for this request
+    :rtype: RateLimitResult
     """
     limit = get_request_limit()
 
     # If limit is 0, allow unlimited requests
     if limit == 0:
-        return True
+        return RateLimitResult(True, 0, 0, 0, requests)
 
-    now = datetime.now(timezone.utc)
-    one_minute_ago = now - timedelta(minutes=RATE_LIMIT_WINDOW_MINUTES)
+    registry = request.env.registry
+    with registry.cursor() as cr:
+        if not registry.in_test_mode():
+            # Wait on a concurrently updated bucket row instead of failing
+            # with a serialization error.
+            cr.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+        return consume_request(cr, f"user:{user_id}", limit, requests=requests)
 
-    with _cache_lock:
-        if user_id not in _api_request_cache:
-            return True  # No requests recorded yet
 
-        # Filter requests in the last minute
-        recent_requests = [
-            ts for ts in _api_request_cache[user_id] if ts > one_minute_ago
-        ]
-        _api_request_cache[user_id] = recent_requests  # Update cache
+def rate_limit_headers(result: RateLimitResult) -> dict:
+    """
+    HTTP headers describing a rate-limit outcome.
 
-        return len(recent_requests) < limit
+    :param result: Outcome returned by :func:`hit_rate_limit`
+    :type result: RateLimitResult
+    :return: Header name to value mapping
+    :rtype: dict
+    """
+    if not result.limit:
+        return {}
+    headers = {
+        "X-RateLimit-Limit": str(result.limit),
+        "X-RateLimit-Remaining": str(result.remaining),
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(result.retry_after)
+    return headers
 
 
 def rate_limit(func):
@@ -103,9 +168,8 @@ def rate_limit(func):
     Decorator enforcing request limits per minute per API key.
     Uses the system parameter `mcp_server.request_limit`
     for the limit value (default 300).
-    Checks current usage for the user (identified by API key).
-    Returns 429 error if exceeded.
-    Updates usage counter.
+    Counts the request against the user's shared bucket (identified by API
+    key) and returns a 429 error with a `Retry-After` header if exceeded.
     Assumes `require_api_key` decorator (or similar) is used before this one
     to ensure `kwargs['user']` is available.
     """
@@ -135,33 +199,43 @@ def rate_limit(func):
                 "Rate limit decorator called without a user context. "
                 "Using fallback anonymous rate limiting."
             )
-            anonymous_id = -1
-            if not check_rate_limit(anonymous_id):
-                return response_utils.error_response(
+            result = hit_rate_limit(ANONYMOUS_ID)
+            if not result.allowed:
+                response = response_utils.error_response(
                     "Too many anonymous requests. Please try again later.",
                     "E429",
                     status=429,
                 )
-            record_api_request(anonymous_id)
+                return _with_headers(response, rate_limit_headers(result))
             return func(*args, **kwargs)
 
-        if not check_rate_limit(user.id):
+        result = hit_rate_limit(user.id)
+        if not result.allowed:
             # Log rate limit exceeded
             request.env["mcp.log"].sudo().log_rate_limit_exceeded(
                 user_id=user.id,
                 endpoint=request.httprequest.path,
                 ip_address=request.httprequest.remote_addr,
             )
-            return response_utils.error_response(
+            response = response_utils.error_response(
                 "Too many requests. Please try again later.", "E429", status=429
             )
+            return _with_headers(response, rate_limit_headers(result))
 
-        record_api_request(user.id)
         return func(*args, **kwargs)
 
     return wrapper
 
 
+def _with_headers(response, headers):
+    """Set `headers` on an HTTP response, if it is one."""
+    response_headers = getattr(response, "headers", None)
+    if response_headers is not None:
+        for name, value in headers.items():
+            response_headers[name] = value
+    return response
+
+
 class TimeoutError(Exception):
     """Exception raised when a request times out."""
 
@@ -11,6 +11,8 @@ from odoo.http import request
 _logger = logging.getLogger(__name__)
 
 # Constants for configuration
+# Safety net only: the caches below are dropped as soon as the registry
+# signals an invalidation (see _sync_cache_signaling).
 CACHE_TTL_SECONDS = 300  # 5 minutes
 
 # Cache for MCP enabled status (TTL: 5 minutes)
@@ -26,6 +28,10 @@ _model_enabled_cache: Dict[str, Dict[str, Union[datetime, bool]]] = {}
 # {'timestamp': datetime, 'value': bool})
 _operation_enabled_cache: Dict[str, Dict[str, Union[datetime, bool]]] = {}
 
+# (database, registry sequence, "default" cache sequence) the caches above
+# were filled under
+_cache_token: Optional[tuple] = None
+
 
 def clear_mcp_caches() -> None:
     """
@@ -41,6 +47,32 @@ def clear_mcp_caches() -> None:
     _logger.info("MCP caches cleared")
 
 
+def _sync_cache_signaling(registry) -> None:
+    """
+    Drop the MCP caches when the registry's caches were invalidated.
+
+    Changes to ``mcp.enabled.model`` and ``ir.config_parameter`` clear the
+    registry's "default" cache. Odoo signals that through the database and
+    every worker picks it up in ``check_signaling()`` at the start of its
+    next request, bumping ``registry.cache_sequences``; a registry reload
+    replaces the registry altogether. Comparing against the sequences the
+    caches were filled under makes such a change apply on every worker at
+    its next request instead of after CACHE_TTL_SECONDS.
+
+    :param registry: Registry of the current request's database
+    """
+    global _cache_token
+    token = (
+        registry.db_name,
+        registry.registry_sequence,
+        registry.cache_sequences.get("default"),
+    )
+    if token != _cache_token:
+        if _cache_token is not None:
+            clear_mcp_caches()
+        _cache_token = token
+
+
 def sanitize_model_name(model_name: str) -> str:
     """
     Sanitize and validate model name.
@@ -63,11 +95,15 @@ def sanitize_model_name(model_name: str) -> str:
 def is_mcp_enabled() -> bool:
     """
     Check if MCP is globally enabled via `mcp_server.enabled` system parameter.
-    Result is cached for 5 minutes to reduce database queries.
+    Result is cached until the registry signals a cache invalidation
+    (at most 5 minutes) to reduce database queries.
 
     :return: True if MCP is enabled, False otherwise.
     :rtype: bool
     """
+    if request:
+        _sync_cache_signaling(request.env.registry)
+
     now = datetime.now(timezone.utc)
 
     # Check if cache is valid
@@ -100,7 +136,8 @@ def is_model_mcp_enabled(env: Environment, model_name: str) -> bool:
     """
     Check if a specific model is MCP-enabled.
     Uses existing `mcp.enabled.model.is_model_enabled()` method.
-    Result is cached for 5 minutes to reduce database queries.
+    Result is cached until the registry signals a cache invalidation
+    (at most 5 minutes) to reduce database queries.
 
     :param env: Odoo environment.
     :type env: odoo.api.Environment
@@ -111,6 +148,7 @@ def is_model_mcp_enabled(env: Environment, model_name: str) -> bool:
     """
     if not is_mcp_enabled():  # Check global switch first
         return False
+    _sync_cache_signaling(env.registry)
 
     now = datetime.now(timezone.utc)
 
@@ -148,7 +186,8 @@ def check_model_operation_allowed(
     """
     Check if a specific operation is allowed for an MCP-enabled model.
     Uses existing `mcp.enabled.model.check_model_operation_enabled()` method.
-    Result is cached for 5 minutes to reduce database queries.
+    Result is cached until the registry signals a cache invalidation
+    (at most 5 minutes) to reduce database queries.
 
     :param env: Odoo environment.
     :type env: odoo.api.Environment
@@ -1,6 +1,8 @@
 from odoo import _, api, fields, models
 from odoo.exceptions import ValidationError
 
+from ..controllers.utils import clear_mcp_caches
+
 
 class McpEnabledModel(models.Model):
     """Model to store which Odoo models are enabled for MCP access.
@@ -48,6 +50,33 @@ class McpEnabledModel(models.Model):
         )
     ]
 
+    def _signal_access_change(self):
+        """Make other workers drop their MCP access caches.
+
+        Clearing the registry cache is signalled through the database and
+        picked up by every worker at its next request (see
+        ``controllers.utils._sync_cache_signaling``). This worker's caches are
+        cleared right away.
+        """
+        self.env.registry.clear_cache()
+        clear_mcp_caches()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._signal_access_change()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self._signal_access_change()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._signal_access_change()
+        return res
+
     @api.model
     def is_model_enabled(self, model_name):
         """Check if a model is enabled for MCP access.
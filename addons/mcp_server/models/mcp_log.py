@@ -1,34 +1,89 @@
 """MCP Log Model for tracking MCP server activity."""
 
 import logging
-from datetime import datetime, timedelta
+import random
+from datetime import datetime, time, timedelta
+
+import psycopg2
 
 from odoo import api, fields, models
 
+from .mcp_log_buffer import log_buffer
+
 _logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_PAYLOAD = 10000
+
+# Routine events that mcp_server.log_sample_rate applies to. Failures and
+# security events are always logged.
+SAMPLED_EVENTS = ("auth_success", "model_access", "resource_retrieval")
+
+EVENT_TYPES = [
+    ("auth_success", "Authentication Success"),
+    ("auth_failure", "Authentication Failure"),
+    ("model_access", "Model Access"),
+    ("resource_retrieval", "Resource Retrieval"),
+    ("write_operation", "Write Operation"),
+    ("error", "Error"),
+    ("rate_limit", "Rate Limit Exceeded"),
+    ("permission_denied", "Permission Denied"),
+]
+
+DEFAULT_PARTITION = "mcp_log_default"
+PARTITION_PREFIX = "mcp_log_p"
+PARTITIONS_AHEAD = 7
+CLEANUP_CHUNK_SIZE = 10000
+INDEXED_COLUMNS = ("event_type", "user_id", "endpoint", "model_name", "create_date")
+
+# mcp.log is not managed by the ORM (see MCPLog), so a new field needs a
+# column here *and* an ALTER TABLE in a migration.
+_TABLE_DDL = """
+    CREATE TABLE mcp_log (
+        id SERIAL NOT NULL,
+        event_type VARCHAR NOT NULL,
+        user_id INTEGER REFERENCES res_users(id) ON DELETE SET NULL,
+        api_key_used BOOLEAN,
+        ip_address VARCHAR(45),
+        endpoint VARCHAR,
+        http_method VARCHAR,
+        model_name VARCHAR,
+        operation VARCHAR,
+        record_ids VARCHAR,
+        request_data TEXT,
+        response_data TEXT,
+        error_message TEXT,
+        error_code VARCHAR,
+        duration_ms INTEGER,
+        session_id VARCHAR,
+        user_agent TEXT,
+        create_uid INTEGER REFERENCES res_users(id) ON DELETE SET NULL,
+        create_date TIMESTAMP NOT NULL,
+        write_uid INTEGER REFERENCES res_users(id) ON DELETE SET NULL,
+        write_date TIMESTAMP,
+        CONSTRAINT mcp_log_pkey PRIMARY KEY (id, create_date)
+    ) PARTITION BY RANGE (create_date)
+"""
+
 
 class MCPLog(models.Model):
+    """MCP activity log, stored in daily range partitions on create_date.
+
+    The table is created (or converted from the former plain table) by
+    :meth:`init` rather than by the ORM, so that retention can drop whole
+    partitions instead of deleting rows. Rows that fall outside the
+    pre-created daily partitions land in ``mcp_log_default`` and are purged
+    in chunks. Aggregates for past days live in ``mcp.log.daily``.
+    """
+
     _name = "mcp.log"
     _description = "MCP Server Activity Log"
+    _auto = False
+    _log_access = True
     _order = "create_date desc"
     _rec_name = "event_type"
 
     # Basic fields
-    event_type = fields.Selection(
-        [
-            ("auth_success", "Authentication Success"),
-            ("auth_failure", "Authentication Failure"),
-            ("model_access", "Model Access"),
-            ("resource_retrieval", "Resource Retrieval"),
-            ("write_operation", "Write Operation"),
-            ("error", "Error"),
-            ("rate_limit", "Rate Limit Exceeded"),
-            ("permission_denied", "Permission Denied"),
-        ],
-        required=True,
-        index=True,
-    )
+    event_type = fields.Selection(EVENT_TYPES, required=True, index=True)
 
     # User and authentication info
     user_id = fields.Many2one("res.users", string="User", index=True)
@@ -62,17 +117,19 @@ class MCPLog(models.Model):
         """
         Create a log entry for an MCP event.
 
+        Outside of tests the entry is queued on the in-process log buffer and
+        written later on its own cursor, so nothing is returned; set
+        ``mcp_server.log_async`` to anything but "True" to insert
+        synchronously instead.
+
         :param event_type: Type of event from the selection
         :param kwargs: Additional data for the log entry
-        :return: Created log record
+        :return: Created log record, or an empty recordset if the entry was
+            skipped, sampled out or buffered
         """
+        params = self.env["ir.config_parameter"].sudo()
         # Skip logging if MCP logging is disabled
-        if (
-            self.env["ir.config_parameter"]
-            .sudo()
-            .get_param("mcp_server.enable_logging", "True")
-            != "True"
-        ):
+        if params.get_param("mcp_server.enable_logging", "True") != "True":
             return self.env["mcp.log"]
 
         # Skip logging only if explicitly requested via context
@@ -93,6 +150,14 @@ class MCPLog(models.Model):
             # We're in test mode and not specifically testing logging
             return self.env["mcp.log"]
 
+        if event_type in SAMPLED_EVENTS:
+            try:
+                sample_rate = float(params.get_param("mcp_server.log_sample_rate", "1"))
+            except ValueError:
+                sample_rate = 1.0
+            if sample_rate < 1.0 and random.random() >= sample_rate:
+                return self.env["mcp.log"]
+
         # Prepare log data
         log_data = {
             "event_type": event_type,
@@ -116,13 +181,23 @@ class MCPLog(models.Model):
         }
 
         # Truncate large data fields to prevent database issues
-        max_text_length = 10000
+        try:
+            max_text_length = int(
+                params.get_param("mcp_server.log_max_payload", DEFAULT_MAX_PAYLOAD)
+            )
+        except ValueError:
+            max_text_length = DEFAULT_MAX_PAYLOAD
         for field in ["request_data", "response_data", "error_message", "user_agent"]:
             if log_data.get(field) and len(str(log_data[field])) > max_text_length:
                 log_data[field] = (
                     str(log_data[field])[:max_text_length] + "... [truncated]"
                 )
 
+        log_async = params.get_param("mcp_server.log_async", "True") == "True"
+        if log_async and not in_test_mode:
+            self._buffer_log(log_data)
+            return self.env["mcp.log"]
+
         try:
             # Create log entry with sudo to ensure it's always created
             return self.sudo().create(log_data)
@@ -136,6 +211,23 @@ class MCPLog(models.Model):
                 _logger.error(f"Failed to create MCP log entry: {e}")
             return self.env["mcp.log"]
 
+    @api.model
+    def _buffer_log(self, log_data):
+        """Queue a prepared log entry for the background writer."""
+        now = fields.Datetime.now()
+        row = dict(log_data)
+        # Raw INSERT: apply the conversions create() would have done.
+        for field in ("request_data", "response_data", "error_message", "user_agent"):
+            row[field] = str(row[field]) if row[field] else None
+        row.update(
+            user_id=log_data["user_id"] or None,
+            create_uid=self.env.uid,
+            create_date=now,
+            write_uid=self.env.uid,
+            write_date=now,
+        )
+        return log_buffer.push(self.env.cr.dbname, row)
+
     @api.model
     def log_authentication(
         self,
@@ -238,14 +330,155 @@ class MCPLog(models.Model):
             or f"Permission denied for {operation} on {model_name}",
         )
 
+    def init(self):
+        cr = self.env.cr
+        cr.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('mcp_log')")
+        row = cr.fetchone()
+        if row is None:
+            cr.execute(_TABLE_DDL)
+            cr.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF mcp_log DEFAULT")
+            self._create_indexes()
+        elif row[0] == "r":
+            self._partition_existing_table()
+        self._ensure_partitions()
+
+    def _create_indexes(self):
+        for column in INDEXED_COLUMNS:
+            self.env.cr.execute(
+                f"CREATE INDEX IF NOT EXISTS mcp_log__{column}_index"
+                f" ON mcp_log ({column})"
+            )
+
+    def _partition_existing_table(self):
+        """Turn a plain mcp_log table (module versions before 18.0.1.3.0)
+        into the default partition of a new partitioned mcp_log.
+
+        Nothing is copied: the old rows stay in the default partition and
+        age out through the chunked delete in :meth:`cleanup_old_logs`.
+        """
+        _logger.info("Converting mcp_log to a partitioned table")
+        cr = self.env.cr
+        cr.execute(f"ALTER TABLE mcp_log RENAME TO {DEFAULT_PARTITION}")
+        cr.execute(
+            f"ALTER TABLE {DEFAULT_PARTITION}"
+            f" RENAME CONSTRAINT mcp_log_pkey TO {DEFAULT_PARTITION}_pkey"
+        )
+        for column in INDEXED_COLUMNS:
+            cr.execute(
+                f"ALTER INDEX IF EXISTS mcp_log__{column}_index"
+                f" RENAME TO {DEFAULT_PARTITION}__{column}_index"
+            )
+        cr.execute(
+            f"""
+            UPDATE {DEFAULT_PARTITION}
+               SET create_date = COALESCE(write_date, now() AT TIME ZONE 'UTC')
+             WHERE create_date IS NULL
+            """
+        )
+        cr.execute(
+            f"ALTER TABLE {DEFAULT_PARTITION} ALTER COLUMN create_date SET NOT NULL"
+        )
+        cr.execute(_TABLE_DDL)
+        # Keep numbering ids from the old sequence; SERIAL in the DDL made a
+        # fresh one next to it.
+        cr.execute("SELECT pg_get_serial_sequence('mcp_log', 'id')")
+        fresh_sequence = cr.fetchone()[0]
+        cr.execute(
+            "ALTER TABLE mcp_log ALTER COLUMN id"
+            " SET DEFAULT nextval('mcp_log_id_seq'::regclass)"
+        )
+        cr.execute(f"DROP SEQUENCE {fresh_sequence}")
+        cr.execute("ALTER SEQUENCE mcp_log_id_seq OWNED BY mcp_log.id")
+        cr.execute(f"ALTER TABLE mcp_log ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+        self._create_indexes()
+
+    def _is_partitioned(self):
+        self.env.cr.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass('mcp_log')"
+        )
+        row = self.env.cr.fetchone()
+        return bool(row) and row[0] == "p"
+
+    def _partition_days(self):
+        """Map of day -> partition name for the existing daily partitions."""
+        self.env.cr.execute(
+            """
+            SELECT c.relname
+              FROM pg_inherits i
+              JOIN pg_class c ON c.oid = i.inhrelid
+             WHERE i.inhparent = 'mcp_log'::regclass
+            """
+        )
+        days = {}
+        for (name,) in self.env.cr.fetchall():
+            if name.startswith(PARTITION_PREFIX):
+                day = datetime.strptime(name[len(PARTITION_PREFIX) :], "%Y%m%d")
+                days[day.date()] = name
+        return days
+
+    @api.model
+    def _ensure_partitions(self, days_ahead=PARTITIONS_AHEAD):
+        """Create the daily partitions from today to ``days_ahead`` days out."""
+        if not self._is_partitioned():
+            return
+        existing = self._partition_days()
+        today = fields.Datetime.now().date()
+        for offset in range(days_ahead + 1):
+            day = today + timedelta(days=offset)
+            if day in existing:
+                continue
+            name = f"{PARTITION_PREFIX}{day:%Y%m%d}"
+            try:
+                with self.env.cr.savepoint():
+                    self.env.cr.execute(
+                        f"CREATE TABLE {name} PARTITION OF mcp_log"
+                        " FOR VALUES FROM (%s) TO (%s)",
+                        (day, day + timedelta(days=1)),
+                    )
+            except psycopg2.Error as e:
+                # Rows for that day already sit in the default partition;
+                # they keep going there and are purged by the chunked delete.
+                _logger.warning("Could not create MCP log partition %s: %s", name, e)
+
+    @api.model
+    def _delete_in_chunks(self, table, cutoff, chunk_size=CLEANUP_CHUNK_SIZE):
+        """Delete rows older than ``cutoff`` from one table, a chunk at a time,
+        committing between chunks outside of tests."""
+        deleted = 0
+        while True:
+            self.env.cr.execute(
+                f"""
+                DELETE FROM {table}
+                 WHERE ctid = ANY(ARRAY(
+                       SELECT ctid FROM {table}
+                        WHERE create_date < %s
+                        LIMIT %s))
+                """,
+                (cutoff, chunk_size),
+            )
+            deleted += self.env.cr.rowcount
+            if self.env.cr.rowcount < chunk_size:
+                return deleted
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+
     @api.model
     def cleanup_old_logs(self, days=None):
         """
         Clean up old log entries based on retention settings.
 
+        Past days are rolled up into ``mcp.log.daily`` first. Daily
+        partitions entirely older than the cutoff are dropped; anything else
+        older than the cutoff (the default partition) is deleted in chunks.
+        Partitions for the coming days are created on the way.
+
         :param days: Number of days to retain logs (overrides config if provided)
         :return: Number of deleted records
         """
+        self.flush_model()
+        self.env["mcp.log.daily"]._rollup()
+        self._ensure_partitions()
+
         if days is None:
             # Get retention days from config, default to 30
             days = int(
@@ -261,10 +494,18 @@ class MCPLog(models.Model):
         # Calculate cutoff date
         cutoff_date = datetime.now() - timedelta(days=days)
 
-        # Find and delete old logs
-        old_logs = self.search([("create_date", "<", cutoff_date)])
-        count = len(old_logs)
-        old_logs.unlink()
+        count = 0
+        if self._is_partitioned():
+            for day, name in sorted(self._partition_days().items()):
+                if datetime.combine(day + timedelta(days=1), time.min) > cutoff_date:
+                    continue
+                self.env.cr.execute(f"SELECT COUNT(*) FROM {name}")
+                count += self.env.cr.fetchone()[0]
+                self.env.cr.execute(f"DROP TABLE {name}")
+            count += self._delete_in_chunks(DEFAULT_PARTITION, cutoff_date)
+        else:
+            count += self._delete_in_chunks(self._table, cutoff_date)
+        self.invalidate_model()
 
         _logger.info(f"Cleaned up {count} MCP log entries older than {days} days")
         return count
@@ -0,0 +1,171 @@
+"""In-process write buffer for mcp.log.
+
+Writing one mcp.log row per API call inside the caller's transaction made
+every MCP request pay for an INSERT of its payloads, and a failing or slow
+insert could take the business operation down with it. Entries are instead
+queued here and written by a background thread in multi-row INSERTs on a
+cursor of their own.
+
+The queue is bounded: when the writer cannot keep up, new entries are
+dropped and counted rather than blocking the request. Entries still queued
+when a worker is killed are lost; audit logging is best effort.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from odoo.modules.registry import Registry
+
+_logger = logging.getLogger(__name__)
+
+MAX_BUFFERED_LOGS = 10000
+LOG_FLUSH_BATCH = 500
+LOG_FLUSH_INTERVAL = 2.0
+
+LOG_COLUMNS = (
+    "event_type",
+    "user_id",
+    "api_key_used",
+    "ip_address",
+    "endpoint",
+    "http_method",
+    "model_name",
+    "operation",
+    "record_ids",
+    "request_data",
+    "response_data",
+    "error_message",
+    "error_code",
+    "duration_ms",
+    "session_id",
+    "user_agent",
+    "create_uid",
+    "create_date",
+    "write_uid",
+    "write_date",
+)
+
+_ROW_TEMPLATE = "(" + ",".join(["%s"] * len(LOG_COLUMNS)) + ")"
+
+
+class MCPLogBuffer:
+    """Bounded queue of pending mcp.log rows, flushed per database."""
+
+    def __init__(
+        self,
+        max_size=MAX_BUFFERED_LOGS,
+        batch_size=LOG_FLUSH_BATCH,
+        flush_interval=LOG_FLUSH_INTERVAL,
+        autostart=True,
+    ):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.autostart = autostart
+        self.dropped = 0
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._queue)
+
+    def push(self, dbname, values):
+        """Queue one row (a dict keyed on LOG_COLUMNS).
+
+        :return: False if the entry was dropped because the buffer is full
+        """
+        if self._pid != os.getpid():
+            # Forked worker: the parent's lock and writer thread are not ours.
+            self._reset()
+        with self._cond:
+            if len(self._queue) >= self.max_size:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 1000 == 0:
+                    _logger.warning(
+                        "MCP log buffer full, %s entries dropped so far",
+                        self.dropped,
+                    )
+                return False
+            self._queue.append((dbname, values))
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+        if self.autostart and self._thread is None:
+            self._start()
+        return True
+
+    def _start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="mcp.log.writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._queue) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:  # the writer thread must never die
+                _logger.exception("MCP log writer failed")
+
+    def _drain(self):
+        with self._cond:
+            count = min(len(self._queue), self.batch_size)
+            return [self._queue.popleft() for _ in range(count)]
+
+    def flush(self):
+        """Write everything queued so far. Returns the number of rows written."""
+        written = 0
+        while True:
+            entries = self._drain()
+            if not entries:
+                return written
+            by_db = {}
+            for dbname, values in entries:
+                by_db.setdefault(dbname, []).append(values)
+            for dbname, rows in by_db.items():
+                try:
+                    self._write(dbname, rows)
+                    written += len(rows)
+                except Exception as e:
+                    self.dropped += len(rows)
+                    _logger.warning(
+                        "Dropped %s MCP log entries for %s: %s", len(rows), dbname, e
+                    )
+
+    def _write(self, dbname, rows):
+        registry = Registry(dbname)
+        with registry.cursor() as cr:
+            values = ",".join(
+                cr.mogrify(
+                    _ROW_TEMPLATE, [row.get(column) for column in LOG_COLUMNS]
+                ).decode()
+                for row in rows
+            )
+            cr.execute(
+                f"INSERT INTO mcp_log ({','.join(LOG_COLUMNS)}) VALUES {values}"
+            )
+
+
+log_buffer = MCPLogBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    if log_buffer._pid == os.getpid() and len(log_buffer):
+        try:
+            log_buffer.flush()
+        except Exception as e:
+            _logger.warning("MCP log entries lost at shutdown: %s", e)
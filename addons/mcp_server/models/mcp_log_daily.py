@@ -0,0 +1,131 @@
+"""Daily MCP activity rollup."""
+
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from .mcp_log import EVENT_TYPES
+
+
+class MCPLogDaily(models.Model):
+    """Per-day aggregates of mcp.log, one row per event type, model and
+    operation.
+
+    Rows are filled by :meth:`_rollup` from the log cleanup cron before old
+    partitions are dropped, so activity statistics outlive the raw log
+    retention and :meth:`get_summary` never scans more than the days that
+    have not been rolled up yet.
+    """
+
+    _name = "mcp.log.daily"
+    _description = "MCP Daily Activity"
+    _log_access = False
+    _order = "day desc"
+    _rec_name = "day"
+
+    day = fields.Date(required=True, index=True, readonly=True)
+    event_type = fields.Selection(EVENT_TYPES, required=True, readonly=True)
+    model_name = fields.Char(string="Model", readonly=True)
+    operation = fields.Char(readonly=True)
+    hits = fields.Integer(readonly=True)
+    duration_ms_total = fields.Float(string="Total Duration (ms)", readonly=True)
+    timed_hits = fields.Integer(readonly=True, help="Hits that recorded a duration")
+    duration_ms_max = fields.Integer(string="Max Duration (ms)", readonly=True)
+
+    def _last_day(self):
+        self.env.cr.execute("SELECT MAX(day) FROM mcp_log_daily")
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _rollup(self):
+        """Aggregate every complete day (UTC) not rolled up yet.
+
+        :return: first day that is still only in the raw log
+        """
+        self.env["mcp.log"].flush_model()
+        today = fields.Datetime.now().date()
+        last_day = self._last_day()
+        if last_day:
+            start = last_day + timedelta(days=1)
+        else:
+            self.env.cr.execute("SELECT MIN(create_date)::date FROM mcp_log")
+            start = self.env.cr.fetchone()[0]
+        if not start or start >= today:
+            return today
+        self.env.cr.execute(
+            """
+            INSERT INTO mcp_log_daily
+                   (day, event_type, model_name, operation,
+                    hits, duration_ms_total, timed_hits, duration_ms_max)
+            SELECT create_date::date, event_type, model_name, operation,
+                   COUNT(*), COALESCE(SUM(duration_ms), 0), COUNT(duration_ms),
+                   MAX(duration_ms)
+              FROM mcp_log
+             WHERE create_date >= %(start)s AND create_date < %(today)s
+             GROUP BY 1, 2, 3, 4
+            """,
+            {"start": start, "today": today},
+        )
+        self.invalidate_model()
+        return today
+
+    @api.model
+    def get_summary(self, days=30):
+        """Activity over the last ``days`` days (today included).
+
+        Complete days come from the rollup; only the days after the last
+        rollup are aggregated from the raw log.
+
+        :return: dict with ``total``, ``errors``, ``avg_duration_ms``,
+            ``by_event_type`` and ``by_model`` hit counts
+        """
+        self.check_access("read")
+        self.env["mcp.log"].flush_model()
+        today = fields.Datetime.now().date()
+        since = today - timedelta(days=max(days, 1) - 1)
+        last_day = self._last_day()
+        raw_from = max(since, last_day + timedelta(days=1)) if last_day else since
+        self.env.cr.execute(
+            """
+            SELECT event_type, model_name,
+                   SUM(hits), SUM(duration_ms_total), SUM(timed_hits)
+              FROM (
+                    SELECT event_type, model_name, hits, duration_ms_total,
+                           timed_hits
+                      FROM mcp_log_daily
+                     WHERE day >= %(since)s AND day < %(raw_from)s
+                    UNION ALL
+                    SELECT event_type, model_name, COUNT(*),
+                           COALESCE(SUM(duration_ms), 0), COUNT(duration_ms)
+                      FROM mcp_log
+                     WHERE create_date >= %(raw_from)s
+                     GROUP BY event_type, model_name
+                   ) activity
+             GROUP BY event_type, model_name
+            """,
+            {"since": since, "raw_from": raw_from},
+        )
+        rows = self.env.cr.fetchall()
+        summary = {
+            "days": days,
+            "total": 0,
+            "errors": 0,
+            "avg_duration_ms": 0.0,
+            "by_event_type": {},
+            "by_model": {},
+        }
+        duration = timed = 0
+        for event_type, model_name, hits, total_ms, timed_hits in rows:
+            summary["total"] += hits
+            if event_type in ("error", "auth_failure", "permission_denied"):
+                summary["errors"] += hits
+            by_type = summary["by_event_type"]
+            by_type[event_type] = by_type.get(event_type, 0) + hits
+            if model_name:
+                by_model = summary["by_model"]
+                by_model[model_name] = by_model.get(model_name, 0) + hits
+            duration += total_ms or 0
+            timed += timed_hits or 0
+        if timed:
+            summary["avg_duration_ms"] = round(duration / timed, 2)
+        return summary
@@ -0,0 +1,26 @@
+"""Shared rate-limit counters for MCP Server."""
+
+from odoo import fields, models
+
+
+class MCPRateLimit(models.Model):
+    """Fixed-window request counter, one row per rate-limit bucket.
+
+    Rows are written with a single upsert by
+    :func:`odoo.addons.mcp_server.controllers.rate_limiting.consume_request`,
+    so every worker of every process shares the same count. The table holds
+    one row per bucket (API user), not one per request.
+    """
+
+    _name = "mcp.rate.limit"
+    _description = "MCP Rate Limit Counter"
+    _log_access = False
+    _rec_name = "bucket"
+
+    bucket = fields.Char(required=True, readonly=True)
+    window_start = fields.Datetime(readonly=True)
+    hits = fields.Integer(readonly=True)
+
+    _sql_constraints = [
+        ("bucket_uniq", "unique(bucket)", "One counter per rate-limit bucket."),
+    ]
@@ -54,6 +54,21 @@ class ResConfigSettings(models.TransientModel):
         config_parameter="mcp_server.log_retention_days",
         default=30,
     )
+    mcp_log_sample_rate = fields.Float(
+        string="Log Sample Rate",
+        help="Fraction (0 to 1) of successful authentications and model accesses "
+        "that are written to the MCP log. Errors, rate-limit and permission events "
+        "are always logged. Lower it on high-volume servers. Default: 1 (log all).",
+        config_parameter="mcp_server.log_sample_rate",
+        default=1.0,
+    )
+    mcp_log_max_payload = fields.Integer(
+        string="Max Logged Payload (characters)",
+        help="Request and response payloads, error messages and user agents longer "
+        "than this are truncated before being logged. Default: 10000 characters.",
+        config_parameter="mcp_server.log_max_payload",
+        default=10000,
+    )
 
     @api.model
     def get_values(self):
@@ -0,0 +1,24 @@
+from odoo import models
+
+from ..controllers.auth import invalidate_api_key_cache
+
+
+class ResUsers(models.Model):
+    _inherit = "res.users"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "active" in vals and not vals["active"]:
+            # Deactivated users must stop authenticating through cached keys
+            invalidate_api_key_cache(self.ids)
+        return res
+
+
+class ResUsersApikeys(models.Model):
+    _inherit = "res.users.apikeys"
+
+    def unlink(self):
+        # Revoked keys must stop authenticating through the key cache. Only
+        # hashes are cached, so forget every cached key of the owning users.
+        invalidate_api_key_cache(self.sudo().user_id.ids)
+        return super().unlink()
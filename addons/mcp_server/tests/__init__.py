@@ -1,9 +1,13 @@
 from . import test_api
+from . import test_api_key_cache
 from . import test_authentication
 from . import test_config_settings
 from . import test_controller_utils
 from . import test_enabled_models
 from . import test_helpers
+from . import test_jsonrpc_batch
+from . import test_log_buffer
+from . import test_log_retention
 from . import test_main_controller
 from . import test_model_selection_ui
 from . import test_rate_limiting
@@ -0,0 +1,109 @@
+"""Tests for the MCP verified API-key cache."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from odoo.tests import common, tagged
+
+from ..controllers import auth
+from .test_helpers import create_test_user
+
+
+@tagged("much_unit", "post_install", "-at_install")
+class TestApiKeyCache(common.TransactionCase):
+    """Test caching of verified API keys and its invalidation"""
+
+    def setUp(self):
+        super().setUp()
+        auth.invalidate_api_key_cache()
+        self.addCleanup(auth.invalidate_api_key_cache)
+
+        self.test_user = create_test_user(
+            self.env,
+            "Key Cache Test User",
+            "key_cache_test_user",
+            email="key_cache_test@example.com",
+        )
+        self.api_key = (
+            self.env(user=self.test_user)["res.users.apikeys"]._generate(
+                "rpc", "Key Cache Test Key", datetime.now() + timedelta(days=30)
+            )
+        )
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mcp_server.api_key_cache_ttl", "60"
+        )
+
+        mock_request = MagicMock()
+        mock_request.env = self.env
+        mock_request.httprequest.remote_addr = "127.0.0.1"
+        patcher = patch(
+            "odoo.addons.mcp_server.controllers.auth.request", mock_request
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _check_credentials_spy(self):
+        Apikeys = type(self.env["res.users.apikeys"])
+        return patch.object(
+            Apikeys,
+            "_check_credentials",
+            autospec=True,
+            side_effect=Apikeys._check_credentials,
+        )
+
+    def test_repeat_requests_skip_hash_check(self):
+        """Test that a verified key is served from the cache"""
+        with self._check_credentials_spy() as spy:
+            for _ in range(5):
+                self.assertEqual(
+                    auth.get_user_from_api_key(self.api_key), self.test_user
+                )
+        self.assertEqual(spy.call_count, 1)
+
+    def test_cache_disabled(self):
+        """Test that a TTL of 0 verifies every request"""
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mcp_server.api_key_cache_ttl", "0"
+        )
+        with self._check_credentials_spy() as spy:
+            for _ in range(3):
+                auth.get_user_from_api_key(self.api_key)
+        self.assertEqual(spy.call_count, 3)
+
+    def test_wrong_key_not_cached(self):
+        """Test that failed verifications are never cached"""
+        self.assertIsNone(auth.get_user_from_api_key("not-a-real-key-0123456789"))
+        self.assertFalse(auth._api_key_cache)
+
+    def test_revoke_invalidates_immediately(self):
+        """Test that revoking through the ORM clears this worker's cache"""
+        self.assertTrue(auth.get_user_from_api_key(self.api_key))
+        self.env["res.users.apikeys"].search(
+            [("user_id", "=", self.test_user.id)]
+        ).sudo().unlink()
+        self.assertIsNone(auth.get_user_from_api_key(self.api_key))
+
+    def test_deactivate_invalidates_immediately(self):
+        """Test that deactivating the user clears this worker's cache"""
+        self.assertTrue(auth.get_user_from_api_key(self.api_key))
+        self.test_user.active = False
+        self.assertIsNone(auth.get_user_from_api_key(self.api_key))
+
+    def test_revoked_elsewhere_stops_within_ttl(self):
+        """Test that a key revoked by another worker expires with the TTL"""
+        self.assertTrue(auth.get_user_from_api_key(self.api_key))
+
+        # Another worker revokes the key: this worker's cache sees no signal
+        self.env.cr.execute(
+            "DELETE FROM res_users_apikeys WHERE user_id = %s",
+            (self.test_user.id,),
+        )
+        self.env.invalidate_all()
+
+        now = auth.time.monotonic()
+        with patch.object(auth.time, "monotonic", return_value=now + 59):
+            self.assertEqual(
+                auth.get_user_from_api_key(self.api_key), self.test_user
+            )
+        with patch.object(auth.time, "monotonic", return_value=now + 61):
+            self.assertIsNone(auth.get_user_from_api_key(self.api_key))
@@ -176,6 +176,49 @@ class TestMcpUtils(common.TransactionCase):
                 utils.check_model_operation_allowed(self.env, "res.partner", "invalid")
             )
 
+    def test_caches_follow_registry_signaling(self):
+        """A cache invalidation signalled by another worker empties the caches"""
+        mock_request = MagicMock()
+        mock_request.env = self.env
+
+        with patch("odoo.addons.mcp_server.controllers.utils.request", mock_request):
+            self.assertTrue(
+                utils.check_model_operation_allowed(self.env, "res.partner", "read")
+            )
+
+            # Another worker revokes read access: no ORM hook runs here
+            self.env.cr.execute(
+                "UPDATE mcp_enabled_model SET allow_read = false WHERE id = %s",
+                [self.partner_enabled_model.id],
+            )
+            self.env.invalidate_all()
+            self.assertTrue(
+                utils.check_model_operation_allowed(self.env, "res.partner", "read")
+            )
+
+            # ... and its cache signal reaches this worker's registry
+            sequences = self.env.registry.cache_sequences
+            with patch.dict(sequences, {"default": sequences.get("default", 0) + 1}):
+                self.assertFalse(
+                    utils.check_model_operation_allowed(self.env, "res.partner", "read")
+                )
+
+    def test_enabled_model_changes_signal_invalidation(self):
+        """Changing mcp.enabled.model clears the registry and local caches"""
+        mock_request = MagicMock()
+        mock_request.env = self.env
+
+        with patch("odoo.addons.mcp_server.controllers.utils.request", mock_request):
+            self.assertTrue(utils.is_model_mcp_enabled(self.env, "res.partner"))
+
+            with patch.object(
+                type(self.env.registry), "clear_cache", autospec=True
+            ) as clear_cache:
+                self.partner_enabled_model.write({"active": False})
+            clear_cache.assert_called()
+
+            self.assertFalse(utils.is_model_mcp_enabled(self.env, "res.partner"))
+
     def test_get_enabled_models(self):
         """Test getting list of enabled models"""
         mock_request = MagicMock()
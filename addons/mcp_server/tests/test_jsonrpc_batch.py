@@ -0,0 +1,208 @@
+"""Tests for JSON-RPC 2.0 batches on the MCP object endpoint."""
+
+import json
+from datetime import datetime, timedelta
+
+from odoo.tests import tagged
+from odoo.tests.common import HttpCase
+
+from ..controllers import utils
+from ..controllers.api import JSONRPC_ERROR_CODES, MAX_BATCH_SIZE
+from .test_helpers import create_test_user
+
+
+@tagged("much_unit", "post_install", "-at_install")
+class TestMCPJsonRpcBatch(HttpCase):
+    """Test /mcp/jsonrpc/object single calls and batches"""
+
+    def setUp(self):
+        super().setUp()
+        params = self.env["ir.config_parameter"].sudo()
+        params.set_param("mcp_server.enabled", "True")
+        params.set_param("mcp_server.enable_rate_limiting", "False")
+        utils.clear_mcp_caches()
+
+        self.test_user = create_test_user(
+            self.env,
+            "Batch Test User",
+            "batch_test_user",
+            email="batch_test@example.com",
+            groups_id=[
+                (
+                    6,
+                    0,
+                    [
+                        self.env.ref("base.group_user").id,
+                        self.env.ref("mcp_server.group_mcp_user").id,
+                    ],
+                )
+            ],
+        )
+        self.api_key = self.env(user=self.test_user)["res.users.apikeys"]._generate(
+            "rpc", "Batch Test Key", datetime.now() + timedelta(days=30)
+        )
+
+        partner_model = self.env.ref("base.model_res_partner")
+        enabled = self.env["mcp.enabled.model"].search(
+            [("model_id", "=", partner_model.id)]
+        )
+        values = {
+            "allow_read": True,
+            "allow_create": True,
+            "allow_write": False,
+            "allow_unlink": False,
+        }
+        if enabled:
+            enabled.write(values)
+        else:
+            self.env["mcp.enabled.model"].create(
+                dict(values, model_id=partner_model.id)
+            )
+        utils.clear_mcp_caches()
+
+    def _call(self, model, method, args=None, kwargs=None, item_id=1, key=None):
+        return {
+            "jsonrpc": "2.0",
+            "id": item_id,
+            "method": "execute_kw",
+            "params": [
+                self.env.cr.dbname,
+                self.test_user.id,
+                key or self.api_key,
+                model,
+                method,
+                args or [],
+                kwargs or {},
+            ],
+        }
+
+    def _post(self, payload, query=""):
+        return self.url_open(
+            f"/mcp/jsonrpc/object{query}",
+            data=json.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        )
+
+    def test_single_call(self):
+        """A single request object gets a single response object."""
+        response = self._post(self._call("res.partner", "search_count", [[]]))
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["id"], 1)
+        self.assertIsInstance(body["result"], int)
+
+    def test_batch_results_in_order(self):
+        """Per-item results and errors come back in request order."""
+        partner = self.env["res.partner"].create({"name": "Batch Partner"})
+        response = self._post(
+            [
+                self._call(
+                    "res.partner", "read", [[partner.id], ["name"]], item_id="a"
+                ),
+                {"jsonrpc": "2.0", "id": "b", "method": "execute"},
+                self._call("res.users", "search", [[]], item_id="c"),
+                self._call("res.partner", "search_count", [[]], item_id="d"),
+            ],
+            "?savepoints=1",
+        )
+
+        body = response.json()
+        self.assertEqual([item["id"] for item in body], ["a", "b", "c", "d"])
+        self.assertEqual(body[0]["result"][0]["name"], "Batch Partner")
+        self.assertEqual(
+            body[1]["error"]["code"], JSONRPC_ERROR_CODES["method_not_found"]
+        )
+        self.assertEqual(body[2]["error"]["code"], 403)
+        self.assertIn("result", body[3])
+
+    def test_atomic_batch_rolls_back(self):
+        """Without savepoints one failing call rolls back the whole batch."""
+        response = self._post(
+            [
+                self._call(
+                    "res.partner", "create", [{"name": "Atomic One"}], item_id=1
+                ),
+                self._call("res.partner", "write", [[1], {"name": "x"}], item_id=2),
+                self._call("res.partner", "search_count", [[]], item_id=3),
+            ]
+        )
+
+        body = response.json()
+        self.assertEqual(body[0]["error"]["code"], JSONRPC_ERROR_CODES["not_executed"])
+        self.assertIn("Rolled back", body[0]["error"]["message"])
+        self.assertEqual(body[1]["error"]["code"], 403)
+        self.assertIn("Not executed", body[2]["error"]["message"])
+        self.assertFalse(
+            self.env["res.partner"].search([("name", "=", "Atomic One")])
+        )
+
+    def test_savepoint_batch_keeps_successful_calls(self):
+        """With savepoints only the failing call is rolled back."""
+        response = self._post(
+            [
+                self._call("res.partner", "create", [{"name": "Kept One"}], item_id=1),
+                self._call("res.partner", "create", [{"name": False}], item_id=2),
+                self._call("res.partner", "create", [{"name": "Kept Two"}], item_id=3),
+            ],
+            "?savepoints=1",
+        )
+
+        body = response.json()
+        self.assertIn("result", body[0])
+        self.assertIn("error", body[1])
+        self.assertIn("result", body[2])
+        self.assertEqual(
+            len(self.env["res.partner"].search([("name", "like", "Kept ")])), 2
+        )
+
+    def test_rate_limit_counts_each_item(self):
+        """Every call of a batch counts; calls over the limit are rejected."""
+        params = self.env["ir.config_parameter"].sudo()
+        params.set_param("mcp_server.enable_rate_limiting", "True")
+        params.set_param("mcp_server.request_limit", "10")
+
+        response = self._post(
+            [
+                self._call("res.partner", "search_count", [[]], item_id=i)
+                for i in range(12)
+            ],
+            "?savepoints=1",
+        )
+
+        body = response.json()
+        self.assertTrue(all("result" in item for item in body[:10]))
+        self.assertEqual([item["error"]["code"] for item in body[10:]], [429, 429])
+        self.assertEqual(response.headers.get("X-RateLimit-Remaining"), "0")
+
+    def test_bad_credentials(self):
+        """A batch with wrong credentials is rejected as a whole."""
+        response = self._post(
+            [
+                self._call("res.partner", "search_count", [[]], item_id=i, key="x" * 40)
+                for i in range(2)
+            ]
+        )
+
+        body = response.json()
+        self.assertEqual([item["error"]["code"] for item in body], [401, 401])
+
+    def test_notifications_and_limits(self):
+        """Notifications get no response; empty or oversized batches fail."""
+        notification = self._call("res.partner", "search_count", [[]])
+        del notification["id"]
+        self.assertEqual(self._post([notification]).status_code, 204)
+
+        body = self._post([]).json()
+        self.assertEqual(body["error"]["code"], JSONRPC_ERROR_CODES["invalid_request"])
+
+        oversized = [self._call("res.partner", "search_count", [[]])] * (
+            MAX_BATCH_SIZE + 1
+        )
+        body = self._post(oversized).json()
+        self.assertEqual(body["error"]["code"], JSONRPC_ERROR_CODES["invalid_request"])
+
+        response = self.url_open("/mcp/jsonrpc/object", data="{not json")
+        self.assertEqual(
+            response.json()["error"]["code"], JSONRPC_ERROR_CODES["parse_error"]
+        )
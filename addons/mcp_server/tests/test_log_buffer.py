@@ -0,0 +1,112 @@
+"""Tests for the buffered mcp.log writer."""
+
+from unittest.mock import patch
+
+from odoo.tests import common, tagged
+
+from ..models import mcp_log
+from ..models.mcp_log_buffer import MCPLogBuffer
+from .test_helpers import create_test_user
+
+
+@tagged("much_unit", "post_install", "-at_install")
+class TestMCPLogBuffer(common.TransactionCase):
+    """Test batching, overload dropping, sampling and truncation"""
+
+    def setUp(self):
+        super().setUp()
+        self.MCPLog = self.env["mcp.log"].with_context(test_mcp_logging=True)
+        self.params = self.env["ir.config_parameter"].sudo()
+        self.params.set_param("mcp_server.enable_logging", "True")
+        self.test_user = create_test_user(
+            self.env, "Log Buffer User", "log_buffer_user", email="buf@example.com"
+        )
+        self.buffer = MCPLogBuffer(max_size=5, batch_size=2, autostart=False)
+        patcher = patch.object(mcp_log, "log_buffer", self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _buffered_logs(self):
+        self.env.invalidate_all()
+        return self.env["mcp.log"].search([("endpoint", "=", "/mcp/buffered")])
+
+    def test_flush_writes_batches(self):
+        """Queued entries are written in batches on the writer cursor."""
+        for i in range(5):
+            self.MCPLog._buffer_log(
+                {
+                    "event_type": "model_access",
+                    "user_id": self.test_user.id,
+                    "endpoint": "/mcp/buffered",
+                    "model_name": "res.partner",
+                    "operation": f"read_{i}",
+                    "request_data": {"id": i},
+                    "response_data": None,
+                    "error_message": None,
+                    "user_agent": "100% client",
+                }
+            )
+        self.assertEqual(len(self.buffer), 5)
+        self.assertFalse(self._buffered_logs())
+
+        self.assertEqual(self.buffer.flush(), 5)
+
+        self.assertEqual(len(self.buffer), 0)
+        logs = self._buffered_logs()
+        self.assertEqual(len(logs), 5)
+        self.assertEqual(logs.user_id, self.test_user)
+        self.assertEqual(logs[0].user_agent, "100% client")
+        self.assertIn("'id'", logs[0].request_data)
+        self.assertTrue(all(log.create_date for log in logs))
+
+    def test_overload_drops_entries(self):
+        """A full buffer drops new entries instead of raising."""
+        values = {"event_type": "error", "endpoint": "/mcp/buffered"}
+        results = [self.buffer.push(self.env.cr.dbname, values) for _ in range(8)]
+
+        self.assertEqual(results, [True] * 5 + [False] * 3)
+        self.assertEqual(self.buffer.dropped, 3)
+        self.assertEqual(len(self.buffer), 5)
+
+    def test_write_failure_drops_batch(self):
+        """A failing flush loses the batch but leaves the buffer usable."""
+        self.buffer.push(self.env.cr.dbname, {"event_type": "error"})
+        with patch.object(
+            MCPLogBuffer, "_write", side_effect=Exception("Database error")
+        ):
+            self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.dropped, 1)
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_log_event_buffers_outside_tests(self):
+        """log_event queues the entry instead of creating it when async."""
+        with patch.object(self.env.registry, "test_cr", None):
+            log = self.MCPLog.log_event("auth_failure", endpoint="/mcp/buffered")
+        self.assertFalse(log)
+        self.assertEqual(len(self.buffer), 1)
+
+        self.params.set_param("mcp_server.log_async", "False")
+        with patch.object(self.env.registry, "test_cr", None):
+            log = self.MCPLog.log_event("auth_failure", endpoint="/mcp/buffered")
+        self.assertTrue(log)
+        self.assertEqual(len(self.buffer), 1)
+
+    def test_sampling_skips_routine_events_only(self):
+        """The sample rate applies to successes, never to failures."""
+        self.params.set_param("mcp_server.log_sample_rate", "0")
+
+        self.assertFalse(self.MCPLog.log_event("model_access"))
+        self.assertFalse(self.MCPLog.log_event("auth_success"))
+        self.assertTrue(self.MCPLog.log_event("error", error_message="boom"))
+        self.assertTrue(self.MCPLog.log_event("permission_denied"))
+
+        self.params.set_param("mcp_server.log_sample_rate", "1")
+        self.assertTrue(self.MCPLog.log_event("model_access"))
+
+    def test_configurable_truncation(self):
+        """Payloads are cut at mcp_server.log_max_payload characters."""
+        self.params.set_param("mcp_server.log_max_payload", "100")
+
+        log = self.MCPLog.log_event("error", request_data="x" * 500)
+
+        self.assertEqual(log.request_data, "x" * 100 + "... [truncated]")
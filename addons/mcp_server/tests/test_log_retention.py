@@ -0,0 +1,142 @@
+"""Tests for partitioned MCP log retention and the daily rollup."""
+
+from datetime import datetime, timedelta
+
+from odoo import fields
+from odoo.tests import common, tagged
+
+from ..models.mcp_log import DEFAULT_PARTITION, PARTITION_PREFIX
+
+
+@tagged("much_unit", "post_install", "-at_install")
+class TestMCPLogRetention(common.TransactionCase):
+    """Test partition upkeep, retention and get_summary"""
+
+    def setUp(self):
+        super().setUp()
+        self.MCPLog = self.env["mcp.log"]
+        self.Daily = self.env["mcp.log.daily"]
+        self.today = fields.Datetime.now().date()
+
+    def _partition_of(self, log):
+        self.env.cr.execute(
+            "SELECT tableoid::regclass::text FROM mcp_log WHERE id = %s", [log.id]
+        )
+        return self.env.cr.fetchone()[0]
+
+    def _create_partition(self, day):
+        name = f"{PARTITION_PREFIX}{day:%Y%m%d}"
+        self.env.cr.execute(
+            f"CREATE TABLE {name} PARTITION OF mcp_log FOR VALUES FROM (%s) TO (%s)",
+            (day, day + timedelta(days=1)),
+        )
+        return name
+
+    def test_table_is_partitioned(self):
+        """Today's entries go to today's daily partition."""
+        self.assertTrue(self.MCPLog._is_partitioned())
+        days = self.MCPLog._partition_days()
+        self.assertIn(self.today, days)
+        self.assertIn(self.today + timedelta(days=7), days)
+
+        log = self.MCPLog.create({"event_type": "auth_success"})
+
+        self.assertEqual(
+            self._partition_of(log), f"{PARTITION_PREFIX}{self.today:%Y%m%d}"
+        )
+
+    def test_cleanup_drops_expired_partitions(self):
+        """Expired daily partitions are dropped, not deleted row by row."""
+        old_day = self.today - timedelta(days=40)
+        name = self._create_partition(old_day)
+        old_logs = self.MCPLog.create(
+            [
+                {
+                    "event_type": "model_access",
+                    "model_name": "res.partner",
+                    "duration_ms": 10 * (i + 1),
+                    "create_date": datetime.combine(old_day, datetime.min.time()),
+                }
+                for i in range(3)
+            ]
+        )
+        default_log = self.MCPLog.create(
+            {
+                "event_type": "error",
+                "create_date": datetime.now() - timedelta(days=60),
+            }
+        )
+        self.assertEqual(self._partition_of(default_log), DEFAULT_PARTITION)
+        recent_log = self.MCPLog.create({"event_type": "auth_success"})
+
+        deleted = self.MCPLog.cleanup_old_logs(days=30)
+
+        self.assertEqual(deleted, 4)
+        self.assertNotIn(old_day, self.MCPLog._partition_days())
+        self.env.cr.execute("SELECT to_regclass(%s)", [name])
+        self.assertIsNone(self.env.cr.fetchone()[0])
+        self.assertFalse(old_logs.exists())
+        self.assertFalse(default_log.exists())
+        self.assertTrue(recent_log.exists())
+
+        rollup = self.Daily.search([("day", "=", old_day)])
+        self.assertEqual(rollup.hits, 3)
+        self.assertEqual(rollup.model_name, "res.partner")
+        self.assertEqual(rollup.duration_ms_total, 60)
+        self.assertEqual(rollup.duration_ms_max, 30)
+
+    def test_chunked_delete(self):
+        """The fallback delete works through the rows a chunk at a time."""
+        old = datetime.now() - timedelta(days=90)
+        self.MCPLog.create([{"event_type": "error", "create_date": old}] * 5)
+        self.MCPLog.flush_model()
+
+        deleted = self.MCPLog._delete_in_chunks(
+            DEFAULT_PARTITION, old + timedelta(seconds=1), chunk_size=2
+        )
+
+        self.assertEqual(deleted, 5)
+
+    def test_rollup_runs_once_per_day(self):
+        """Rolled-up days are not aggregated twice."""
+        yesterday = datetime.now() - timedelta(days=1)
+        self.MCPLog.create({"event_type": "auth_failure", "create_date": yesterday})
+
+        self.Daily._rollup()
+        self.Daily._rollup()
+
+        rollup = self.Daily.search(
+            [("day", "=", yesterday.date()), ("event_type", "=", "auth_failure")]
+        )
+        self.assertEqual(rollup.hits, 1)
+
+    def test_get_summary_combines_rollup_and_today(self):
+        """get_summary reads past days from the rollup and today from the log."""
+        yesterday = datetime.now() - timedelta(days=1)
+        self.MCPLog.create(
+            [
+                {
+                    "event_type": "model_access",
+                    "model_name": "res.partner",
+                    "duration_ms": 20,
+                    "create_date": yesterday,
+                },
+                {"event_type": "error", "create_date": yesterday},
+            ]
+        )
+        self.Daily._rollup()
+        before = self.Daily.get_summary(days=2)
+        self.MCPLog.create(
+            {
+                "event_type": "model_access",
+                "model_name": "res.partner",
+                "duration_ms": 40,
+            }
+        )
+
+        summary = self.Daily.get_summary(days=2)
+
+        self.assertEqual(summary["total"] - before["total"], 1)
+        self.assertGreaterEqual(summary["by_model"]["res.partner"], 2)
+        self.assertGreaterEqual(summary["errors"], 1)
+        self.assertGreater(summary["avg_duration_ms"], 0)
@@ -1,6 +1,10 @@
-from datetime import datetime, timedelta, timezone
+import multiprocessing
+import uuid
 from unittest.mock import MagicMock, patch
 
+import psycopg2
+
+from odoo.sql_db import connection_info_for
 from odoo.tests import common, tagged
 from odoo.tools import mute_logger
 
@@ -14,8 +18,9 @@ class TestRateLimiting(common.TransactionCase):
 
     def setUp(self):
         super().setUp()
-        # Clear the rate limiting cache before each test
-        rate_limiting._api_request_cache.clear()
+        # Counters are written on a separate cursor; keep them in the test txn
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
 
         # Create test user
         self.test_user = create_test_user(
@@ -107,139 +112,87 @@ class TestRateLimiting(common.TransactionCase):
                 limit, rate_limiting.DEFAULT_REQUEST_LIMIT
             )  # Should fallback to 300
 
-    def test_record_api_request(self):
-        """Test recording API requests"""
-        user_id = self.test_user.id
-
-        # Record a request
-        rate_limiting.record_api_request(user_id)
-
-        # Check that request was recorded
-        self.assertIn(user_id, rate_limiting._api_request_cache)
-        self.assertEqual(len(rate_limiting._api_request_cache[user_id]), 1)
-
-    def test_record_api_request_multiple(self):
-        """Test recording multiple API requests"""
-        user_id = self.test_user.id
-
-        # Record multiple requests
-        for _ in range(3):
-            rate_limiting.record_api_request(user_id)
-
-        # Check that all requests were recorded
-        self.assertEqual(len(rate_limiting._api_request_cache[user_id]), 3)
-
-    def test_record_api_request_cleanup_old(self):
-        """Test cleanup of old timestamps"""
-        user_id = self.test_user.id
-
-        # Add an old timestamp manually
-        old_time = datetime.now(timezone.utc) - timedelta(minutes=2)
-        rate_limiting._api_request_cache[user_id] = [old_time]
-
-        # Record a new request (should clean up old one)
-        rate_limiting.record_api_request(user_id)
-
-        # Should only have the new request
-        self.assertEqual(len(rate_limiting._api_request_cache[user_id]), 1)
-
-    def test_check_rate_limit_no_requests(self):
-        """Test rate limit check with no previous requests"""
-        user_id = self.test_user.id
-
-        mock_request = MagicMock()
-        mock_request.env = self.env
-
-        with patch(
-            "odoo.addons.mcp_server.controllers.rate_limiting.request", mock_request
-        ):
-            result = rate_limiting.check_rate_limit(user_id)
-            self.assertTrue(result)  # Should be within limit
-
-    def test_check_rate_limit_within_limit(self):
-        """Test rate limit check within limit"""
-        user_id = self.test_user.id
-
-        # Record a few requests (well under limit)
-        for _ in range(5):
-            rate_limiting.record_api_request(user_id)
-
+    def _hit(self, user_id, times=1):
+        """Count `times` requests for `user_id`; return the last outcome."""
         mock_request = MagicMock()
         mock_request.env = self.env
-
         with patch(
             "odoo.addons.mcp_server.controllers.rate_limiting.request", mock_request
         ):
-            result = rate_limiting.check_rate_limit(user_id)
-            self.assertTrue(result)  # Should be within limit
-
-    def test_check_rate_limit_exceeded(self):
-        """Test rate limit check when limit is exceeded"""
-        user_id = self.test_user.id
-
-        # Set a limit just above minimum (10) for testing
-        self.env["ir.config_parameter"].sudo().set_param(
-            "mcp_server.request_limit", "12"
+            for _ in range(times):
+                result = rate_limiting.hit_rate_limit(user_id)
+        return result
+
+    def test_hit_records_request(self):
+        """Test that a hit is stored in the shared counter table"""
+        result = self._hit(self.test_user.id)
+        self.assertTrue(result.allowed)
+        self.assertEqual(result.remaining, 299)
+
+        counter = self.env["mcp.rate.limit"].search(
+            [("bucket", "=", f"user:{self.test_user.id}")]
         )
+        self.assertEqual(counter.hits, 1)
+
+    def test_hit_multiple(self):
+        """Test counting multiple requests in the same window"""
+        result = self._hit(self.test_user.id, times=3)
+        self.assertEqual(result.remaining, 297)
+
+    def test_hit_new_window_resets(self):
+        """Test that a request in a new window starts counting from one"""
+        self._hit(self.test_user.id, times=5)
+        self.env.cr.execute(
+            "UPDATE mcp_rate_limit SET window_start = window_start - interval "
+            "'2 minutes' WHERE bucket = %s",
+            (f"user:{self.test_user.id}",),
+        )
+        result = self._hit(self.test_user.id)
+        self.assertEqual(result.remaining, 299)
 
-        mock_request = MagicMock()
-        mock_request.env = self.env
-
-        with patch(
-            "odoo.addons.mcp_server.controllers.rate_limiting.request", mock_request
-        ):
-            # Record requests exceeding the limit of 12
-            for _ in range(13):  # More than the limit of 12
-                rate_limiting.record_api_request(user_id)
-
-            result = rate_limiting.check_rate_limit(user_id)
-            self.assertFalse(result)  # Should exceed limit
-
-    def test_check_rate_limit_old_requests_ignored(self):
-        """Test that old requests don't count towards limit"""
-        user_id = self.test_user.id
-
-        # Set a limit above minimum (10) for testing
+    def test_hit_exceeded(self):
+        """Test rate limit outcome when limit is exceeded"""
         self.env["ir.config_parameter"].sudo().set_param(
             "mcp_server.request_limit", "12"
         )
+        self.assertTrue(self._hit(self.test_user.id, times=12).allowed)
+
+        result = self._hit(self.test_user.id)
+        self.assertFalse(result.allowed)
+        self.assertEqual(result.remaining, 0)
+        self.assertGreaterEqual(result.retry_after, 1)
+        self.assertLessEqual(
+            result.retry_after, rate_limiting.RATE_LIMIT_WINDOW_SECONDS
+        )
+        headers = rate_limiting.rate_limit_headers(result)
+        self.assertEqual(headers["Retry-After"], str(result.retry_after))
+        self.assertEqual(headers["X-RateLimit-Limit"], "12")
 
-        # Add old timestamps that should be ignored
-        old_time = datetime.now(timezone.utc) - timedelta(minutes=2)
-        rate_limiting._api_request_cache[user_id] = [
-            old_time
-        ] * 15  # More than limit but old
-
-        mock_request = MagicMock()
-        mock_request.env = self.env
-
-        with patch(
-            "odoo.addons.mcp_server.controllers.rate_limiting.request", mock_request
-        ):
-            result = rate_limiting.check_rate_limit(user_id)
-            self.assertTrue(result)  # Should be within limit (old requests ignored)
-
-    def test_check_rate_limit_unlimited(self):
+    def test_hit_unlimited(self):
         """Test rate limit check with unlimited setting (0)"""
-        user_id = self.test_user.id
-
-        # Set unlimited (0)
         self.env["ir.config_parameter"].sudo().set_param(
             "mcp_server.request_limit", "0"
         )
+        self.assertTrue(self._hit(self.test_user.id, times=50).allowed)
+        self.assertFalse(
+            self.env["mcp.rate.limit"].search(
+                [("bucket", "=", f"user:{self.test_user.id}")]
+            )
+        )
+        self.assertEqual(
+            rate_limiting.rate_limit_headers(self._hit(self.test_user.id)), {}
+        )
 
-        mock_request = MagicMock()
-        mock_request.env = self.env
-
-        with patch(
-            "odoo.addons.mcp_server.controllers.rate_limiting.request", mock_request
-        ):
-            # Record many requests
-            for _ in range(1000):  # Way more than any reasonable limit
-                rate_limiting.record_api_request(user_id)
-
-            result = rate_limiting.check_rate_limit(user_id)
-            self.assertTrue(result)  # Should always pass with unlimited
+    def test_buckets_are_per_user(self):
+        """Test that one user's traffic does not count against another's"""
+        other = create_test_user(
+            self.env,
+            "Rate Limit Other User",
+            "rate_limit_other_user",
+            email="rate_limit_other@example.com",
+        )
+        self._hit(self.test_user.id, times=10)
+        self.assertEqual(self._hit(other.id).remaining, 299)
 
     def test_rate_limit_decorator_enabled_within_limit(self):
         """Test rate limit decorator when enabled and within limit"""
@@ -302,9 +255,9 @@ class TestRateLimiting(common.TransactionCase):
                 "odoo.addons.mcp_server.controllers.response_utils.error_response",
                 return_value=mock_error_response,
             ):
-                # Fill the cache to exceed limit of 11
-                for _ in range(12):
-                    rate_limiting.record_api_request(self.test_user.id)
+                # Use up the limit of 11
+                for _ in range(11):
+                    rate_limiting.hit_rate_limit(self.test_user.id)
 
                 result = test_endpoint(user=self.test_user)
                 self.assertEqual(result, mock_error_response)
@@ -325,10 +278,12 @@ class TestRateLimiting(common.TransactionCase):
             result = test_endpoint()  # No user provided
             self.assertEqual(result["success"], True)
 
-            # Check that anonymous request was recorded
-            self.assertIn(
-                -1, rate_limiting._api_request_cache
-            )  # Anonymous user ID is -1
+        # Check that anonymous request was recorded
+        self.assertTrue(
+            self.env["mcp.rate.limit"].search(
+                [("bucket", "=", f"user:{rate_limiting.ANONYMOUS_ID}")]
+            )
+        )
 
     def test_rate_limit_decorator_anonymous_exceeded(self):
         """Test rate limit decorator for anonymous user when limit exceeded"""
@@ -354,31 +309,92 @@ class TestRateLimiting(common.TransactionCase):
                 "odoo.addons.mcp_server.controllers.response_utils.error_response",
                 return_value=mock_error_response,
             ):
-                # Fill anonymous cache to exceed limit of 11
-                for _ in range(12):
-                    rate_limiting.record_api_request(-1)  # Anonymous user ID
+                # Use up the anonymous limit of 11
+                for _ in range(11):
+                    rate_limiting.hit_rate_limit(rate_limiting.ANONYMOUS_ID)
 
                 result = test_endpoint()
                 self.assertEqual(result, mock_error_response)
 
-    def test_cache_persistence_across_calls(self):
-        """Test that cache persists across multiple function calls"""
-        user_id = self.test_user.id
-
-        # Record requests in separate calls
-        rate_limiting.record_api_request(user_id)
-        rate_limiting.record_api_request(user_id)
+    def test_rate_limit_decorator_sets_retry_after(self):
+        """Test that a 429 from the decorator carries Retry-After"""
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mcp_server.request_limit", "10"
+        )
 
-        # Cache should contain both requests
-        self.assertEqual(len(rate_limiting._api_request_cache[user_id]), 2)
+        @rate_limiting.rate_limit
+        def test_endpoint(user=None):
+            return {"success": True}
 
-        # Check rate limit should see both requests
         mock_request = MagicMock()
         mock_request.env = self.env
+        mock_response = MagicMock()
+        mock_response.headers = {}
 
         with patch(
             "odoo.addons.mcp_server.controllers.rate_limiting.request", mock_request
         ):
-            # Should still be within default limit of 300
-            result = rate_limiting.check_rate_limit(user_id)
-            self.assertTrue(result)
+            with patch(
+                "odoo.addons.mcp_server.controllers.response_utils.error_response",
+                return_value=mock_response,
+            ):
+                for _ in range(10):
+                    test_endpoint(user=self.test_user)
+                result = test_endpoint(user=self.test_user)
+
+        self.assertIs(result, mock_response)
+        self.assertIn("Retry-After", mock_response.headers)
+        self.assertEqual(mock_response.headers["X-RateLimit-Remaining"], "0")
+
+
+def _hammer_bucket(dbname, bucket, limit, attempts, results):
+    """Child process: count `attempts` requests on a private connection."""
+    _dsn, connection_info = connection_info_for(dbname)
+    conn = psycopg2.connect(**connection_info)
+    conn.set_session(isolation_level="READ COMMITTED")
+    try:
+        allowed = 0
+        for _ in range(attempts):
+            with conn.cursor() as cr:
+                allowed += rate_limiting.consume_request(cr, bucket, limit).allowed
+            conn.commit()
+        results.put(allowed)
+    finally:
+        conn.close()
+
+
+@tagged("much_unit", "post_install", "-at_install")
+class TestRateLimitingMultiProcess(common.BaseCase):
+    """The limit must hold across processes, as with prefork workers."""
+
+    def test_limit_shared_across_processes(self):
+        dbname = common.get_db_name()
+        bucket = f"test:{uuid.uuid4().hex}"
+        limit, processes, attempts = 40, 4, 25
+        ctx = multiprocessing.get_context("fork")
+        results = ctx.Queue()
+        workers = [
+            ctx.Process(
+                target=_hammer_bucket,
+                args=(dbname, bucket, limit, attempts, results),
+            )
+            for _ in range(processes)
+        ]
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join(60)
+            allowed = sum(results.get(timeout=5) for _ in workers)
+        finally:
+            _dsn, connection_info = connection_info_for(dbname)
+            conn = psycopg2.connect(**connection_info)
+            with conn, conn.cursor() as cr:
+                cr.execute("DELETE FROM mcp_rate_limit WHERE bucket = %s", (bucket,))
+            conn.close()
+
+        # 100 requests raced for 40 slots. A per-process limit would have let
+        # all 100 through; if the window rolled over mid-test, at most one
+        # more window's worth may.
+        self.assertGreaterEqual(allowed, limit)
+        self.assertLessEqual(allowed, 2 * limit)
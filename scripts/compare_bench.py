@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Compare two replay benchmark results (COMM_BENCH_OUTPUT files).
+# Run:  python3 scripts/compare_bench.py baseline.json candidate.json [--tolerance 0.1]
+# Exits 1 when throughput or p95 latency regress by more than the tolerance,
+# or when any scenario runs more queries per message than before.
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare two replay benchmark results.')
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='allowed relative slowdown (default 0.1 = 10%%)')
+    args = parser.parse_args()
+
+    base, cand = load(args.baseline), load(args.candidate)
+    print('%-22s %12s %12s %10s %10s %8s %8s' % (
+        'scenario', 'msg/s base', 'msg/s new', 'p95 base', 'p95 new',
+        'q/msg', 'q/msg'))
+    regressions = []
+    for name, new in sorted(cand['scenarios'].items()):
+        old = base['scenarios'].get(name)
+        if not old:
+            print('%-22s (new scenario)' % name)
+            continue
+        print('%-22s %12.2f %12.2f %10.2f %10.2f %8.2f %8.2f' % (
+            name, old['messages_per_second'], new['messages_per_second'],
+            old['latency_ms']['p95'], new['latency_ms']['p95'],
+            old['queries_per_message'], new['queries_per_message']))
+        if new['messages_per_second'] < old['messages_per_second'] * (1 - args.tolerance):
+            regressions.append('%s: throughput down' % name)
+        if new['latency_ms']['p95'] > old['latency_ms']['p95'] * (1 + args.tolerance):
+            regressions.append('%s: p95 latency up' % name)
+        if new['queries_per_message'] > old['queries_per_message']:
+            regressions.append('%s: more queries per message' % name)
+
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Origination latency harness for the ARI bridge dispatcher.
+
+Runs bridge.dispatch_calls() against two in-process fakes — an Odoo JSON-RPC
+endpoint whose dialer_wait_pending long-poll wakes as soon as a call is
+queued (like the pacer's NOTIFY), and an ARI that answers POST /channels
+after ``--ari-delay`` — then queues calls at ``--rate`` per second and
+reports the time from queueing to the ARI originate request::
+
+    python bench_dispatch.py --calls 200 --rate 50 --ari-delay 0.05
+
+No Asterisk or Odoo needed. Prints a JSON summary; exits 1 when some calls
+were never originated.
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+import bridge
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class FakeOdoo:
+    """Just enough of /jsonrpc for the dispatcher."""
+
+    def __init__(self):
+        self.pending = {}      # call id -> dialer_wait_pending row
+        self.queued_at = {}    # call id -> perf_counter()
+        self.rpc_calls = 0
+        self.changed = asyncio.Event()
+
+    def queue(self, call_id):
+        self.pending[call_id] = {
+            'id': call_id, 'to_number': '2760%07d' % call_id,
+            'dialer_contact_id': [call_id, 'Contact'], 'dialer_agent_session_id': False,
+            'agent_sip_ext': False, 'dialer_campaign_id': [1, 'Bench'],
+        }
+        self.queued_at[call_id] = time.perf_counter()
+        self.changed.set()
+
+    async def wait_pending(self, exclude_ids=(), timeout=25, limit=20):
+        deadline = time.monotonic() + timeout
+        while True:
+            calls = [c for i, c in self.pending.items() if i not in exclude_ids][:limit]
+            remaining = deadline - time.monotonic()
+            if calls or remaining <= 0:
+                return calls
+            self.changed.clear()
+            try:
+                await asyncio.wait_for(self.changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return []
+
+    async def handle(self, request):
+        body = await request.json()
+        self.rpc_calls += 1
+        params = body['params']
+        result = True
+        if params['service'] == 'common':
+            result = 1
+        else:
+            model, method, args, kw = params['args'][3:7]
+            if method == 'dialer_wait_pending':
+                result = await self.wait_pending(**kw)
+            elif model == 'comm.voip.call' and method == 'write':
+                for call_id in args[0]:
+                    self.pending.pop(call_id, None)
+        return web.json_response({'jsonrpc': '2.0', 'id': body['id'], 'result': result})
+
+
+class FakeAri:
+    def __init__(self, delay):
+        self.delay = delay
+        self.originated = {}   # call id -> perf_counter() when originate arrived
+
+    async def channels(self, request):
+        payload = await request.json()
+        call_id = int(payload['variables']['CALL_ID'])
+        self.originated[call_id] = time.perf_counter()
+        await asyncio.sleep(self.delay)
+        return web.json_response({'id': 'chan-%d' % call_id})
+
+
+async def serve(routes):
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f'http://127.0.0.1:{port}'
+
+
+async def run(args):
+    fake_odoo, fake_ari = FakeOdoo(), FakeAri(args.ari_delay)
+    odoo_runner, odoo_url = await serve([web.post('/jsonrpc', fake_odoo.handle)])
+    ari_runner, ari_url = await serve([web.post('/ari/channels', fake_ari.channels)])
+    connector = aiohttp.TCPConnector(limit=bridge.ODOO_POOL)
+    async with aiohttp.ClientSession(connector=connector) as odoo_s, \
+            aiohttp.ClientSession() as ari_s:
+        odoo = bridge.Odoo(odoo_s, url=odoo_url)
+        await odoo.login()
+        dispatcher = asyncio.create_task(
+            bridge.dispatch_calls(odoo, bridge.Ari(ari_s, url=ari_url)))
+        start = time.perf_counter()
+        for call_id in range(1, args.calls + 1):
+            fake_odoo.queue(call_id)
+            await asyncio.sleep(1.0 / args.rate)
+        deadline = time.monotonic() + args.timeout
+        while len(fake_ari.originated) < args.calls and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        # Let the last originations write their channel back before closing.
+        while fake_odoo.pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        dispatcher.cancel()
+    await odoo_runner.cleanup()
+    await ari_runner.cleanup()
+
+    latencies = sorted(fake_ari.originated[i] - fake_odoo.queued_at[i]
+                       for i in fake_ari.originated)
+    return {
+        'calls': args.calls,
+        'originated': len(latencies),
+        'seconds': round(elapsed, 3),
+        'odoo_rpc_calls': fake_odoo.rpc_calls,
+        'latency_ms': {
+            name: round(percentile(latencies, pct) * 1000, 2)
+            for name, pct in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100))
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure queue-to-originate latency '
+                                                 'of the ARI bridge dispatcher.')
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--rate', type=float, default=50.0, help='calls queued per second')
+    parser.add_argument('--ari-delay', type=float, default=0.05,
+                        help='seconds the fake ARI takes per originate')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    args = parser.parse_args()
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2, sort_keys=True))
+    return 0 if report['originated'] == report['calls'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,7 +4,9 @@
 The Odoo pacer (comm.dialer.campaign._pace_once) creates queued comm.voip.call
 rows for Asterisk accounts. This service:
 
-  1. polls Odoo for those queued rows and ORIGINATES the customer leg via ARI,
+  1. long-polls Odoo for those queued rows (comm.voip.call.dialer_wait_pending,
+     woken by the pacer's NOTIFY on commit) and ORIGINATES the customer leg via
+     ARI, each call in its own task,
   2. on answer, reads AMD and — if HUMAN and an agent is Ready — BRIDGES the
      call to that agent's WebRTC endpoint (else plays a message and drops it =
      an "abandoned" call, the predictive trade-off the governor bounds),
@@ -17,11 +19,11 @@ depend on your dialplan/AMD tuning and how you map agents → SIP endpoints.
 """
 import asyncio
 import datetime
+import functools
+import itertools
 import json
 import logging
 import os
-import threading
-import xmlrpc.client
 
 import aiohttp
 
@@ -39,83 +41,97 @@ CALLER_ID = os.environ.get('VOX_DID', '')
 # Test (no trunk): Local/600@from-agents — a local echo/demo that answers with
 # audio, so the whole pacer→bridge→agent flow can be proven without the PSTN.
 DIAL_ENDPOINT = os.environ.get('DIAL_ENDPOINT', 'PJSIP/{to}@' + TRUNK)
-POLL_INTERVAL = float(os.environ.get('POLL_INTERVAL', '2'))
+# Longest Odoo holds a dispatch long-poll open when nothing is queued (s), and
+# the pause before polling again after an error.
+DISPATCH_WAIT = float(os.environ.get('DISPATCH_WAIT', '25'))
+RETRY_DELAY = float(os.environ.get('RETRY_DELAY', '2'))
 
 ODOO_URL = os.environ.get('ODOO_URL', 'http://odoo:8069')
 ODOO_DB = os.environ.get('ODOO_DB', 'odoo')
 ODOO_USER = os.environ.get('ODOO_USER', 'dialer@bot')
 ODOO_PASS = os.environ.get('ODOO_PASSWORD', '')
+# Keep-alive connections to Odoo: one is held by the dispatch long-poll, the
+# rest serve event handlers and originations concurrently.
+ODOO_POOL = int(os.environ.get('ODOO_POOL', '8'))
+
+
+# ── Odoo (JSON-RPC) ─────────────────────────────────────────────────────────
+class OdooError(Exception):
+    pass
 
 
-# ── Odoo (XML-RPC) ──────────────────────────────────────────────────────────
 class Odoo:
-    """Thin blocking XML-RPC client; calls are run in a thread executor."""
-
-    def __init__(self):
-        # xmlrpc ServerProxy shares one HTTP connection — serialize calls (the
-        # poll loop and ARI event handlers both hit Odoo via the executor).
-        self._lock = threading.Lock()
-        common = xmlrpc.client.ServerProxy(f'{ODOO_URL}/xmlrpc/2/common')
-        self.uid = common.authenticate(ODOO_DB, ODOO_USER, ODOO_PASS, {})
+    """Async JSON-RPC client on a pooled aiohttp session.
+
+    Each call is its own HTTP request on one of ``ODOO_POOL`` keep-alive
+    connections, so the dispatcher's long-poll and the event handlers' writes
+    run side by side instead of queueing behind one another."""
+
+    def __init__(self, session, url=None):
+        self.s = session
+        self.url = f'{url or ODOO_URL}/jsonrpc'
+        self.uid = None
+        self._ids = itertools.count(1)
+
+    async def rpc(self, service, method, *args):
+        payload = {'jsonrpc': '2.0', 'method': 'call', 'id': next(self._ids),
+                   'params': {'service': service, 'method': method, 'args': args}}
+        async with self.s.post(self.url, json=payload) as r:
+            r.raise_for_status()
+            body = await r.json()
+        if body.get('error'):
+            err = body['error']
+            raise OdooError((err.get('data') or {}).get('message') or err.get('message'))
+        return body.get('result')
+
+    async def login(self):
+        self.uid = await self.rpc('common', 'authenticate', ODOO_DB, ODOO_USER, ODOO_PASS, {})
         if not self.uid:
             raise SystemExit('Odoo auth failed — check ODOO_USER / API key')
-        self.models = xmlrpc.client.ServerProxy(f'{ODOO_URL}/xmlrpc/2/object')
-        self._asterisk_accounts = self._call(
-            'comm.voip.account', 'search',
-            [[['provider', '=', 'asterisk'], ['active', '=', True]]])
-        _log.info('Odoo connected (uid=%s), asterisk accounts=%s',
-                  self.uid, self._asterisk_accounts)
-
-    def _call(self, model, method, args, kw=None):
-        with self._lock:
-            return self.models.execute_kw(ODOO_DB, self.uid, ODOO_PASS, model, method, args, kw or {})
-
-    def pending_calls(self, limit=20):
-        """Queued outgoing calls on Asterisk accounts, not yet originated.
-
-        Carries the pre-assigned agent (progressive) as agent_sip_ext +
-        dialer_agent_session_id, and the campaign (for predictive pick-on-answer).
-        """
-        if not self._asterisk_accounts:
-            return []
-        return self._call('comm.voip.call', 'search_read', [[
-            ['state', '=', 'queued'],
-            ['external_id', 'in', [False, '']],
-            ['dialer_contact_id', '!=', False],
-            ['account_id', 'in', self._asterisk_accounts],
-        ]], {'fields': ['id', 'to_number', 'dialer_contact_id',
-                        'dialer_agent_session_id', 'agent_sip_ext',
-                        'dialer_campaign_id'], 'limit': limit})
-
-    def set_call(self, call_id, vals):
-        self._call('comm.voip.call', 'write', [[call_id], vals])
-
-    def ready_agent(self, campaign_id):
+        _log.info('Odoo connected (uid=%s)', self.uid)
+
+    async def _call(self, model, method, args, kw=None):
+        return await self.rpc('object', 'execute_kw', ODOO_DB, self.uid, ODOO_PASS,
+                              model, method, args, kw or {})
+
+    async def wait_pending_calls(self, exclude=(), timeout=None, limit=20):
+        """Queued calls to originate; long-polls until there are some or
+        ``timeout`` passes (see comm.voip.call.dialer_wait_pending)."""
+        return await self._call('comm.voip.call', 'dialer_wait_pending', [], {
+            'exclude_ids': sorted(exclude),
+            'timeout': DISPATCH_WAIT if timeout is None else timeout,
+            'limit': limit,
+        })
+
+    async def set_call(self, call_id, vals):
+        await self._call('comm.voip.call', 'write', [[call_id], vals])
+
+    async def ready_agent(self, campaign_id):
         """Pick one Ready agent (with an endpoint) for the campaign. Returns
         {'session_id', 'ext'} or None. Used by predictive, which binds an agent
         only once a human answers."""
         if not campaign_id:
             return None
-        rows = self._call('comm.dialer.agent.session', 'search_read', [[
+        rows = await self._call('comm.dialer.agent.session', 'search_read', [[
             ['state', '=', 'ready'], ['campaign_id', '=', campaign_id],
             ['sip_ext', 'not in', [False, '']],
         ]], {'fields': ['sip_ext'], 'limit': 1})
         return {'session_id': rows[0]['id'], 'ext': rows[0]['sip_ext']} if rows else None
 
-    def set_agent(self, session_id, vals):
+    async def set_agent(self, session_id, vals):
         if session_id:
-            self._call('comm.dialer.agent.session', 'write', [[session_id], vals])
+            await self._call('comm.dialer.agent.session', 'write', [[session_id], vals])
 
-    def register_result(self, contact_id, outcome):
-        self._call('comm.dialer.contact', 'register_result', [[contact_id], outcome])
+    async def register_result(self, contact_id, outcome):
+        await self._call('comm.dialer.contact', 'register_result', [[contact_id], outcome])
 
 
 # ── ARI (REST + WebSocket) ──────────────────────────────────────────────────
 class Ari:
-    def __init__(self, session):
+    def __init__(self, session, url=None):
         self.s = session
         self.auth = aiohttp.BasicAuth(ARI_USER, ARI_PASS)
-        self.base = f'{ARI_URL}/ari'
+        self.base = f'{url or ARI_URL}/ari'
 
     async def originate(self, endpoint, app_args, caller_id, variables=None):
         params = {
@@ -155,46 +171,65 @@ class Ari:
 LIVE = {}           # customer channel_id -> {call_id, contact_id, campaign_id, bridge_id, session_id, agent_cid}
 AGENT_PENDING = {}  # agent channel_id -> {bridge_id, customer_cid}  (before it joins)
 AGENT_ACTIVE = {}   # agent channel_id -> customer_cid              (bridged)
+FINALIZING = set()  # write-back tasks of finished calls (keeps them referenced)
 
 
 # ── The two loops ───────────────────────────────────────────────────────────
-async def poll_odoo(odoo, ari, loop):
-    """Every tick: turn queued Odoo calls into ARI originations."""
+async def originate_call(odoo, ari, c):
+    """Originate one queued Odoo call via ARI and record the channel."""
+    to = c['to_number']
+    endpoint = DIAL_ENDPOINT.format(to=to)
+    try:
+        ch = await ari.originate(endpoint, 'outbound', CALLER_ID,
+                                 {'CALL_ID': str(c['id'])})
+        sess = c.get('dialer_agent_session_id')
+        camp = c.get('dialer_campaign_id')
+        LIVE[ch['id']] = {
+            'call_id': c['id'],
+            'contact_id': c['dialer_contact_id'][0],
+            'campaign_id': camp[0] if camp else None,
+            # Pre-assigned agent (progressive); empty for predictive.
+            'session_id': sess[0] if sess else None,
+            'pre_ext': c.get('agent_sip_ext') or None,
+        }
+        await odoo.set_call(c['id'], {'external_id': ch['id'], 'state': 'ringing'})
+        _log.info('originated call %s -> %s (%s)', c['id'], to, ch['id'])
+    except Exception:
+        _log.exception('originate failed for call %s', c['id'])
+        await odoo.set_call(c['id'], {'state': 'failed'})
+
+
+async def dispatch_calls(odoo, ari):
+    """Turn queued Odoo calls into ARI originations as soon as they commit.
+
+    Long-polls Odoo (which wakes on the pacer's NOTIFY) and originates every
+    call in its own task, so a slow originate never holds up the next call.
+    Calls still being originated are excluded from the next poll."""
+    inflight = set()
+    tasks = set()
+
+    def done(task, call_id):
+        inflight.discard(call_id)
+        tasks.discard(task)
+
     while True:
         try:
-            pending = await loop.run_in_executor(None, odoo.pending_calls)
-            for c in pending:
-                to = c['to_number']
-                endpoint = DIAL_ENDPOINT.format(to=to)
-                try:
-                    ch = await ari.originate(endpoint, 'outbound', CALLER_ID,
-                                             {'CALL_ID': str(c['id'])})
-                    sess = c.get('dialer_agent_session_id')
-                    camp = c.get('dialer_campaign_id')
-                    LIVE[ch['id']] = {
-                        'call_id': c['id'],
-                        'contact_id': c['dialer_contact_id'][0],
-                        'campaign_id': camp[0] if camp else None,
-                        # Pre-assigned agent (progressive); empty for predictive.
-                        'session_id': sess[0] if sess else None,
-                        'pre_ext': c.get('agent_sip_ext') or None,
-                    }
-                    await loop.run_in_executor(
-                        None, odoo.set_call, c['id'],
-                        {'external_id': ch['id'], 'state': 'ringing'})
-                    _log.info('originated call %s -> %s (%s)', c['id'], to, ch['id'])
-                except Exception:
-                    _log.exception('originate failed for call %s', c['id'])
-                    await loop.run_in_executor(None, odoo.set_call, c['id'], {'state': 'failed'})
+            pending = await odoo.wait_pending_calls(exclude=inflight)
         except Exception:
-            _log.exception('poll loop error')
-        await asyncio.sleep(POLL_INTERVAL)
+            _log.exception('dispatch poll error')
+            await asyncio.sleep(RETRY_DELAY)
+            continue
+        for c in pending:
+            inflight.add(c['id'])
+            task = asyncio.create_task(originate_call(odoo, ari, c))
+            tasks.add(task)
+            task.add_done_callback(functools.partial(done, call_id=c['id']))
 
 
-async def handle_events(odoo, ari, loop):
+async def handle_events(odoo, ari):
     """Consume ARI WebSocket events: bridge answered humans to agents; finalize
     on hangup."""
-    ws_url = f'{ARI_URL.replace("http", "ws")}/ari/events?app={ARI_APP}&subscribeAll=true'
+    ws_url = f'{ari.base.replace("http", "ws", 1)}/events?app={ARI_APP}&subscribeAll=true'
     async with aiohttp.ClientSession() as s:
         async with s.ws_connect(ws_url, auth=aiohttp.BasicAuth(ARI_USER, ARI_PASS)) as ws:
             _log.info('ARI websocket connected')
@@ -217,19 +252,18 @@ async def handle_events(odoo, ari, loop):
                         ext = info.get('pre_ext')          # progressive pre-assignment
                         session_id = info.get('session_id')
                         if not ext:                        # predictive: pick on answer
-                            picked = await loop.run_in_executor(
-                                None, odoo.ready_agent, info['campaign_id'])
+                            picked = await odoo.ready_agent(info['campaign_id'])
                             if picked:
                                 ext, session_id = picked['ext'], picked['session_id']
                         if amd == 'MACHINE' or not ext:
                             # Machine, or no agent free (over-dial) => abandoned.
+                            # Only a dropped human counts against the governor.
+                            info['dropped'] = 'no_answer' if amd == 'MACHINE' else 'abandoned'
                             await ari.hangup(cid)
-                            await loop.run_in_executor(None, odoo.set_call, info['call_id'],
-                                                       {'state': 'cancelled'})
+                            await odoo.set_call(info['call_id'], {'state': 'cancelled'})
                             if info.get('session_id'):
-                                await loop.run_in_executor(
-                                    None, odoo.set_agent, info['session_id'],
-                                    {'state': 'ready', 'current_call_id': False})
+                                await odoo.set_agent(
+                                    info['session_id'], {'state': 'ready', 'current_call_id': False})
                             continue
                         # Bridge the customer now; add the agent when IT answers.
                         bridge = await ari.create_bridge()
@@ -241,23 +275,20 @@ async def handle_events(odoo, ari, loop):
                             ach = await ari.originate(f'PJSIP/{ext}', 'agent', CALLER_ID, agent_vars)
                         except Exception:
                             _log.exception('agent originate failed; dropping call')
+                            info['dropped'] = 'abandoned'
                             await ari.hangup(cid)
-                            await loop.run_in_executor(None, odoo.set_call, info['call_id'],
-                                                       {'state': 'cancelled'})
+                            await odoo.set_call(info['call_id'], {'state': 'cancelled'})
                             if session_id:
-                                await loop.run_in_executor(
-                                    None, odoo.set_agent, session_id,
-                                    {'state': 'ready', 'current_call_id': False})
+                                await odoo.set_agent(
+                                    session_id, {'state': 'ready', 'current_call_id': False})
                             continue
                         info['agent_cid'] = ach['id']
                         AGENT_PENDING[ach['id']] = {'bridge_id': bridge['id'], 'customer_cid': cid}
                         _log.info('customer %s bridged; agent %s originated (call %s)',
                                   cid, ach['id'], info['call_id'])
-                        await loop.run_in_executor(None, odoo.set_call, info['call_id'],
-                                                   {'state': 'in_progress'})
-                        await loop.run_in_executor(
-                            None, odoo.set_agent, session_id,
-                            {'state': 'on_call', 'current_call_id': info['call_id']})
+                        await odoo.set_call(info['call_id'], {'state': 'in_progress'})
+                        await odoo.set_agent(
+                            session_id, {'state': 'on_call', 'current_call_id': info['call_id']})
                     elif role == 'agent':
                         # Agent leg answered (entered Stasis) — join it to the bridge.
                         pend = AGENT_PENDING.pop(cid, None)
@@ -285,38 +316,53 @@ async def handle_events(odoo, ari, loop):
                     # Customer leg gone => tear down the agent leg + finalize.
                     if info.get('agent_cid'):
                         await ari.hangup(info['agent_cid'])
-                    if info.get('session_id'):
-                        await loop.run_in_executor(
-                            None, odoo.set_agent, info['session_id'],
-                            {'state': 'wrap', 'current_call_id': False})
-                    if info.get('bridge_id'):
-                        # Reached an agent — a real contact. The agent sets the
-                        # actual disposition during wrap-up.
-                        state, outcome = 'completed', 'completed'
-                    else:
-                        # Never connected — classify from the hangup cause.
-                        cause = (ev.get('cause_txt') or '').lower()
-                        if 'busy' in cause:
-                            state, outcome = 'busy', 'busy'
-                        elif 'no answer' in cause or 'no user' in cause or 'unavailable' in cause:
-                            state, outcome = 'no_answer', 'no_answer'
-                        else:
-                            state, outcome = 'failed', 'failed'
-                    end_ts = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-                    await loop.run_in_executor(
-                        None, odoo.set_call, info['call_id'],
-                        {'state': state, 'end_time': end_ts})  # duration auto-fills
-                    await loop.run_in_executor(None, odoo.register_result, info['contact_id'], outcome)
+                    # Odoo write-back runs on its own so the next events
+                    # don't wait for it.
+                    task = asyncio.create_task(finalize_call(odoo, info, ev.get('cause_txt')))
+                    FINALIZING.add(task)
+                    task.add_done_callback(FINALIZING.discard)
+
+
+async def finalize_call(odoo, info, cause):
+    """Write a finished customer leg back to Odoo and drive retry logic."""
+    try:
+        if info.get('session_id'):
+            await odoo.set_agent(info['session_id'], {'state': 'wrap', 'current_call_id': False})
+        if info.get('dropped'):
+            # Answered, then hung up by us (machine / no agent).
+            state, outcome = 'cancelled', info['dropped']
+        elif info.get('bridge_id'):
+            # Reached an agent — a real contact. The agent sets the
+            # actual disposition during wrap-up.
+            state, outcome = 'completed', 'completed'
+        else:
+            # Never connected — classify from the hangup cause.
+            cause = (cause or '').lower()
+            if 'busy' in cause:
+                state, outcome = 'busy', 'busy'
+            elif 'no answer' in cause or 'no user' in cause or 'unavailable' in cause:
+                state, outcome = 'no_answer', 'no_answer'
+            else:
+                state, outcome = 'failed', 'failed'
+        end_ts = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        await odoo.set_call(info['call_id'],
+                            {'state': state, 'end_time': end_ts})  # duration auto-fills
+        await odoo.register_result(info['contact_id'], outcome)
+    except Exception:
+        _log.exception('finalizing call %s failed', info['call_id'])
 
 
 async def main():
-    loop = asyncio.get_running_loop()
-    odoo = await loop.run_in_executor(None, Odoo)
-    async with aiohttp.ClientSession() as s:
-        ari = Ari(s)
+    timeout = aiohttp.ClientTimeout(total=DISPATCH_WAIT + 30)
+    connector = aiohttp.TCPConnector(limit=ODOO_POOL)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as odoo_s, \
+            aiohttp.ClientSession() as ari_s:
+        odoo = Odoo(odoo_s)
+        await odoo.login()
+        ari = Ari(ari_s)
         await asyncio.gather(
-            poll_odoo(odoo, ari, loop),
-            handle_events(odoo, ari, loop),
+            dispatch_calls(odoo, ari),
+            handle_events(odoo, ari),
         )
 
 